@@ -18,9 +18,11 @@ from ...util.fee_estimation import get_fees
 from .. import token_auth
 from .resource_jwt import JWTResource, JWTResourceById
 from .resource_healthz import ResourceLiveness, ResourceReadyness
+from .resource_metrics import ResourceMetrics
 from .resource_psbt import ResourcePsbt
 from .resource_specter import ResourceSpecter
 from .resource_txlist import ResourceTXlist
+from .resource_utxo import ResourceFrozenUtxos
 
 logger = logging.getLogger(__name__)
 
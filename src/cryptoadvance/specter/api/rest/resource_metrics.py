@@ -0,0 +1,27 @@
+"""
+Metrics in the Prometheus text format, to be scraped e.g. by Prometheus.
+See https://prometheus.io/docs/instrumenting/exposition_formats/
+"""
+import logging
+
+from cryptoadvance.specter.api.rest.base import SecureResource, rest_resource
+from cryptoadvance.specter.util.rpc_metrics import rpc_metrics
+from flask import Response
+
+logger = logging.getLogger(__name__)
+
+
+@rest_resource
+class ResourceMetrics(SecureResource):
+    """/api/metrics
+    Call counts, errors, latencies and batch sizes of the RPC-calls to the nodes.
+    As they tell about the activity of the wallets, this needs authentication (e.g. a JWT token
+    as bearer_token in the scrape config).
+    """
+
+    endpoints = ["/metrics"]
+
+    def get(self):
+        return Response(
+            rpc_metrics.to_prometheus(), mimetype="text/plain; version=0.0.4"
+        )
@@ -0,0 +1,70 @@
+import logging
+import re
+from json import dumps
+
+from flask import current_app as app, request, Response
+
+from ...wallet import Wallet
+from ...specter_error import SpecterError
+from .base import SecureResource, rest_resource
+from .. import token_auth
+
+logger = logging.getLogger(__name__)
+
+UTXO_PATTERN = re.compile("^[0-9a-fA-F]{64}:[0-9]+$")
+
+
+@rest_resource
+class ResourceFrozenUtxos(SecureResource):
+    """/api/v1alpha/wallets/<wallet_alias>/frozen_utxos
+    POST {"freeze": ["txid:vout", ...], "unfreeze": ["txid:vout", ...]} (un)freezes them in one go
+    """
+
+    endpoints = ["/v1alpha/wallets/<wallet_alias>/frozen_utxos"]
+
+    def get(self, wallet_alias):
+        wallet = self._get_wallet(wallet_alias)
+        if wallet is None:
+            return self._error_response(
+                "The wallet does not belong to the user in the request.", 403
+            )
+        return {"result": wallet.frozen_utxo}
+
+    def post(self, wallet_alias):
+        wallet = self._get_wallet(wallet_alias)
+        if wallet is None:
+            return self._error_response(
+                "The wallet does not belong to the user in the request.", 403
+            )
+        data = request.get_json(silent=True) or {}
+        utxos = {}
+        for key in ["freeze", "unfreeze"]:
+            utxos[key] = data.get(key, [])
+            if not isinstance(utxos[key], list) or not all(
+                isinstance(utxo, str) and UTXO_PATTERN.match(utxo)
+                for utxo in utxos[key]
+            ):
+                return self._error_response(
+                    f'"{key}" needs to be a list of "txid:vout"', 400
+                )
+        logger.debug(
+            f"Freezing {len(utxos['freeze'])} and unfreezing {len(utxos['unfreeze'])} utxos of {wallet_alias}"
+        )
+        return {"result": wallet.freeze_utxos(**utxos)}
+
+    def _get_wallet(self, wallet_alias) -> Wallet:
+        """The wallet of the user from the request, None if the user has no such wallet"""
+        user = token_auth.current_user()
+        wallet_manager = app.specter.user_manager.get_user(user).wallet_manager
+        try:
+            return wallet_manager.get_by_alias(wallet_alias)
+        except SpecterError as se:
+            logger.warning(
+                f"User {user} denied access to {wallet_alias} because of {se}"
+            )
+            return None
+
+    @staticmethod
+    def _error_response(message, status):
+        # abort() would raise, and error_handling turns that into a 500
+        return Response(dumps({"message": message}), status)
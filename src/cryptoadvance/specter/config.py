@@ -110,6 +110,21 @@ class BaseConfig(object):
     BITCOIN_RPC_TIMEOUT = int(os.getenv("BITCOIN_RPC_TIMEOUT", "10"))
     LIQUID_RPC_TIMEOUT = int(os.getenv("LIQUID_RPC_TIMEOUT", "10"))
 
+    # Cache the results of read-only RPC-calls for a short time (until the next block/a few seconds)
+    RPC_CACHE = _get_bool_env_var("RPC_CACHE", "False")
+
+    # Derive larger address ranges (e.g. keypool refills) in a pool of that many processes, 0 to disable
+    ADDRESS_DERIVATION_PROCESSES = int(os.getenv("ADDRESS_DERIVATION_PROCESSES", "0"))
+
+    # Max number of wallets with their addresses and txs in memory, the least recently used get unloaded, 0 for no limit
+    HYDRATED_WALLETS = int(os.getenv("HYDRATED_WALLETS", "20"))
+
+    # Bursts of changes of a wallet within that many seconds are written to its json-file at once, 0 writes immediately
+    WALLET_SAVE_DELAY = float(os.getenv("WALLET_SAVE_DELAY", "0.5"))
+
+    # Refresh wallets on ZMQ notifications (zmqpubhashblock/zmqpubrawtx) of the node, needs pyzmq
+    ZMQ_ACTIVE = _get_bool_env_var("ZMQ_ACTIVE", "False")
+
     # The self-signed ssl-certificate which is lazily created is configurable to a certain extent
     SPECTER_SSL_CERT_SUBJECT_C = os.getenv("SPECTER_SSL_CERT_SUBJECT_C", "DE")
     SPECTER_SSL_CERT_SUBJECT_ST = os.getenv("SPECTER_SSL_CERT_SUBJECT_ST", "BDW")
@@ -156,6 +171,8 @@ class BaseConfig(object):
     FEEESTIMATION_REQUEST_TIMEOUT = int(
         os.getenv("FEEESTIMATION_REQUEST_TIMEOUT", "10")
     )
+    # in seconds, how long a fee estimation is shared between requests, 0 disables the cache
+    FEEESTIMATION_CACHE_TTL = int(os.getenv("FEEESTIMATION_CACHE_TTL", "60"))
 
     # Babel integration. English listed first; other alphabetical by language code
     LANGUAGES = {
@@ -3,6 +3,8 @@ from embit.liquid.addresses import addr_decode, to_unconfidential
 
 
 class LAddress(Address):
+    __slots__ = ("_unconfidential",)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._unconfidential = to_unconfidential(self.address)
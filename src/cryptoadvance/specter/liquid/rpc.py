@@ -516,4 +516,5 @@ class LiquidRPC(BitcoinRPC):
             session=rpc.session,
             proxy_url=rpc.proxy_url,
             only_tor=rpc.only_tor,
+            cache=rpc.cache,
         )
@@ -10,6 +10,8 @@ from embit.psbt import read_string
 
 
 class LTxItem(WalletAwareTxItem):
+    __slots__ = ()
+
     TransactionCls = LTransaction
     columns = [
         "txid",  # str, txid in hex
@@ -27,13 +29,13 @@ class LTxItem(WalletAwareTxItem):
     ]
     type_converter = [
         str,
-        str,
+        intern_str,
         int,
         int,
-        str,
+        intern_str,
         parse_arr,
         int,
-        str,
+        intern_str,
         parse_arr,
         parse_arr,
         parse_arr,
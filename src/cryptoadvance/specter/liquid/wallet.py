@@ -10,6 +10,7 @@ from embit.liquid.transaction import LTransaction
 
 from ..specter_error import SpecterError
 from ..wallet import *
+from ..wallet.wallet import uses_tables
 from .addresslist import LAddressList
 from .txlist import LTxList
 from .util.pset import SpecterPSET
@@ -77,6 +78,7 @@ class LWallet(Wallet):
         desc.blinding_key = None
         return desc
 
+    @uses_tables
     def getdata(self):
         self.fetch_transactions()
         self.check_utxo()
@@ -139,6 +141,7 @@ class LWallet(Wallet):
         self.balance = balance
         return self.balance
 
+    @uses_tables
     def createpsbt(
         self,
         addresses: List[str],
@@ -188,10 +191,6 @@ class LWallet(Wallet):
 
         options["add_inputs"] = not selected_coins
 
-        if fee_rate > 0:
-            # bitcoin core needs us to convert sat/B to BTC/kB
-            options["feeRate"] = round((fee_rate * 1000) / 1e8, 8)
-
         # looks like change_type is required in nested segwit wallets
         # but not in native segwit
         if "changeAddress" not in options and self.address_type:
@@ -202,16 +201,11 @@ class LWallet(Wallet):
         except:
             locktime = 0
 
-        r = self.rpc.walletcreatefundedpsbt(
-            extra_inputs,  # inputs
-            [
-                {addresses[i]: amounts[i], "asset": assets[i]}
-                for i in range(len(addresses))
-            ],  # outputs
-            locktime,
-            options,  # options
-            True,  # bip32-der
-        )
+        outputs = [
+            {addresses[i]: amounts[i], "asset": assets[i]}
+            for i in range(len(addresses))
+        ]
+        r = self._fund_psbt(extra_inputs, outputs, locktime, options, fee_rate)
 
         b64psbt = r["psbt"]
         psbt = self.PSBTCls(
@@ -221,31 +215,6 @@ class LWallet(Wallet):
             devices=list(zip(self.keys, self._devices)),
         )
 
-        if fee_rate > 0:
-            # scale by which Core misses the fee rate
-            scale = fee_rate / psbt.fee_rate
-            adjusted_fee_rate = fee_rate * scale
-            options["feeRate"] = round((adjusted_fee_rate * 1000) / 1e8, 8)
-
-            r = self.rpc.walletcreatefundedpsbt(
-                extra_inputs,  # inputs
-                [
-                    {addresses[i]: amounts[i], "asset": assets[i]}
-                    for i in range(len(addresses))
-                ],  # output
-                locktime,
-                options,  # options
-                True,  # bip32-der
-            )
-
-            b64psbt = r["psbt"]
-            psbt = self.PSBTCls(
-                b64psbt,
-                self.descriptor,
-                self.network,
-                devices=list(zip(self.keys, self._devices)),
-            )
-
         if not readonly:
             self.save_pending_psbt(psbt)
         return psbt
@@ -256,6 +225,7 @@ class LWallet(Wallet):
     def bumpfee(self, *args, **kwargs):
         raise SpecterError("RBF is not implemented on Liquid")
 
+    @uses_tables
     def addresses_info(self, is_change):
         """Create a list of (receive or change) addresses from cache and retrieve the
         related UTXO and amount.
@@ -267,39 +237,45 @@ class LWallet(Wallet):
         addresses_cache = [
             v for _, v in self._addresses.items() if v.change == is_change and v.is_mine
         ]
+        utxo_by_address = self.utxo_by_address
 
         for addr in addresses_cache:
-
-            addr_utxo = 0
-            addr_amount = 0
-            addr_assets = {}
-
-            for utxo in [
-                utxo
-                for utxo in self.full_utxo
-                if to_unconfidential(utxo["address"]) == to_unconfidential(addr.address)
-            ]:
-                addr_amount = addr_amount + utxo["amount"]
-                addr_utxo = addr_utxo + 1
-                addr_assets[utxo.get("asset")] = (
-                    addr_assets.get(utxo.get("asset"), 0) + utxo["amount"]
-                )
-
+            addr_utxo_info = utxo_by_address.get(
+                to_unconfidential(addr.address), {"utxo": 0, "amount": 0, "assets": {}}
+            )
             addresses_info.append(
                 {
                     "index": addr.index,
                     "address": addr.address,
                     "label": addr.label,
-                    "amount": addr_amount,
+                    "amount": addr_utxo_info["amount"],
                     "used": bool(addr.used),
-                    "utxo": addr_utxo,
+                    "utxo": addr_utxo_info["utxo"],
                     "type": "change" if is_change else "receive",
-                    "assets": addr_assets,
+                    "assets": addr_utxo_info["assets"],
                 }
             )
 
         return addresses_info
 
+    def _index_utxo_by_address(self, full_utxo):
+        """Same as Wallet._index_utxo_by_address() but keyed by the unconfidential
+        address and with the amounts per asset
+        """
+        index = {}
+        for utxo in full_utxo:
+            addr_info = index.setdefault(
+                to_unconfidential(utxo["address"]),
+                {"utxo": 0, "amount": 0, "assets": {}},
+            )
+            addr_info["utxo"] += 1
+            addr_info["amount"] += utxo["amount"]
+            asset = utxo.get("asset")
+            addr_info["assets"][asset] = (
+                addr_info["assets"].get(asset, 0) + utxo["amount"]
+            )
+        return index
+
     @property
     def unconfidential_address(self):
         return to_unconfidential(self.address)
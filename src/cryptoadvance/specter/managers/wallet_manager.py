@@ -1,4 +1,7 @@
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
 import sys
@@ -8,6 +11,8 @@ import sys
 from typing import Dict, List
 from flask_babel import lazy_gettext as _
 from flask import copy_current_request_context
+from embit.liquid.networks import get_network
+from embit.transaction import Transaction
 from cryptoadvance.specter.rpc import BitcoinRPC
 from cryptoadvance.specter.key import Key
 
@@ -16,7 +21,7 @@ from ..liquid.wallet import LWallet
 from ..persistence import delete_folder
 from ..rpc import RpcError, get_default_datadir, BrokenCoreConnectionException
 from ..specter_error import SpecterError, SpecterInternalException, handle_exception
-from ..util.flask import FlaskThread
+from ..util.flask import FlaskThread, with_app_context
 from ..wallet import (  # TODO: `purposes` unused here, but other files rely on this import
     Wallet,
     purposes,
@@ -29,6 +34,13 @@ logger = logging.getLogger(__name__)
 class WalletManager:
     """Manages Wallets. Depending on the chain"""
 
+    # max number of wallets which are loaded in parallel
+    LOADING_THREADS = 8
+    # max number of wallets which are refreshed in parallel (see refresh_wallets)
+    REFRESH_THREADS = 8
+    # seconds after which a wallet gets refreshed even if there is no new block
+    REFRESH_MAX_AGE = 10
+
     # chain is required to manage wallets when bitcoind is not running
     def __init__(
         self,
@@ -47,6 +59,13 @@ class WalletManager:
         self.device_manager = device_manager
         # sort of lock to prevent threads to update in parallel
         self.is_loading = False
+        # how many of the wallets of the running (or last) update have been processed
+        self.loading_progress = {"total": 0, "done": 0}
+        self._loading_lock = threading.Lock()
+        # held while refresh_wallets is running
+        self._refresh_lock = threading.Lock()
+        # key is the name of the wallet, value is (tip, timestamp) of its last refresh
+        self._refreshed = {}
         # key is the name of the wallet, value is the actual instance
 
         self.wallets = {}
@@ -96,6 +115,8 @@ class WalletManager:
         wallets_update_list = {}
 
         if self.working_folder is not None:
+            # the files need to be up to date
+            self.WalletClass.writer.flush()
             wallets_files = load_jsons(self.working_folder, key="name")
             for wallet in wallets_files:
                 wallet_name = wallets_files[wallet]["name"]
@@ -149,98 +170,27 @@ class WalletManager:
         * we get a list of loaded wallets from Bitcoin Core
         * the unloaded wallets are loaded in Bitcoin Core
         * and, on the Specter side, the wallet objects of those unloaded wallets are reinitialised
+        The wallets are processed in parallel (see LOADING_THREADS) and each wallet is available
+        in self.wallets as soon as it's loaded. The progress is in self.loading_progress.
         """
         timestamp = datetime.now()
         # list of wallets in the dict
         existing_names = list(self.wallets.keys())
         # list of wallet to keep
         self._failed_load_wallets = []
+        self.loading_progress = {"total": len(wallets_update_list), "done": 0}
         try:
             if wallets_update_list:
                 loaded_wallets = self.rpc.listwallets()
-                for wallet in wallets_update_list:
-
-                    wallet_alias = wallets_update_list[wallet]["alias"]
-                    wallet_name = wallets_update_list[wallet]["name"]
-                    # wallet from json not yet loaded in Bitcoin Core?!
-                    if os.path.join(self.rpc_path, wallet_alias) not in loaded_wallets:
-                        try:
-                            self.rpc.loadwallet(
-                                os.path.join(self.rpc_path, wallet_alias)
-                            )
-                            logger.debug("Initializing {wallet_name} Wallet object")
-                            loaded_wallet = self.WalletClass.from_json(
-                                wallets_update_list[wallet],
-                                self.device_manager,
-                                self,
-                            )
-                            # Lock UTXO of pending PSBTs
-                            logger.debug(
-                                "Re-locking UTXOs of wallet %s"
-                                % wallets_update_list[wallet]["alias"]
-                            )
-                            if len(loaded_wallet.pending_psbts) > 0:
-                                for psbt in loaded_wallet.pending_psbts:
-                                    logger.info(
-                                        f"lock {wallet_alias} {loaded_wallet.pending_psbts[psbt].utxo_dict()}"
-                                    )
-                                    loaded_wallet.rpc.lockunspent(
-                                        False,
-                                        loaded_wallet.pending_psbts[psbt].utxo_dict(),
-                                    )
-                            if len(loaded_wallet.frozen_utxo) > 0:
-                                loaded_wallet.rpc.lockunspent(
-                                    False,
-                                    [
-                                        {
-                                            "txid": utxo.split(":")[0],
-                                            "vout": int(utxo.split(":")[1]),
-                                        }
-                                        for utxo in loaded_wallet.frozen_utxo
-                                    ],
-                                )
-                            self.wallets[wallet_name] = loaded_wallet
-                            # logger.info(
-                            #     "Finished loading wallet into Bitcoin Core and Specter: %s"
-                            #     % wallets_update_list[wallet]["alias"]
-                            # )
-                        except RpcError as e:
-                            self._failed_load_wallets.append(
-                                {
-                                    **wallets_update_list[wallet],
-                                    "loading_error": str(e).replace("'", ""),
-                                }
-                            )
-                        except Exception as e:
-                            logger.exception(e)
-                            self._failed_load_wallets.append(
-                                {
-                                    **wallets_update_list[wallet],
-                                    "loading_error": str(e).replace("'", ""),
-                                }
-                            )
-                    else:
-                        if wallet_name not in existing_names:
-                            # ok wallet is not yet in the dict, create one
-                            try:
-                                loaded_wallet = self.WalletClass.from_json(
-                                    wallets_update_list[wallet],
-                                    self.device_manager,
-                                    self,
-                                )
-                                self.wallets[wallet_name] = loaded_wallet
-                            except Exception as e:
-                                logger.exception(e)
-                                self._failed_load_wallets.append(
-                                    {
-                                        **wallets_update_list[wallet],
-                                        "loading_error": str(e).replace("'", ""),
-                                    }
-                                )
-                        else:
-                            # Wallet is already there
-                            # we only need to update
-                            self.wallets[wallet_name].update()
+                update_wallet = with_app_context(self._update_wallet)
+                with ThreadPoolExecutor(
+                    max_workers=self.LOADING_THREADS,
+                    thread_name_prefix="wallet_loading",
+                ) as executor:
+                    for wallet_dict in wallets_update_list.values():
+                        executor.submit(
+                            update_wallet, wallet_dict, loaded_wallets, existing_names
+                        )
         # only ignore rpc errors
         except RpcError as e:
             logger.error(f"Failed updating wallet manager. RPC error: {e}")
@@ -255,6 +205,117 @@ class WalletManager:
             for wallet in self._failed_load_wallets:
                 logger.info(f"    * {wallet['name']} : {wallet['loading_error']}")
 
+    def _update_wallet(self, wallet_dict: Dict, loaded_wallets: List, existing_names):
+        """Loads (or updates) one wallet, see _update. Runs in the threads of _update."""
+        wallet_alias = wallet_dict["alias"]
+        wallet_name = wallet_dict["name"]
+        try:
+            # wallet from json not yet loaded in Bitcoin Core?!
+            if os.path.join(self.rpc_path, wallet_alias) not in loaded_wallets:
+                self.rpc.loadwallet(os.path.join(self.rpc_path, wallet_alias))
+                logger.debug(f"Initializing {wallet_name} Wallet object")
+                loaded_wallet = self.WalletClass.from_json(
+                    wallet_dict,
+                    self.device_manager,
+                    self,
+                )
+                self._relock_utxos(loaded_wallet)
+                self.wallets[wallet_name] = loaded_wallet
+            elif wallet_name not in existing_names:
+                # ok wallet is not yet in the dict, create one
+                loaded_wallet = self.WalletClass.from_json(
+                    wallet_dict,
+                    self.device_manager,
+                    self,
+                )
+                self.wallets[wallet_name] = loaded_wallet
+            else:
+                # Wallet is already there
+                # we only need to update
+                try:
+                    self.wallets[wallet_name].update()
+                except RpcError as e:
+                    logger.error(
+                        f"Failed updating wallet {wallet_alias}. RPC error: {e}"
+                    )
+                except Exception as e:
+                    logger.exception(e)
+        except Exception as e:
+            if not isinstance(e, RpcError):
+                logger.exception(e)
+            self._failed_load_wallets.append(
+                {
+                    **wallet_dict,
+                    "loading_error": str(e).replace("'", ""),
+                }
+            )
+        finally:
+            with self._loading_lock:
+                self.loading_progress["done"] += 1
+
+    def _relock_utxos(self, wallet):
+        """Locks the UTXOs of the pending PSBTs and the frozen UTXOs of a wallet which has just been
+        loaded in Bitcoin Core (locks don't survive an unload), see Wallet.lockunspent_multi.
+        """
+        logger.debug(f"Re-locking UTXOs of wallet {wallet.alias}")
+        calls = [
+            ("lockunspent", False, wallet.pending_psbts.utxo_dict(psbtid))
+            for psbtid in wallet.pending_psbts
+        ]
+        if len(wallet.frozen_utxo) > 0:
+            calls.append(("lockunspent", False, wallet.utxo_dicts(wallet.frozen_utxo)))
+        if calls:
+            wallet.lockunspent_multi(calls)
+
+    def refresh_wallets(self, wallets: List[Wallet] = None, tip=None, force=False):
+        """Refreshes the balance and the utxo of the wallets (all by default) in parallel
+        (see REFRESH_THREADS). Wallets which have been refreshed for the same tip within the
+        last REFRESH_MAX_AGE seconds are skipped unless force is set.
+        If a refresh is already running, this returns immediately and the wallets keep their
+        last balance and utxo. A forced refresh (e.g. after the user did something) waits for it instead.
+        :param tip: the current best blockhash
+        :return: whether the refresh has been done
+        """
+        if not self._refresh_lock.acquire(blocking=force):
+            logger.debug("Refresh of the wallets in progress, using the last snapshot")
+            return False
+        try:
+            if wallets is None:
+                wallets = list(self.wallets.values())
+            now = time.time()
+            stale = [
+                wallet
+                for wallet in wallets
+                if force or not self._is_fresh(wallet, tip, now)
+            ]
+            if not stale:
+                return True
+            refresh_wallet = with_app_context(self._refresh_wallet)
+            with ThreadPoolExecutor(
+                max_workers=self.REFRESH_THREADS,
+                thread_name_prefix="wallet_refresh",
+            ) as executor:
+                for wallet in stale:
+                    executor.submit(refresh_wallet, wallet, tip)
+            return True
+        finally:
+            self._refresh_lock.release()
+
+    def _is_fresh(self, wallet, tip, now):
+        refreshed_tip, timestamp = self._refreshed.get(wallet.name, (None, 0))
+        return refreshed_tip == tip and now - timestamp < self.REFRESH_MAX_AGE
+
+    def _refresh_wallet(self, wallet, tip):
+        """Runs in the threads of refresh_wallets"""
+        timestamp = time.time()
+        try:
+            wallet.update_balance()
+            wallet.check_utxo()
+            self._refreshed[wallet.name] = (tip, timestamp)
+        except Exception as e:
+            self._refreshed.pop(wallet.name, None)
+            logger.error(f"Failed refreshing wallet {wallet.alias}: {e}")
+
     def get_by_alias(self, alias):
         for wallet_name in self.wallets:
             if self.wallets[wallet_name] and self.wallets[wallet_name].alias == alias:
@@ -367,7 +428,7 @@ class WalletManager:
             **kwargs,
         )
         # save wallet file to disk
-        w.save_to_file()
+        w.save_to_file(flush=True)
         # get Wallet class instance
         if w:
             self.wallets[name] = w
@@ -508,6 +569,54 @@ class WalletManager:
             )
         return addresses_info
 
+    def wallets_affected_by_tx(self, tx: Transaction) -> List[Wallet]:
+        """Returns the wallets which receive (an output pays to one of the wallet's addresses)
+        or spend (an input spends an output of one of the wallet's txs) in the tx.
+        Only wallets with loaded tables are checked (see Wallet.is_affected_by), the others
+        get refreshed on the next block.
+        """
+        network = get_network(self.chain)
+        addresses = set()
+        for vout in tx.vout:
+            try:
+                addresses.add(vout.script_pubkey.address(network))
+            except:
+                pass  # maybe not an address, but a raw script?
+        prev_txids = set(vin.txid.hex() for vin in tx.vin)
+        return [
+            wallet
+            for wallet in list(self.wallets.values())
+            if wallet and wallet.is_affected_by(addresses, prev_txids)
+        ]
+
+    def on_zmq_notification(self, topic, body):
+        """Refreshes the wallets affected by a ZMQ notification of the node:
+        * hashblock: all wallets with loaded tables, the others fetch their txs when they're
+          used next (loading all tables on every block would defeat HydratedWallets)
+        * rawtx: only the wallets which receive or spend in that tx
+        A failing wallet doesn't stop the refresh of the others.
+        """
+        if topic == "hashblock":
+            wallets = [
+                wallet
+                for wallet in list(self.wallets.values())
+                if wallet and wallet.tables_loaded
+            ]
+        elif topic == "rawtx" and not is_liquid(self.chain):
+            # Liquid txs are blinded, so we rely on the blocks there
+            wallets = self.wallets_affected_by_tx(Transaction.parse(body))
+        else:
+            return
+        for wallet in wallets:
+            logger.debug(f"Refreshing wallet {wallet.alias} due to {topic}")
+            # the utxo might change as well
+            self._refreshed.pop(wallet.name, None)
+            try:
+                wallet.fetch_transactions()
+                wallet.update_balance()
+            except Exception as e:
+                logger.error(f"Failed refreshing wallet {wallet.alias} on {topic}: {e}")
+
     def delete(self, specter):
         """Deletes all the wallets"""
         for w in list(self.wallets.keys()):
@@ -229,6 +229,29 @@ class AbstractNode(NonExistingNode):
         """
         return self.info.get("blocks") != self.rpc.getblockcount()
 
+    def zmq_endpoints(self):
+        """Returns the ZMQ notifications the node publishes as a dict with the topic as key
+        and the address as value, e.g. {"hashblock": "tcp://127.0.0.1:28332"}
+        https://developer.bitcoin.org/reference/rpc/getzmqnotifications.html
+        Returns an empty dict if the node doesn't publish any (or the connection is broken)
+        """
+        try:
+            notifications = self.rpc.getzmqnotifications()
+        except Exception as e:
+            logger.debug(f"getzmqnotifications failed: {e}")
+            return {}
+        endpoints = {}
+        for notification in notifications:
+            address = notification["address"]
+            # Core might bind to all interfaces, we need to connect to the node's host
+            host = getattr(self, "host", None)
+            if host:
+                for wildcard in ["0.0.0.0", "*"]:
+                    address = address.replace(f"//{wildcard}:", f"//{host}:")
+            # "pubhashblock" --> "hashblock"
+            endpoints[notification["type"][len("pub") :]] = address
+        return endpoints
+
     def is_device_supported(self, device_class_or_device_instance):
         """Lets the node deactivate specific devices. The parameter could be a device or a device_type
             You have to check yourself if overriding this method.
@@ -241,6 +241,47 @@ def write_csv(fname, objs, cls=dict):
     storage_callback(path=fname)
 
 
+def _append_csv(fname, objs, columns):
+    """Internal method which won't trigger the callback.
+    Appends rows to a csv-file, the header is only written if the file is new.
+    """
+    with fslock:
+        file_exists = os.path.isfile(fname)
+        with open(fname, mode="a") as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=columns, extrasaction="ignore")
+            if not file_exists:
+                writer.writeheader()
+            for obj in objs:
+                writer.writerow(obj)
+
+
+def append_csv(fname, objs, columns):
+    """Appends objs to the csv-file fname without rewriting it. Useful for
+    append-only journals where the cost of a write should only depend on the
+    number of new rows.
+    """
+    _append_csv(fname, objs, columns)
+    storage_callback(path=fname)
+
+
+def _append_binary(fname, data):
+    """Internal method which won't trigger the callback.
+    Appends data to a binary file and returns the offset it has been written at.
+    """
+    with fslock:
+        with open(fname, mode="ab") as f:
+            offset = f.tell()
+            f.write(data)
+    return offset
+
+
+def append_binary(fname, data):
+    """Appends data to the binary file fname, returns the offset it has been written at"""
+    offset = _append_binary(fname, data)
+    storage_callback(path=fname)
+    return offset
+
+
 def read_csv(fname, cls=dict, *args):
     with fslock:
         with open(fname, mode="r") as csv_file:
@@ -4,12 +4,15 @@ import json
 import logging
 import os
 import sys
+import time
 
 import requests
 import urllib3
 
 from .helpers import is_ip_private
 from .specter_error import SpecterError, handle_exception, BrokenCoreConnectionException
+from .util.rpc_cache import RpcCache
+from .util.rpc_metrics import rpc_metrics
 from urllib3.exceptions import NewConnectionError
 from requests.exceptions import ConnectionError
 
@@ -295,6 +298,10 @@ class BitcoinRPC:
     # None means until connection closes. It's specified in seconds
     default_timeout = None  # seconds
 
+    # Whether new instances cache the results of read-only calls (see RpcCache)
+    use_cache = False
+    cache = None
+
     def __init__(
         self,
         user="bitcoin",
@@ -307,6 +314,7 @@ class BitcoinRPC:
         session=None,
         proxy_url="socks5h://localhost:9050",
         only_tor=False,
+        cache=None,
         **kwargs,
     ):
         path = path.replace("//", "/")  # just in case
@@ -322,6 +330,10 @@ class BitcoinRPC:
         self.r = None
         self.last_call_hash = None
         self.last_call_hash_counter = 0
+        # shared with the instances created via wallet() and clone()
+        if cache is None and self.use_cache:
+            cache = RpcCache()
+        self.cache = cache
         # session reuse speeds up requests
         if session is None:
             self._create_session()
@@ -352,6 +364,7 @@ class BitcoinRPC:
             session=self.session,
             proxy_url=self.proxy_url,
             only_tor=self.only_tor,
+            cache=self.cache,
         )
 
     @property
@@ -391,10 +404,20 @@ class BitcoinRPC:
             self.session,
             self.proxy_url,
             self.only_tor,
+            cache=self.cache,
         )
 
     def multi(self, calls: list, **kwargs):
-        """Makes batch request to Core"""
+        """Makes batch request to Core, answering read-only calls from the cache if enabled"""
+        if self.cache is None or kwargs.get("no_wait"):
+            return self._multi(calls, **kwargs)
+        url = self.url
+        if "wallet" in kwargs:
+            url = url + "/wallet/{}".format(kwargs["wallet"])
+        return self.cache.multi(self._multi, url, calls, **kwargs)
+
+    def _multi(self, calls: list, **kwargs):
+        """Makes the actual batch request to Core"""
         type(self).counter += len(calls)
         # some debug info for optimizations
         # methods = " ".join(list(dict.fromkeys([call[0] for call in calls])))
@@ -421,12 +444,14 @@ class BitcoinRPC:
         url = self.url
         if "wallet" in kwargs:
             url = url + "/wallet/{}".format(kwargs["wallet"])
+        methods = [call[0] for call in calls]
+        data = json.dumps(payload)
         ts = self.trace_call_before(url, payload)
+        start = time.perf_counter()
         try:
-            r = self.session.post(
-                url, data=json.dumps(payload), headers=headers, timeout=timeout
-            )
+            r = self.session.post(url, data=data, headers=headers, timeout=timeout)
         except (ConnectionError, NewConnectionError, ConnectionRefusedError) as ce:
+            rpc_metrics.observe_connection_error(methods)
             raise BrokenCoreConnectionException()
 
         except (requests.exceptions.Timeout, urllib3.exceptions.ReadTimeoutError) as to:
@@ -440,6 +465,7 @@ class BitcoinRPC:
                 self.trace_call_after(url, payload, timeout)
                 return [{"error": None, "result": None}]
 
+            rpc_metrics.observe_timeout(methods, len(data))
             logger.error(
                 "Timeout after {} secs while {} call({: <28}) payload:{} Exception: {}".format(
                     timeout,
@@ -459,8 +485,12 @@ class BitcoinRPC:
                 )
             )
         self.trace_call_after(url, payload, ts)
+        rpc_metrics.observe_request(
+            methods, time.perf_counter() - start, len(data), len(r.content)
+        )
         self.r = r
         if r.status_code != 200:
+            rpc_metrics.observe_errors(methods)
             logger.debug(f"last call FAILED: {r.text}")
             if r.text.startswith("Work queue depth exceeded"):
                 raise SpecterError(
@@ -474,6 +504,13 @@ class BitcoinRPC:
         # implementations or proxies may return a single object instead.
         if isinstance(r, dict):
             r = [r]
+        failed = [
+            method
+            for method, result in zip(methods, r)
+            if isinstance(result, dict) and result.get("error")
+        ]
+        if failed:
+            rpc_metrics.observe_errors(failed)
         return r
 
     @classmethod
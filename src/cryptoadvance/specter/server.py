@@ -9,7 +9,11 @@ from cryptoadvance.specter.liquid.rpc import LiquidRPC
 from cryptoadvance.specter.managers.service_manager import ExtensionManager
 from cryptoadvance.specter.rpc import BitcoinRPC
 from cryptoadvance.specter.services import callbacks
+from cryptoadvance.specter.util.debounced_writer import DebouncedWriter
+from cryptoadvance.specter.util.fee_estimation import FeeEstimator
 from cryptoadvance.specter.util.reflection import get_template_static_folder
+from cryptoadvance.specter.wallet.address_deriver import AddressDeriver
+from cryptoadvance.specter.wallet.hydrated_wallets import HydratedWallets
 from dotenv import load_dotenv
 from flask import Flask, jsonify, redirect, request, session, url_for
 from flask_apscheduler import APScheduler
@@ -164,6 +168,11 @@ def init_app(app: SpecterFlask, hwibridge=False, specter=None):
     app.secret_key = app.config["SECRET_KEY"]
     BitcoinRPC.default_timeout = app.config["BITCOIN_RPC_TIMEOUT"]
     LiquidRPC.default_timeout = app.config["LIQUID_RPC_TIMEOUT"]
+    BitcoinRPC.use_cache = app.config["RPC_CACHE"]
+    AddressDeriver.PROCESSES = app.config["ADDRESS_DERIVATION_PROCESSES"]
+    HydratedWallets.MAX_WALLETS = app.config["HYDRATED_WALLETS"]
+    DebouncedWriter.DELAY = app.config["WALLET_SAVE_DELAY"]
+    FeeEstimator.TTL = app.config["FEEESTIMATION_CACHE_TTL"]
 
     if specter is None:
         # the default. If not None, then it got injected for testing
@@ -193,6 +202,8 @@ def init_app(app: SpecterFlask, hwibridge=False, specter=None):
     specter.call_functions_at_cleanup_on_exit.append(service_manager_cleanup_on_exit)
 
     specter.initialize()
+    if app.config["ZMQ_ACTIVE"]:
+        specter.start_zmq_listener()
 
     # HWI
     specter.hwi = HWIBridge(app.config["SKIP_HWI_INITIALISATION_AT_STARTUP"])
@@ -26,7 +26,7 @@ from ...services.callbacks import adjust_view_model
 from ...specter_error import SpecterError, handle_exception
 from ...util.tx import convert_rawtransaction_to_psbt, is_hex
 from ...util.wallet_importer import WalletImporter
-from ...wallet import Wallet
+from ...wallet import Wallet, delete_wallet_files
 from .wallets_vm import WalletsOverviewVm
 
 logger = logging.getLogger(__name__)
@@ -86,10 +86,9 @@ def wallets_overview():
         logger.info(f"redirecting to {wallets_overview_vm.wallets_overview_redirect}")
         return redirect(wallets_overview_vm.wallets_overview_redirect)
 
-    wallet: Wallet
-    for wallet in list(app.specter.wallet_manager.wallets.values()):
-        wallet.update_balance()
-        wallet.check_utxo()
+    app.specter.wallet_manager.refresh_wallets(
+        tip=app.specter.info.get("bestblockhash")
+    )
 
     return render_template(
         "wallet/overview/wallets_overview.jinja",
@@ -115,11 +114,7 @@ def failed_wallets():
         elif action == "delete_failed_wallet":
             try:
                 wallet = json.loads(request.form["wallet_data"])
-                fullpath = wallet["fullpath"]
-                delete_file(fullpath)
-                delete_file(fullpath + ".bkp")
-                delete_file(fullpath.replace(".json", "_addr.csv"))
-                delete_file(fullpath.replace(".json", "_txs.csv"))
+                delete_wallet_files(wallet["fullpath"])
                 app.specter.wallet_manager.update(
                     comment="via failed_wallets_delete_failed_wallet"
                 )
@@ -422,10 +417,13 @@ def history(wallet_alias):
             except SpecterError as e:
                 flash(str(e), "error")
 
-    # update balances in the wallet
+    # update balances in the wallet, after an action even if it's still fresh
     app.specter.check_blockheight()
-    wallet.update_balance()
-    wallet.check_utxo()
+    app.specter.wallet_manager.refresh_wallets(
+        [wallet],
+        tip=app.specter.info.get("bestblockhash"),
+        force=request.method == "POST",
+    )
 
     return render_template(
         "wallet/history/wallet_history.jinja",
@@ -5,11 +5,8 @@ import re
 import threading
 import time
 from binascii import b2a_base64
-from datetime import datetime
 from io import StringIO
 from math import isnan
-from numbers import Number
-from typing import List
 
 import requests
 from embit.descriptor.checksum import add_checksum
@@ -21,7 +18,7 @@ from flask_babel import lazy_gettext as _
 from flask_login import current_user, login_required
 from werkzeug.wrappers import Response
 
-from cryptoadvance.specter.wallet.txlist import WalletAwareTxItem
+from cryptoadvance.specter.wallet.txlist_view import TxListView, iter_merged_txlists
 
 from ...commands.psbt_creator import PsbtCreator
 from ...helpers import bcur2base64
@@ -33,7 +30,7 @@ from ...util.base43 import b43_decode
 from ...util.descriptor import Descriptor
 from ...util.fee_estimation import FeeEstimationResultEncoder, get_fees
 from ...util.mnemonic import generate_mnemonic
-from ...util.price_providers import get_price_at
+from ...util.price_providers import DailyPriceSeries, get_price_at
 from ...util.tx import decoderawtransaction
 from ...wallet import Wallet
 
@@ -56,6 +53,7 @@ def wallets_loading():
         "failed_load_wallets": [
             wallet["alias"] for wallet in app.specter.wallet_manager.failed_load_wallets
         ],
+        "loading_progress": app.specter.wallet_manager.loading_progress,
     }
 
 
@@ -181,6 +179,7 @@ def broadcast(wallet_alias):
     if res["allowed"]:
         app.specter.broadcast(tx)
         wallet.delete_spent_pending_psbts([tx])
+        wallet.update_balance()
         return jsonify(success=True)
     else:
         return jsonify(
@@ -397,14 +396,14 @@ def txlist(wallet_alias):
     sortdir = request.form.get("sortdir", "asc")
     service_id = request.form.get("service_id", None)
     fetch_transactions = request.form.get("fetch_transactions", False)
-    txlist = wallet.txlist(
+    txlist_view = wallet.txlist_view(
         fetch_transactions=fetch_transactions,
         validate_merkle_proofs=app.specter.config.get("validate_merkle_proofs", False),
         current_blockheight=app.specter.info["blocks"],
         service_id=service_id,
     )
     txlist, page_count = process_txlist(
-        txlist, idx=idx, limit=limit, search=search, sortby=sortby, sortdir=sortdir
+        txlist_view, idx=idx, limit=limit, search=search, sortby=sortby, sortdir=sortdir
     )
     return {"txlist": json.dumps(txlist), "pageCount": page_count}
 
@@ -419,12 +418,13 @@ def utxo_list(wallet_alias):
     search = request.form.get("search", None)
     sortby = request.form.get("sortby", None)
     sortdir = request.form.get("sortdir", "asc")
-    txlist = wallet.full_utxo
-    for tx in txlist:
-        if not tx.get("label", None):
-            tx["label"] = wallet.getlabel(tx["address"])
     txlist, page_count = process_txlist(
-        txlist, idx=idx, limit=limit, search=search, sortby=sortby, sortdir=sortdir
+        wallet.utxo_view(),
+        idx=idx,
+        limit=limit,
+        search=search,
+        sortby=sortby,
+        sortdir=sortdir,
     )
     return {"txlist": json.dumps(txlist), "pageCount": page_count}
 
@@ -642,13 +642,12 @@ def addresses_list_csv(wallet_alias):
 def tx_history_csv(wallet_alias):
     wallet: Wallet = app.specter.wallet_manager.get_by_alias(wallet_alias)
     validate_merkle_proofs = app.specter.config.get("validate_merkle_proofs", False)
-    txlist = wallet.txlist(validate_merkle_proofs=validate_merkle_proofs)
     search = request.args.get("search", None)
     sortby = request.args.get("sortby", "time")
     sortdir = request.args.get("sortdir", "desc")
-    txlist, _ = process_txlist(
-        txlist, idx=0, limit=0, search=search, sortby=sortby, sortdir=sortdir
-    )
+    txlist = wallet.txlist_view(
+        validate_merkle_proofs=validate_merkle_proofs
+    ).iter_query(search=search, sortby=sortby, sortdir=sortdir)
     includePricesHistory = request.args.get("exportPrices", "false") == "true"
 
     # stream the response as the data is generated
@@ -673,13 +672,8 @@ def utxo_csv(wallet_alias):
         search = request.args.get("search", None)
         sortby = request.args.get("sortby", "time")
         sortdir = request.args.get("sortdir", "desc")
-        txlist, _ = process_txlist(
-            wallet.full_utxo,
-            idx=0,
-            limit=0,
-            search=search,
-            sortby=sortby,
-            sortdir=sortdir,
+        txlist = wallet.utxo_view().iter_query(
+            search=search, sortby=sortby, sortdir=sortdir
         )
         # stream the response as the data is generated
         response = Response(
@@ -788,14 +782,20 @@ def asset_balances(wallet_alias):
 def wallet_overview_txs_csv():
     try:
         validate_merkle_proofs = app.specter.config.get("validate_merkle_proofs", False)
-        txlist = app.specter.wallet_manager.full_txlist(
-            validate_merkle_proofs=validate_merkle_proofs,
-        )
         search = request.args.get("search", None)
         sortby = request.args.get("sortby", "time")
         sortdir = request.args.get("sortdir", "desc")
-        txlist, _ = process_txlist(
-            txlist, idx=0, limit=0, search=search, sortby=sortby, sortdir=sortdir
+        txlist = iter_merged_txlists(
+            [
+                (
+                    wallet.alias,
+                    wallet.txlist_view(validate_merkle_proofs=validate_merkle_proofs),
+                )
+                for wallet in app.specter.wallet_manager.wallets.values()
+            ],
+            search=search,
+            sortby=sortby,
+            sortdir=sortdir,
         )
         includePricesHistory = request.args.get("exportPrices", "false") == "true"
         # stream the response as the data is generated
@@ -818,12 +818,17 @@ def wallet_overview_txs_csv():
 @login_required
 def wallet_overview_utxo_csv():
     try:
-        txlist = app.specter.wallet_manager.full_utxo()
         search = request.args.get("search", None)
         sortby = request.args.get("sortby", "time")
         sortdir = request.args.get("sortdir", "desc")
-        txlist, _ = process_txlist(
-            txlist, idx=0, limit=0, search=search, sortby=sortby, sortdir=sortdir
+        txlist = iter_merged_txlists(
+            [
+                (wallet.alias, wallet.utxo_view())
+                for wallet in app.specter.wallet_manager.wallets.values()
+            ],
+            search=search,
+            sortby=sortby,
+            sortdir=sortdir,
         )
         includePricesHistory = request.args.get("exportPrices", "false") == "true"
         # stream the response as the data is generated
@@ -845,6 +850,7 @@ def wallet_overview_utxo_csv():
 
 ################## Helpers #######################
 
+
 # Transactions list to user-friendly CSV format
 def txlist_to_csv(
     wallet: Wallet, _txlist, includePricesHistory=False, amount_logic="flow"
@@ -852,19 +858,8 @@ def txlist_to_csv(
     """transforms a txlist into a csv-stream. This function is not returning but yielding. As such it needs to be called
     via wrapping it in stream_with_context
     see https://flask.palletsprojects.com/en/1.1.x/patterns/streaming/#streaming-with-context for details
+    The txlist can be any iterable (e.g. TxListView.iter_query()), each tx is only read when its row gets written.
     """
-    txlist: List[WalletAwareTxItem] = []
-    for tx in _txlist:
-
-        if isinstance(tx["address"], list):
-            tx_copy = tx.copy()
-            # No idea how this could be?!
-            for i in range(0, len(tx["address"])):
-                tx_copy["address"] = tx["address"][i]
-                tx_copy["amount"] = tx["flow_amount"][i]
-                txlist.append(tx_copy.copy())
-        else:
-            txlist.append(tx.copy())
     data = StringIO()
     w = csv.writer(data)
     # write header
@@ -895,9 +890,14 @@ def txlist_to_csv(
     data.seek(0)
     data.truncate(0)
 
+    prices = (
+        DailyPriceSeries(app.specter, get_price_at=get_price_at)
+        if includePricesHistory
+        else None
+    )
     # write each log item
     _wallet: Wallet = wallet
-    for tx in txlist:
+    for tx in _txlist:
         if not wallet:
             wallet_alias = tx.get("wallet_alias", None)
             try:
@@ -905,58 +905,61 @@ def txlist_to_csv(
             except Exception as e:
                 logger.exception(e)
                 continue
-        label = _wallet.getlabel(tx["address"])
-        if label == tx["address"]:
-            label = ""
-        tx_raw = _wallet.gettransaction(tx["txid"])
-        if not tx.get("blockheight", None):
-            if tx_raw.get("blockheight", None):
-                tx["blockheight"] = tx_raw["blockheight"]
-            else:
-                tx["blockheight"] = "Unconfirmed"
-        # For txs, the relevant amount is flow_amount
-        if amount_logic == "flow":
-            tx["amount"] = tx["flow_amount"]
-        amount_price = "not supported"
-        rate = "not supported"
+        blockheight = tx.get("blockheight", None)
+        if not blockheight:
+            tx_raw = _wallet.gettransaction(tx["txid"]) or {}
+            blockheight = tx_raw.get("blockheight", None) or "Unconfirmed"
         if tx.get("blocktime"):
             timestamp = tx["blocktime"]
         else:
             timestamp = tx["time"]
-        if includePricesHistory:
+        rate = "not supported"
+        if prices:
             try:
-                print(f"meh {app.specter.user}")
-                rate, _ = get_price_at(app.specter, timestamp=timestamp)
-                rate = float(rate)
+                rate = prices.price_at(timestamp)
                 if app.specter.unit == "sat":
                     rate = rate / 1e8
-                amount_price = float(tx["flow_amount"]) * rate
-                amount_price = round(amount_price * 100) / 100
-                if app.specter.unit == "sat":
-                    rate = round(1 / rate)
             except SpecterError as se:
                 logger.error(se)
-                success = False
                 rate = "-"
 
-        row = (
-            time.strftime("%Y-%m-%d", time.localtime(timestamp)),
-            label,
-            tx["category"],
-            round(tx.get("amount", 9999), (0 if app.specter.unit == "sat" else 8)),
-            amount_price,
-            rate,
-            tx["txid"],
-            tx["address"],
-            tx["blockheight"],
-            time.strftime(("%Y-%m-%d %H:%M:%S"), time.localtime(timestamp)),
-        )
-        if not wallet:
-            row = (tx.get("wallet_alias", ""),) + row
-        w.writerow(row)
-        yield data.getvalue()
-        data.seek(0)
-        data.truncate(0)
+        # For txs, the relevant amount is flow_amount
+        amount_key = "flow_amount" if amount_logic == "flow" else "amount"
+        if isinstance(tx["address"], list):
+            # a batch tx, one row per address
+            rows = [
+                (address, tx["flow_amount"][i])
+                for i, address in enumerate(tx["address"])
+            ]
+        else:
+            rows = [(tx["address"], tx.get(amount_key, 9999))]
+        for address, amount in rows:
+            label = _wallet.getlabel(address)
+            if label == address:
+                label = ""
+            amount_price = "not supported"
+            if isinstance(rate, float):
+                amount_price = round(float(amount) * rate * 100) / 100
+            row = (
+                time.strftime("%Y-%m-%d", time.localtime(timestamp)),
+                label,
+                tx["category"],
+                round(amount, (0 if app.specter.unit == "sat" else 8)),
+                amount_price,
+                round(1 / rate)
+                if isinstance(rate, float) and app.specter.unit == "sat"
+                else rate,
+                tx["txid"],
+                address,
+                blockheight,
+                time.strftime(("%Y-%m-%d %H:%M:%S"), time.localtime(timestamp)),
+            )
+            if not wallet:
+                row = (tx.get("wallet_alias", ""),) + row
+            w.writerow(row)
+            yield data.getvalue()
+            data.seek(0)
+            data.truncate(0)
 
 
 # Addresses list to user-friendly CSV format
@@ -1055,67 +1058,14 @@ def wallet_addresses_list_to_csv(addresses_list):
 
 def process_txlist(txlist, idx=0, limit=100, search=None, sortby=None, sortdir="asc"):
     """Prepares the txlist for the ui filtering it with the search-criterias and sorting it
+    txlist might be a list or a (cached) TxListView, see Wallet.txlist_view()
     returns a tuple of the txlist and the pagecount
     """
-    if search:
-        search_lower = search.lower()
-        txlist = [
-            tx
-            for tx in txlist
-            if search_lower in tx["txid"]
-            or (
-                any(search in address for address in tx["address"])
-                if isinstance(tx["address"], list)
-                else search in tx["address"]
-            )
-            or (
-                any(search_lower in label.lower() for label in tx.get("label", ""))
-                if isinstance(tx.get("label", ""), list)
-                else search_lower in tx.get("label", "").lower()
-            )
-            or (
-                any(search in str(amount) for amount in tx["amount"])
-                if isinstance(tx["flow_amount"], list)
-                else search in str(tx["flow_amount"])
-            )
-            or search in str(tx["confirmations"])
-            or search in str(tx["time"])
-            or search
-            in str(format(datetime.fromtimestamp(tx["time"]), "%d.%m.%Y %H:%M"))
-            or (
-                float(search.split(" ")[1]) > tx["amount"]
-                if search.split(" ")[0] == "<"
-                else False
-            )
-            or (
-                float(search.split(" ")[1]) < tx["amount"]
-                if search.split(" ")[0] == ">"
-                else False
-            )
-        ]
-    if sortby:
-
-        def sort(tx):
-            val = tx.get(sortby, None)
-            final = val
-            if val:
-                if isinstance(val, list):
-                    if isinstance(val[0], Number):
-                        final = sum(val)
-                    elif isinstance(val[0], str):
-                        final = sorted(
-                            val, key=lambda s: s.lower(), reverse=sortdir != "asc"
-                        )[0].lower()
-                elif isinstance(val, str):
-                    final = val.lower()
-            return final
-
-        txlist = sorted(txlist, key=sort, reverse=sortdir != "asc")
-    if limit:
-        page_count = (len(txlist) // limit) + (0 if len(txlist) % limit == 0 else 1)
-        txlist = txlist[limit * idx : limit * (idx + 1)]
-    else:
-        page_count = 1
+    if not isinstance(txlist, TxListView):
+        txlist = TxListView(txlist)
+    txlist, page_count = txlist.query(
+        idx=idx, limit=limit, search=search, sortby=sortby, sortdir=sortdir
+    )
     # add assets
     if app.specter.is_liquid:
         for tx in txlist:
@@ -51,9 +51,11 @@ from .specter_error import ExtProcTimeoutException, SpecterError
 from .tor_daemon import TorDaemonController
 from .user import User
 from .util.checker import Checker
+from .util.fee_estimation import fee_estimator
 from .util.price_providers import update_price
 from .util.setup_states import SETUP_STATES
 from .util.tor import get_tor_daemon_suffix
+from .util.zmq_listener import ZMQListener
 from .util.version import VersionChecker
 
 logger = logging.getLogger(__name__)
@@ -199,6 +201,8 @@ class Specter:
         # a list of functions that are called at cleanup_on_exit taking in each signum, frame
 
     def cleanup_on_exit(self, signum=0, frame=0):
+        self.stop_zmq_listener()
+
         if self._tor_daemon:
             logger.info("Specter exit cleanup: Stopping Tor daemon")
             self._tor_daemon.stop_tor_daemon()
@@ -276,8 +280,42 @@ class Specter:
 
     def check_blockheight(self):
         if self.node.check_blockheight():
+            fee_estimator.on_new_block()
             self.check(check_all=True)
 
+    def start_zmq_listener(self):
+        """Subscribes to the ZMQ notifications of the active node (if it publishes them) in order to
+        refresh the affected wallets immediately rather than on the next check.
+        """
+        self.stop_zmq_listener()
+        if not ZMQListener.is_available():
+            logger.warning("ZMQ notifications are activated but pyzmq is not installed")
+            return
+        endpoints = self.node.zmq_endpoints()
+        if not endpoints:
+            logger.info(f"Node {self.node.alias} doesn't publish ZMQ notifications")
+            return
+        self.zmq_listener = ZMQListener(
+            endpoints, self.on_zmq_notification, desc=self.node.alias
+        )
+        self.zmq_listener.start()
+
+    def stop_zmq_listener(self):
+        if getattr(self, "zmq_listener", None):
+            self.zmq_listener.stop()
+            self.zmq_listener = None
+
+    def on_zmq_notification(self, topic, body):
+        """Passes a ZMQ notification of the active node to the wallet managers of all users"""
+        if topic == "hashblock" and self.rpc is not None and self.rpc.cache is not None:
+            # the cached results of the old tip are invalid now
+            self.rpc.cache.set_tip(body.hex())
+        if topic == "hashblock":
+            fee_estimator.on_new_block()
+        u: User
+        for u in self.user_manager.users:
+            u.wallet_manager.on_zmq_notification(topic, body)
+
     def get_user_folder_id(self, user=None):
         """
         Returns the suffix for the user wallets and devices.
@@ -327,6 +365,9 @@ class Specter:
         )  # If the node alias doesn't exist, this throws an exception preventing incorrectly updating the config.
         self.config_manager.update_active_node(node_alias)
         self.check()
+        if getattr(self, "zmq_listener", None):
+            # listen to the new node instead
+            self.start_zmq_listener()
 
     def update_setup_status(self, software_name, stage):
         self.setup_status[software_name]["error"] = ""
@@ -0,0 +1,73 @@
+import atexit
+import logging
+import threading
+import time
+
+from ..persistence import write_json_file
+from .flask import FlaskThread
+
+logger = logging.getLogger(__name__)
+
+
+class DebouncedWriter:
+    """Writes json-files in the background. All the writes which get scheduled within DELAY seconds
+    are written together and only the last content of each file is written, so a burst of changes
+    (e.g. labels, keypool-refills) costs one write (and one storage-callback) per file.
+    Call flush() before reading one of the files from disk and discard() before deleting one.
+    """
+
+    # seconds, 0 writes immediately
+    DELAY = 0.5
+
+    def __init__(self):
+        # path -> content which still needs to be written
+        self._pending = {}
+        self._lock = threading.Lock()
+        # keeps the writes of the same file in order
+        self._write_lock = threading.Lock()
+        self.writes = 0
+        atexit.register(self.flush)
+
+    def schedule(self, path, content):
+        """Writes content to path within DELAY seconds (replacing a content which is still pending)"""
+        if self.DELAY <= 0:
+            with self._write_lock:
+                self._write(path, content)
+            return
+        with self._lock:
+            start_thread = not self._pending
+            self._pending[path] = content
+        if start_thread:
+            FlaskThread(target=self._flush_later).start()
+
+    def _flush_later(self):
+        time.sleep(self.DELAY)
+        self.flush()
+
+    def flush(self, path=None):
+        """Writes all the pending files (or only path) now"""
+        with self._write_lock:
+            with self._lock:
+                if path is None:
+                    pending, self._pending = self._pending, {}
+                elif path in self._pending:
+                    pending = {path: self._pending.pop(path)}
+                else:
+                    pending = {}
+            for pending_path, content in pending.items():
+                try:
+                    self._write(pending_path, content)
+                except Exception as e:
+                    logger.exception(e)
+
+    def _write(self, path, content):
+        write_json_file(content, path)
+        self.writes += 1
+
+    def discard(self, path):
+        """Drops a pending write of path, e.g. as the file is going to be deleted"""
+        with self._lock:
+            self._pending.pop(path, None)
+
+    def is_pending(self, path):
+        return path in self._pending
@@ -1,4 +1,7 @@
 import logging
+import threading
+import time
+from concurrent.futures import Future
 from json import JSONEncoder
 
 import requests
@@ -8,6 +11,10 @@ from requests.exceptions import ConnectionError
 logger = logging.getLogger(__name__)
 
 
+# the fee estimation of Bitcoin Core for each of the results, in blocks
+CORE_TARGETS = {"fastestFee": 1, "halfHourFee": 3, "hourFee": 6, "minimumFee": 20}
+
+
 class FeeEstimationResult:
     """A tiny object to pass the Fee Estimation Results around including a list of errors which might have occurred"""
 
@@ -35,18 +42,129 @@ class FeeEstimationResult:
         """Appends an error-message to the list of existing ones"""
         self._error_messages.append(message)
 
+    def copy(self):
+        fee_estimation_result = FeeEstimationResult(dict(self.result))
+        fee_estimation_result._error_messages = list(self.error_messages)
+        return fee_estimation_result
+
 
 class FeeEstimationResultEncoder(JSONEncoder):
     def default(self, o):
-        raw = o.__dict__
-        raw["result"] = raw["_result"]
-        del raw["_result"]
-        raw["error_messages"] = raw["_error_messages"]
-        del raw["_error_messages"]
-        return raw
+        return {"result": o.result, "error_messages": o.error_messages}
+
+
+class FeeSettings:
+    """The settings of the requesting user which the fee estimation depends on. Most of them are
+    resolved via current_user, so they are captured while the request is there and the refresh
+    on a new block (running in its own thread, where current_user is the admin) uses them as well.
+    """
+
+    def __init__(self, specter):
+        self.is_liquid = specter.is_liquid
+        self.fee_estimator = specter.fee_estimator
+        self.only_tor = specter.only_tor
+        self.config = specter.config
+        self.rpc = specter.rpc
+        self._requests_sessions = {
+            force_tor: specter.requests_session(force_tor=force_tor)
+            for force_tor in (False, True)
+        }
+
+    def requests_session(self, force_tor=False):
+        return self._requests_sessions[force_tor]
+
+
+class FeeEstimator:
+    """Shares the fee estimation between all requests (and users) for TTL seconds per estimator and node.
+    Concurrent requests for an estimation which is not cached wait for the same fetch rather than
+    each making its own (Tor) round-trip. On a new block the cached estimations are dropped and the
+    last requested one gets refreshed in the background (with the settings of the user who fetched it),
+    so the next send page doesn't need to wait for it.
+    """
+
+    # seconds, 0 disables the cache
+    TTL = 60
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> (timestamp, FeeEstimationResult)
+        self._results = {}
+        # key -> Future of the fetch in flight
+        self._fetches = {}
+        # key -> (FeeSettings, config) of the last fetch, used for refreshing
+        self._settings = {}
+        # key of the last request
+        self._last_key = None
+        self.fetch_count = 0
+
+    @staticmethod
+    def _key(specter):
+        custom_url = (
+            specter.config.get("fee_estimator_custom_url")
+            if specter.fee_estimator == "custom"
+            else None
+        )
+        return (specter.fee_estimator, custom_url, specter.active_node_alias)
+
+    def get(self, specter, config):
+        """Returns the FeeEstimationResult, see get_fees"""
+        key = self._key(specter)
+        with self._lock:
+            self._last_key = key
+            cached = self._results.get(key)
+            if cached and time.time() - cached[0] < self.TTL:
+                return cached[1].copy()
+            fetch = self._fetches.get(key)
+            if fetch is None:
+                fetch = self._fetches[key] = Future()
+                leader = True
+            else:
+                leader = False
+        if leader:
+            self._fetch(key, FeeSettings(specter), config, fetch)
+        return fetch.result().copy()
+
+    def _fetch(self, key, settings, config, fetch):
+        try:
+            self.fetch_count += 1
+            result = _get_fees_failsafe(settings, config)
+            with self._lock:
+                if self.TTL > 0:
+                    self._results[key] = (time.time(), result)
+                    self._settings[key] = (settings, config)
+                self._fetches.pop(key, None)
+            fetch.set_result(result)
+        except BaseException as e:
+            with self._lock:
+                self._fetches.pop(key, None)
+            fetch.set_exception(e)
+            raise
+
+    def on_new_block(self):
+        """Drops the cached estimations and refreshes the last requested one in the background"""
+        with self._lock:
+            self._results.clear()
+            key = self._last_key
+            if self.TTL == 0 or key not in self._settings or key in self._fetches:
+                return
+            settings, config = self._settings[key]
+            fetch = self._fetches[key] = Future()
+        thread = threading.Thread(
+            target=self._fetch, args=(key, settings, config, fetch)
+        )
+        thread.daemon = True
+        thread.start()
+
+
+fee_estimator = FeeEstimator()
 
 
 def get_fees(specter, config):
+    """Returns the FeeEstimationResult of the configured estimator, cached by the FeeEstimator"""
+    return fee_estimator.get(specter, config)
+
+
+def _get_fees_failsafe(specter, config):
     try:
         return _get_fees(specter, config)
     except Exception as e:
@@ -158,21 +276,18 @@ def _get_fees(specter, config):
                 f"Timeout while fetching fee estimation from custom provider (timeout {timeout}). Using Bitcoin Core instead."
             )
 
+    # all the targets in one batch
+    fee_estimates = [
+        response["result"] or {}
+        for response in specter.rpc.multi(
+            [("estimatesmartfee", blocks) for blocks in CORE_TARGETS.values()]
+        )
+    ]
     fee_estimation_result.result = {
-        "fastestFee": int(
-            (float(specter.estimatesmartfee(1).get("feerate", 0.00001)) / 1000) * 1e8
-        ),
-        "halfHourFee": int(
-            (float(specter.estimatesmartfee(3).get("feerate", 0.00001)) / 1000) * 1e8
-        ),
-        "hourFee": int(
-            (float(specter.estimatesmartfee(6).get("feerate", 0.00001)) / 1000) * 1e8
-        ),
-        "minimumFee": int(
-            (float(specter.estimatesmartfee(20).get("feerate", 0.00001)) / 1000) * 1e8
-        ),
+        name: int((float(fee_estimate.get("feerate", 0.00001)) / 1000) * 1e8)
+        for name, fee_estimate in zip(CORE_TARGETS, fee_estimates)
     }
-    fee_estimate = specter.estimatesmartfee(1)
+    fee_estimate = fee_estimates[0]
     if "feerate" not in fee_estimate:
         # regtest does not seem to have a reasonable result for estimatesmartfee.
         # The error-message is covering "transactions" and so the cypress-tests are not succeeding
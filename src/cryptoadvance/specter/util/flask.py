@@ -1,3 +1,4 @@
+import functools
 import logging
 from flask import Flask
 from flask import current_app as app
@@ -33,3 +34,22 @@ class FlaskThread(Thread):
         else:
             logger.debug(f"starting new Thread: {self._target.__name__}")
             super().run()
+
+
+def with_app_context(func):
+    """Returns a function which calls func within the current app-context (if there is one).
+    Useful if func needs to run in another thread which is not a FlaskThread, e.g. in a ThreadPoolExecutor.
+    """
+    try:
+        flask_app = app._get_current_object()
+    except RuntimeError as e:
+        if str(e).startswith("Working outside of application context."):
+            return func
+        raise e
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with flask_app.app_context():
+            return func(*args, **kwargs)
+
+    return wrapper
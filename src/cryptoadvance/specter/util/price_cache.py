@@ -0,0 +1,229 @@
+"""
+A persistent cache of historical prices, see PriceCache
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from ..persistence import _write_json_file, read_json_file
+from ..specter_error import SpecterError
+from .requests_tools import failsafe_request_get
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 86400
+
+
+class PriceCache:
+    """Caches the closing prices of hourly and daily candles per exchange and currency.
+    A missing candle gets fetched together with the ones around it with one range request,
+    so valuing many txs costs a few requests rather than one per tx.
+    Each series (exchange, currency, resolution) is stored as a json-file in path and the
+    MAX_SERIES most recently used ones are kept in memory, so most lookups are dict-lookups.
+    Candles which are not complete yet are never cached.
+    The base-urls are class-attributes so they can be pointed elsewhere (e.g. in tests).
+    """
+
+    EXCHANGES = ["bitstamp", "spotbit_bitstamp", "spotbit_gemini"]
+    BITSTAMP_URL = "https://www.bitstamp.net"
+    SPOTBIT_URL = (
+        "http://r5sru63gzyrnaayaua2ydo32f4hf6vd33bq6qmtktx3wjoib2cwi2gqd.onion"
+    )
+    # candles per request, bitstamp returns up to 1000 candles, spotbit returns one row per minute
+    CANDLES_PER_REQUEST = {"bitstamp": 1000}
+    SPOTBIT_MINUTES_PER_REQUEST = 1440
+    # number of series kept in memory
+    MAX_SERIES = 8
+
+    def __init__(self, path=None):
+        """:param path: the folder for the json-files, None to keep the prices only in memory"""
+        self.path = path
+        if path and not os.path.isdir(path):
+            os.makedirs(path)
+        # (exchange, currency, resolution) -> {timestamp of the candle: close or None}
+        self._series = OrderedDict()
+        self._lock = threading.RLock()
+        # key -> Future of the fetch in flight, the lock isn't held while fetching
+        self._fetches = {}
+        self.requests = 0
+
+    @classmethod
+    def supports(cls, exchange):
+        return exchange in cls.EXCHANGES
+
+    def price_at(
+        self, requests_session, exchange, currency, timestamp, resolution=HOUR
+    ):
+        """Returns the closing price of the candle containing timestamp or None if there is none.
+        Raises a SpecterError if the request fails.
+        """
+        candle = int(timestamp) - int(timestamp) % resolution
+        return self.prices(
+            requests_session, exchange, currency, candle, candle, resolution
+        )[candle]
+
+    def prices(self, requests_session, exchange, currency, start, end, resolution=DAY):
+        """Returns {timestamp of the candle: close or None} for all candles from start to end"""
+        if not self.supports(exchange):
+            raise SpecterError(f"{exchange} does not support historic price ranges")
+        key = (exchange, currency, resolution)
+        candles = range(int(start) - int(start) % resolution, int(end) + 1, resolution)
+        while True:
+            with self._lock:
+                series = self._get_series(key)
+                missing = [candle for candle in candles if candle not in series]
+                if not missing:
+                    return {candle: series[candle] for candle in candles}
+                fetch = self._fetches.get(key)
+                leader = fetch is None
+                if leader:
+                    fetch = self._fetches[key] = Future()
+            if leader:
+                break
+            # another thread fetches this series, maybe the candles we're missing
+            fetch.result()
+        try:
+            complete, incomplete = self._fill(
+                requests_session, key, missing[0], missing[-1]
+            )
+            with self._lock:
+                series = self._get_series(key)
+                series.update(complete)
+                self._save(key, series)
+                result = {
+                    candle: series[candle]
+                    if candle in series
+                    else incomplete.get(candle)
+                    for candle in candles
+                }
+        except BaseException as e:
+            with self._lock:
+                self._fetches.pop(key, None)
+            fetch.set_exception(e)
+            raise
+        with self._lock:
+            self._fetches.pop(key, None)
+        fetch.set_result(None)
+        return result
+
+    @classmethod
+    def candles_per_request(cls, exchange, resolution):
+        """How many candles one request returns, e.g. to size the ranges requested with prices"""
+        if exchange.startswith("spotbit_"):
+            return max(1, cls.SPOTBIT_MINUTES_PER_REQUEST * 60 // resolution)
+        return cls.CANDLES_PER_REQUEST[exchange]
+
+    def _fill(self, requests_session, key, start, end):
+        """Fetches the candles from start to end and the ones around them which fit into the requests.
+        Returns the prices of the complete candles (None for the misses) and of the ones which
+        are not complete yet as they don't get cached.
+        """
+        exchange, currency, resolution = key
+        now = int(time.time())
+        current = now - now % resolution
+        if start > current:
+            # nothing to fetch in the future
+            return {}, {}
+        per_request = self.candles_per_request(exchange, resolution)
+        # fill up the last request with the candles around
+        requested = (end - start) // resolution + 1
+        margin = (-requested) % per_request // 2 * resolution
+        fetch_start = max(0, start - margin)
+        fetch_end = min(end + margin, current)
+        fetched = {}
+        for chunk_start in range(fetch_start, fetch_end + 1, per_request * resolution):
+            chunk_end = min(chunk_start + (per_request - 1) * resolution, fetch_end)
+            self.requests += 1
+            for timestamp, price in self._fetch(
+                requests_session, exchange, currency, resolution, chunk_start, chunk_end
+            ).items():
+                fetched[timestamp - timestamp % resolution] = price
+        complete, incomplete = {}, {}
+        for candle in range(fetch_start, fetch_end + 1, resolution):
+            if candle < current:
+                # remember the misses as well
+                complete[candle] = fetched.get(candle)
+            elif candle in fetched:
+                incomplete[candle] = fetched[candle]
+        return complete, incomplete
+
+    def _fetch(self, requests_session, exchange, currency, resolution, start, end):
+        """Requests the candles from start to end, returns {timestamp: close}"""
+        try:
+            if exchange == "bitstamp":
+                ohlc = failsafe_request_get(
+                    requests_session,
+                    f"{self.BITSTAMP_URL}/api/v2/ohlc/btc{currency}/"
+                    f"?limit={(end - start) // resolution + 1}&step={resolution}&start={start}",
+                )["data"]["ohlc"]
+                return {
+                    int(candle["timestamp"]): float(candle["close"]) for candle in ohlc
+                }
+            # spotbit returns rows like [id, timestamp in ms, datetime, symbol, open, high, low, close, volume]
+            rows = failsafe_request_get(
+                requests_session,
+                f"{self.SPOTBIT_URL}/api/history/{currency}/{exchange[len('spotbit_'):]}"
+                f"?start={start * 1000}&end={(end + resolution) * 1000}",
+            )["data"]
+            # the close of a candle is the close of its last row
+            return {
+                int(row[1]) // 1000: float(row[7])
+                for row in sorted(rows, key=lambda row: int(row[1]))
+            }
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            raise SpecterError(f"Error as json doesn't look reasonable: {e}")
+
+    def _filename(self, key):
+        exchange, currency, resolution = key
+        return os.path.join(self.path, f"{exchange}_{currency}_{resolution}.json")
+
+    def _get_series(self, key):
+        series = self._series.get(key)
+        if series is None:
+            series = {}
+            if self.path and os.path.isfile(self._filename(key)):
+                try:
+                    series = {
+                        int(candle): price
+                        for candle, price in read_json_file(self._filename(key)).items()
+                    }
+                except Exception as e:
+                    logger.exception(e)
+            self._series[key] = series
+            while len(self._series) > self.MAX_SERIES:
+                self._series.popitem(last=False)
+        self._series.move_to_end(key)
+        return series
+
+    def _save(self, key, series):
+        if not self.path:
+            return
+        try:
+            # it's only a cache, so no storage-callback
+            _write_json_file(
+                {str(candle): price for candle, price in sorted(series.items())},
+                self._filename(key),
+            )
+        except Exception as e:
+            logger.exception(e)
+
+
+_price_caches = {}
+_price_caches_lock = threading.Lock()
+
+
+def get_price_cache(specter):
+    """Returns the PriceCache shared by all users of specter's data-folder"""
+    path = specter.data_folder
+    if not isinstance(path, str):
+        # e.g. not a real Specter
+        return PriceCache()
+    path = os.path.join(path, "prices")
+    with _price_caches_lock:
+        if path not in _price_caches:
+            _price_caches[path] = PriceCache(path)
+        return _price_caches[path]
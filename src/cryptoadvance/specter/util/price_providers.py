@@ -1,4 +1,5 @@
 import logging
+import time
 from json.decoder import JSONDecodeError
 
 import requests
@@ -7,10 +8,12 @@ from urllib3.exceptions import NewConnectionError
 
 from ..specter_error import SpecterError, handle_exception
 from ..util.requests_tools import failsafe_request_get
+from .price_cache import HOUR, PriceCache, get_price_cache
 
 logger = logging.getLogger(__name__)
 
 OZ_TO_G = 28.3495231
+SECONDS_PER_DAY = 86400
 
 currency_mapping = {
     "usd": {
@@ -130,11 +133,9 @@ def get_price_at(specter, timestamp="now"):
                         "https://www.bitstamp.net/api/v2/ticker/btc{}".format(currency),
                     )["last"]
                 else:
-                    price = requests_session.get(
-                        "https://www.bitstamp.net/api/v2/ohlc/btc{}/?limit=1&step=86400&start={}".format(
-                            currency, timestamp
-                        )
-                    ).json()["data"]["ohlc"][0]["close"]
+                    price = _get_cached_price_at(
+                        specter, requests_session, exchange, currency, timestamp
+                    )
             elif specter.price_provider.startswith("coindesk"):
                 if timestamp == "now":
                     price = failsafe_request_get(
@@ -144,28 +145,18 @@ def get_price_at(specter, timestamp="now"):
                 else:
                     raise SpecterError("coindesk does not support historic prices")
             elif specter.price_provider.startswith("spotbit"):
-                exchange = specter.price_provider.split("spotbit_")[1].split("_")[0]
-
                 if timestamp == "now":
 
                     price = failsafe_request_get(
                         requests_session,
                         "http://r5sru63gzyrnaayaua2ydo32f4hf6vd33bq6qmtktx3wjoib2cwi2gqd.onion/api/now/{}/{}".format(
-                            currency.upper(), exchange
+                            currency.upper(), exchange[len("spotbit_") :]
                         ),
                     )["close"]
                 else:
-                    price = failsafe_request_get(
-                        requests_session,
-                        # TODO: Fix to use `start` and `end` query date time parameters instead of path parameters
-                        # Hope that works like this:
-                        "http://r5sru63gzyrnaayaua2ydo32f4hf6vd33bq6qmtktx3wjoib2cwi2gqd.onion/api/history/{}/{}?start={}&end={}".format(
-                            currency,
-                            exchange,
-                            timestamp * 1000,
-                            (timestamp + 121) * 1000,
-                        ),
-                    )["data"][0][7]
+                    price = _get_cached_price_at(
+                        specter, requests_session, exchange, currency, timestamp
+                    )
             if weight_unit_convertible:
                 if specter.weight_unit == "gram":
                     price = price * OZ_TO_G
@@ -181,6 +172,98 @@ def get_price_at(specter, timestamp="now"):
         raise SpecterError(f"Error as json doesn't look reasonable: {ke}")
 
 
+def get_daily_prices(specter, start, end):
+    """returns the daily closing prices from start to end (timestamps) as a dict {day: price} where day
+    is the timestamp of the start of the day (UTC). Only supported by the exchanges of the PriceCache
+    which also caches them.
+    """
+    if not specter.price_check:
+        raise SpecterError(
+            "get_daily_prices called whereas specter.price_check is False"
+        )
+    (exchange, currency) = _parse_exchange_currency(specter.price_provider)
+    if not PriceCache.supports(exchange):
+        raise SpecterError(f"{exchange} does not support price ranges")
+    requests_session = specter.requests_session(force_tor=("spotbit" in exchange))
+    prices = get_price_cache(specter).prices(
+        requests_session, exchange, currency, start, end, resolution=SECONDS_PER_DAY
+    )
+    return {day: price for day, price in prices.items() if price is not None}
+
+
+class DailyPriceSeries:
+    """The daily prices for valuing many txs, e.g. in an export. Where the provider supports it, the prices
+    of the days around a requested day are fetched with get_daily_prices (as many as fit into one request,
+    at most WINDOW_DAYS on each side), otherwise there is one get_price_at per day.
+    Failures are remembered as well, so each day is requested at most once.
+    """
+
+    # a window of 2 * 499 + 1 days needs one request on bitstamp
+    WINDOW_DAYS = 499
+
+    def __init__(self, specter, get_price_at=get_price_at):
+        self.specter = specter
+        self._get_price_at = get_price_at
+        # day -> price or SpecterError
+        self._prices = {}
+        # days on each side of a requested day which get fetched with it
+        self._window_days = 0
+        try:
+            exchange = _parse_exchange_currency(specter.price_provider)[0]
+            self._ranges = bool(specter.price_check) and PriceCache.supports(exchange)
+        except SpecterError:
+            self._ranges = False
+        if self._ranges:
+            # e.g. spotbit returns the minutes of one day per request, so there is no window
+            self._window_days = min(
+                self.WINDOW_DAYS,
+                (PriceCache.candles_per_request(exchange, SECONDS_PER_DAY) - 1) // 2,
+            )
+
+    def price_at(self, timestamp):
+        """returns the price of the day of timestamp, raises a SpecterError if it's not available"""
+        day = int(timestamp) - int(timestamp) % SECONDS_PER_DAY
+        if day not in self._prices:
+            self._fetch(day)
+        price = self._prices[day]
+        if isinstance(price, SpecterError):
+            raise price
+        return price
+
+    def _fetch(self, day):
+        if self._ranges:
+            window = self._window_days * SECONDS_PER_DAY
+            try:
+                self._prices.update(
+                    get_daily_prices(
+                        self.specter, day - window, min(day + window, int(time.time()))
+                    )
+                )
+                if day in self._prices:
+                    return
+            except SpecterError as se:
+                logger.warning(
+                    f"{se} while fetching daily prices, fetching them one by one"
+                )
+                self._ranges = False
+        try:
+            self._prices[day] = float(
+                self._get_price_at(self.specter, timestamp=day)[0]
+            )
+        except SpecterError as se:
+            self._prices[day] = se
+
+
+def _get_cached_price_at(specter, requests_session, exchange, currency, timestamp):
+    """the close of the hour of timestamp from the PriceCache"""
+    price = get_price_cache(specter).price_at(
+        requests_session, exchange, currency, timestamp, resolution=HOUR
+    )
+    if price is None:
+        raise SpecterError(f"{exchange} has no {currency} price at {timestamp}")
+    return price
+
+
 def _parse_exchange_currency(exchange_currency):
     # e.g. "spotbit_bitstamp_eur" or "bitstamp_eur"
     arr = exchange_currency.split("_")
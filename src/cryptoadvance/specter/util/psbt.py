@@ -24,6 +24,9 @@ class AbstractTxContext:
     Allows to pass context Wallet -> SpecterPSBT -> SpecterScope -> SpecterTx
     """
 
+    # no attributes, so record types like TxItem can use __slots__
+    __slots__ = ()
+
     @property
     def network(self) -> dict:
         if hasattr(self, "parent"):
@@ -309,8 +312,13 @@ class SpecterPSBT(AbstractTxContext):
 
     @property
     def extra_input_weight(self) -> int:
-        redeem_script = self.descriptor.redeem_script()
-        witness_script = self.descriptor.witness_script()
+        return self.input_weight(self.descriptor)
+
+    @staticmethod
+    def input_weight(descriptor: Descriptor) -> int:
+        """Weight which signing adds to an input of the descriptor, as we estimate it"""
+        redeem_script = descriptor.redeem_script()
+        witness_script = descriptor.witness_script()
         weight = 0
         if redeem_script:
             weight += len(redeem_script.data) * 4
@@ -318,9 +326,9 @@ class SpecterPSBT(AbstractTxContext):
             weight += (
                 len(witness_script.data) + 2
             )  # number of items in witness + script length
-            if self.descriptor.is_basic_multisig:
-                threshold = self.descriptor.miniscript.args[0].num
-                num_keys = len(self.descriptor.keys)
+            if descriptor.is_basic_multisig:
+                threshold = descriptor.miniscript.args[0].num
+                num_keys = len(descriptor.keys)
                 weight += num_keys * 34
                 weight += threshold * 75
         else:
@@ -328,6 +336,34 @@ class SpecterPSBT(AbstractTxContext):
             weight += 75 + 34
         return weight
 
+    @staticmethod
+    def core_input_weight(descriptor: Descriptor) -> int:
+        """Weight which signing adds to an input of the descriptor, as Bitcoin Core
+        estimates it when funding a watch-only wallet (dummy signatures of 72 bytes
+        including the sighash byte, 64 bytes for taproot key path spends)
+        """
+        if descriptor.is_taproot:
+            # number of items, signature
+            return 1 + 1 + 64
+        sig = 1 + 72
+        if descriptor.is_basic_multisig:
+            script = descriptor.witness_script() or descriptor.redeem_script()
+            # empty item for CHECKMULTISIG, signatures, script
+            size = 1 + descriptor.miniscript.args[0].num * sig + len(script.serialize())
+        elif descriptor.key is not None:
+            # signature, pubkey
+            size = sig + 1 + 33
+        else:
+            # Core's dummy signer doesn't know much more either
+            return SpecterPSBT.input_weight(descriptor)
+        if not descriptor.is_segwit:
+            return size * 4
+        weight = 1 + size  # number of items in witness
+        if descriptor.sh:
+            # scriptSig pushes the witness program
+            weight += len(descriptor.redeem_script().serialize()) * 4
+        return weight
+
     @property
     def full_size(self) -> int:
         weight = len(self.psbt.tx.serialize()) * 4 + 4  # marker will be added
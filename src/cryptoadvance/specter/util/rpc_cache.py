@@ -0,0 +1,205 @@
+"""
+An opt-in cache for the responses of read-only RPC-calls, see BitcoinRPC.use_cache
+"""
+import copy
+import json
+import logging
+import threading
+import time
+
+from .rpc_metrics import rpc_metrics
+
+logger = logging.getLogger(__name__)
+
+# The result never changes for the same parameters
+IMMUTABLE = "immutable"
+# The result is valid until the best blockhash changes
+TIP = "tip"
+# The result might change with every new tx in the mempool, so it's held for a short time
+MEMPOOL = "mempool"
+
+
+class RpcCache:
+    """Caches the results of read-only RPC-calls per url, method and params.
+    Which calls get cached and for how long is defined per method in POLICIES.
+    All calls not listed there are passed through and all calls which might change the
+    state of the node or a wallet (everything not starting with one of READ_ONLY_PREFIXES)
+    clear all but the immutable results.
+    Whether the best blockhash changed is checked at most every TIP_CHECK_INTERVAL seconds
+    by adding a getbestblockhash to a request which would be made anyway.
+    """
+
+    POLICIES = {
+        "decoderawtransaction": IMMUTABLE,
+        "decodescript": IMMUTABLE,
+        "decodepsbt": IMMUTABLE,
+        "getdescriptorinfo": IMMUTABLE,
+        "deriveaddresses": IMMUTABLE,
+        "validateaddress": IMMUTABLE,
+        "getblockcount": TIP,
+        "getblockchaininfo": TIP,
+        "getblockhash": TIP,
+        "getblock": TIP,
+        "getblockheader": TIP,
+        "getaddressinfo": TIP,
+        "getmempoolinfo": MEMPOOL,
+        "getnetworkinfo": MEMPOOL,
+        "getwalletinfo": MEMPOOL,
+        "getbalances": MEMPOOL,
+        "getbalance": MEMPOOL,
+        "listunspent": MEMPOOL,
+        "listlockunspent": MEMPOOL,
+        "gettransaction": MEMPOOL,
+        "getrawtransaction": MEMPOOL,
+        "estimatesmartfee": MEMPOOL,
+    }
+    READ_ONLY_PREFIXES = (
+        "get",
+        "list",
+        "decode",
+        "derive",
+        "estimate",
+        "validate",
+        "analyze",
+        "test",
+        "uptime",
+        "help",
+    )
+    MEMPOOL_TTL = 2  # seconds
+    TIP_CHECK_INTERVAL = 2  # seconds
+    MAX_ENTRIES = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (url, method, params) -> (policy, timestamp, result)
+        self._entries = {}
+        self.tip = None
+        self.tip_checked = 0
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def key(cls, url, call):
+        method, *args = call
+        return (url, method, json.dumps(args))
+
+    def get(self, key, now=None):
+        """Returns the cached result or None if there is no valid one"""
+        now = now or time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            policy, timestamp, result = entry
+            if policy == MEMPOOL and now - timestamp > self.MEMPOOL_TTL:
+                del self._entries[key]
+                return None
+            return copy.deepcopy(result)
+
+    def put(self, key, result, now=None):
+        policy = self.POLICIES[key[1]]
+        with self._lock:
+            if len(self._entries) >= self.MAX_ENTRIES:
+                # dicts keep the insertion order, so this drops the oldest entry
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (policy, now or time.time(), copy.deepcopy(result))
+
+    def invalidate(self):
+        """Drops all but the immutable results"""
+        with self._lock:
+            self._entries = {
+                key: entry
+                for key, entry in self._entries.items()
+                if entry[0] == IMMUTABLE
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self.tip = None
+            self.tip_checked = 0
+
+    def set_tip(self, blockhash, now=None):
+        """Returns whether the tip changed"""
+        self.tip_checked = now or time.time()
+        if blockhash == self.tip:
+            return False
+        if self.tip is not None:
+            logger.debug(f"New tip {blockhash}, invalidating the rpc cache")
+        self.invalidate()
+        self.tip = blockhash
+        return True
+
+    def tip_check_due(self, now=None):
+        return (now or time.time()) - self.tip_checked > self.TIP_CHECK_INTERVAL
+
+    @classmethod
+    def is_read_only(cls, method):
+        return method in cls.POLICIES or method.startswith(cls.READ_ONLY_PREFIXES)
+
+    def multi(self, request, url, calls, **kwargs):
+        """Answers the calls from the cache where possible and makes one request for the rest
+        :param request: a function like BitcoinRPC.multi which makes the actual request
+        :param url: the url the calls are made to, part of the key
+        :return: the results in the same format (and order) as BitcoinRPC.multi
+        """
+        if not all(self.is_read_only(call[0]) for call in calls):
+            try:
+                return request(calls, **kwargs)
+            finally:
+                self.invalidate()
+        now = time.time()
+        results = [None] * len(calls)
+        keys = [None] * len(calls)
+        missing = []
+        for i, call in enumerate(calls):
+            if call[0] in self.POLICIES:
+                keys[i] = self.key(url, call)
+                result = self.get(keys[i], now)
+                if result is not None:
+                    results[i] = {"result": result, "error": None, "id": i}
+                    continue
+            missing.append(i)
+        tip_check = any(
+            self.POLICIES.get(call[0]) == TIP for call in calls
+        ) and self.tip_check_due(now)
+        if not missing and not tip_check:
+            self._count(len(calls), 0)
+            return results
+
+        request_calls = [calls[i] for i in missing]
+        if tip_check:
+            request_calls.append(("getbestblockhash",))
+        response = request(request_calls, **kwargs)
+        if tip_check:
+            best = response.pop() if len(response) == len(request_calls) else {}
+            if best.get("error") is None and self.set_tip(best.get("result"), now):
+                # the tip changed since the results were cached, so we need to ask again
+                stale = [
+                    i
+                    for i in range(len(calls))
+                    if i not in missing and self.POLICIES[calls[i][0]] != IMMUTABLE
+                ]
+                if stale:
+                    response.extend(request([calls[i] for i in stale], **kwargs))
+                    missing.extend(stale)
+        cacheable = len([i for i in missing if keys[i] is not None])
+        self._count(len(calls) - len(missing), cacheable)
+        for i, r in zip(missing, response):
+            if isinstance(r, dict):
+                r["id"] = i
+            results[i] = r
+            if (
+                keys[i] is not None
+                and isinstance(r, dict)
+                and r.get("error") is None
+                and "result" in r
+            ):
+                self.put(keys[i], r["result"], now)
+        return results
+
+    def _count(self, hits, misses):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+        rpc_metrics.observe_cache(hits, misses)
@@ -0,0 +1,172 @@
+"""
+Always-on metrics of the RPC-calls to the nodes, exposed in the Prometheus text format
+(see api/rest/resource_metrics.py)
+"""
+import bisect
+import threading
+
+
+class Histogram:
+    """A cumulative histogram as Prometheus defines it: a count per upper bound (le),
+    plus sum and count of all observations. Not thread-safe on its own, see RpcMetrics.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        # one more for +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self):
+        """Returns a list of (le, count) including +Inf"""
+        result = []
+        total = 0
+        for le, count in zip(self.buckets + ["+Inf"], self.counts):
+            total += count
+            result.append((le, total))
+        return result
+
+
+class RpcMetrics:
+    """Collects per method call counts, errors and latencies as well as batch sizes,
+    timeouts, connection errors and the bytes sent/received of all RPC requests.
+    Recording costs a lock and a couple of dict-lookups per request.
+    """
+
+    LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+    BATCH_SIZE_BUCKETS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000]
+    PREFIX = "specter_rpc"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = {}
+            self.errors = {}
+            self.latencies = {}
+            self.batch_sizes = Histogram(self.BATCH_SIZE_BUCKETS)
+            self.timeouts = 0
+            self.connection_errors = 0
+            self.bytes_sent = 0
+            self.bytes_received = 0
+            self.cache_hits = 0
+            self.cache_misses = 0
+
+    @classmethod
+    def request_label(cls, methods):
+        """The label of a request for the latency histogram: the method or "batch" if it's
+        a batch-request with different methods
+        """
+        if len(set(methods)) == 1:
+            return methods[0]
+        return "batch"
+
+    def observe_request(self, methods, duration, bytes_sent, bytes_received):
+        """Records a request which got an answer (successful or not)
+        :param methods: a list with the method of each call in the request
+        :param duration: how long the request took in seconds
+        """
+        label = self.request_label(methods)
+        with self._lock:
+            for method in methods:
+                self.calls[method] = self.calls.get(method, 0) + 1
+            if label not in self.latencies:
+                self.latencies[label] = Histogram(self.LATENCY_BUCKETS)
+            self.latencies[label].observe(duration)
+            self.batch_sizes.observe(len(methods))
+            self.bytes_sent += bytes_sent
+            self.bytes_received += bytes_received
+
+    def observe_errors(self, methods):
+        """Records an error for each of the methods (the results which have an "error")"""
+        with self._lock:
+            for method in methods:
+                self.errors[method] = self.errors.get(method, 0) + 1
+
+    def observe_timeout(self, methods, bytes_sent):
+        with self._lock:
+            self.timeouts += 1
+            self.bytes_sent += bytes_sent
+            for method in methods:
+                self.calls[method] = self.calls.get(method, 0) + 1
+
+    def observe_connection_error(self, methods):
+        with self._lock:
+            self.connection_errors += 1
+            for method in methods:
+                self.calls[method] = self.calls.get(method, 0) + 1
+
+    def observe_cache(self, hits, misses):
+        """Records the hits and misses of the RpcCache"""
+        with self._lock:
+            self.cache_hits += hits
+            self.cache_misses += misses
+
+    def to_prometheus(self) -> str:
+        """Returns all the metrics in the Prometheus text format"""
+        p = self.PREFIX
+        lines = []
+
+        def metric(name, mtype, description):
+            lines.append(f"# HELP {p}_{name} {description}")
+            lines.append(f"# TYPE {p}_{name} {mtype}")
+
+        def histogram(name, hist, labels=""):
+            sep = "," if labels else ""
+            for le, count in hist.cumulative_counts():
+                lines.append(f'{p}_{name}_bucket{{{labels}{sep}le="{le}"}} {count}')
+            labels = f"{{{labels}}}" if labels else ""
+            lines.append(f"{p}_{name}_sum{labels} {hist.sum}")
+            lines.append(f"{p}_{name}_count{labels} {hist.count}")
+
+        with self._lock:
+            metric("calls_total", "counter", "Number of RPC calls per method")
+            for method, count in sorted(self.calls.items()):
+                lines.append(f'{p}_calls_total{{method="{method}"}} {count}')
+            metric(
+                "errors_total", "counter", "Number of RPC calls per method which failed"
+            )
+            for method, count in sorted(self.errors.items()):
+                lines.append(f'{p}_errors_total{{method="{method}"}} {count}')
+            metric(
+                "request_duration_seconds",
+                "histogram",
+                'Latency of the RPC requests per method ("batch" for mixed batch requests)',
+            )
+            for method, hist in sorted(self.latencies.items()):
+                histogram("request_duration_seconds", hist, f'method="{method}"')
+            metric("batch_size", "histogram", "Number of calls per RPC request")
+            histogram("batch_size", self.batch_sizes)
+            metric(
+                "timeouts_total", "counter", "Number of RPC requests which timed out"
+            )
+            lines.append(f"{p}_timeouts_total {self.timeouts}")
+            metric(
+                "connection_errors_total",
+                "counter",
+                "Number of RPC requests which couldn't connect",
+            )
+            lines.append(f"{p}_connection_errors_total {self.connection_errors}")
+            metric("sent_bytes_total", "counter", "Bytes sent in RPC requests")
+            lines.append(f"{p}_sent_bytes_total {self.bytes_sent}")
+            metric("received_bytes_total", "counter", "Bytes received in RPC responses")
+            lines.append(f"{p}_received_bytes_total {self.bytes_received}")
+            metric("cache_hits_total", "counter", "RPC calls answered by the cache")
+            lines.append(f"{p}_cache_hits_total {self.cache_hits}")
+            metric(
+                "cache_misses_total", "counter", "Cacheable RPC calls sent to the node"
+            )
+            lines.append(f"{p}_cache_misses_total {self.cache_misses}")
+        return "\n".join(lines) + "\n"
+
+
+# The metrics of all the RPC-calls of this process
+rpc_metrics = RpcMetrics()
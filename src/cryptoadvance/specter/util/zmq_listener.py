@@ -0,0 +1,109 @@
+import logging
+
+from ..specter_error import SpecterError
+from .flask import FlaskThread
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zmq
+except ImportError as e:
+    zmq = None
+    logger.info(e)
+    logger.info("ZMQ notifications will not be available")
+
+
+class ZMQListener:
+    """
+    Subscribes to the ZMQ notifications of a Bitcoin Core node and calls the callback
+    with (topic, body) for each notification. The callback is called in the thread of the
+    listener, one notification after the other.
+    Bitcoin Core needs to be started with e.g.
+      zmqpubhashblock=tcp://127.0.0.1:28332
+      zmqpubrawtx=tcp://127.0.0.1:28333
+    """
+
+    TOPICS = ["hashblock", "rawtx"]
+    # milliseconds to wait for a notification before checking whether we're still running
+    POLL_TIMEOUT = 1000
+    # max number of notifications queued while the callback is busy, the newer ones get
+    # dropped then (the regular checks catch up on them)
+    RCVHWM = 1000
+
+    def __init__(self, endpoints, callback, desc="unknown"):
+        """ZMQListener Constructor
+        :param endpoints: a dict with the topic as key and the address as value, e.g. {"hashblock": "tcp://127.0.0.1:28332"}
+        :param callback: a function which gets called with the topic and the body (bytes) of a notification
+        :param desc: specifies an optional description used in logging
+        """
+        self.endpoints = {
+            topic: address
+            for topic, address in endpoints.items()
+            if topic in self.TOPICS
+        }
+        self.callback = callback
+        self.desc = desc
+        self.running = False
+        self.error_counter = 0
+
+    @classmethod
+    def is_available(cls):
+        return zmq is not None
+
+    def start(self):
+        if not self.is_available():
+            raise SpecterError("ZMQ notifications need pyzmq to be installed")
+        if not self.endpoints:
+            raise SpecterError(f"No ZMQ endpoints for {self.desc}")
+        if not self.running:
+            self.running = True
+            self.thread = FlaskThread(target=self.loop)
+            self.thread.daemon = True
+            self.thread.start()
+            logger.info(f"ZMQListener {self.desc} started for {self.endpoints}")
+        else:
+            logger.warning(f"ZMQListener {self.desc} started but ran already")
+
+    def stop(self):
+        self.running = False
+
+    def _create_sockets(self, context):
+        """One socket per address as Core might publish several topics on the same address"""
+        sockets = {}
+        for topic, address in self.endpoints.items():
+            if address not in sockets:
+                sockets[address] = context.socket(zmq.SUB)
+                sockets[address].setsockopt(zmq.RCVHWM, self.RCVHWM)
+                sockets[address].connect(address)
+            sockets[address].setsockopt(zmq.SUBSCRIBE, topic.encode())
+        return list(sockets.values())
+
+    def loop(self):
+        context = zmq.Context()
+        sockets = self._create_sockets(context)
+        poller = zmq.Poller()
+        for socket in sockets:
+            poller.register(socket, zmq.POLLIN)
+        try:
+            while self.running:
+                for socket, _ in poller.poll(self.POLL_TIMEOUT):
+                    # topic, body, sequence number
+                    topic, body, *_ = socket.recv_multipart()
+                    self._execute(topic.decode(), body)
+        finally:
+            for socket in sockets:
+                socket.close(linger=0)
+            context.term()
+            logger.info(f"ZMQListener {self.desc} stopped.")
+
+    def _execute(self, topic, body):
+        try:
+            self.callback(topic, body)
+        except Exception as e:
+            self.error_counter += 1
+            if self.error_counter <= 5:
+                logger.exception(
+                    f"ZMQListener {self.desc} threw {e} for the {self.error_counter}th time"
+                )
+            if self.error_counter == 5:
+                logger.error(f"The above Error-Message is from now on suppressed!")
@@ -1,3 +1,3 @@
-from .wallet import Wallet, purposes
+from .wallet import Wallet, purposes, delete_wallet_files
 from .addresslist import Address
 from .txlist import WalletAwareTxItem
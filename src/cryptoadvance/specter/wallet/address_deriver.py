@@ -0,0 +1,124 @@
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from embit.descriptor.arguments import AllowedDerivation, KeyOrigin
+
+logger = logging.getLogger(__name__)
+
+
+def _derive_addresses(descriptor_cls, branch_descriptor: str, network, start, end):
+    """Derives the addresses start..end-1 of a branch descriptor, runs in the process pool"""
+    desc = descriptor_cls.from_string(branch_descriptor)
+    return [desc.derive(idx).address(network) for idx in range(start, end)]
+
+
+class AddressDeriver:
+    """Derives the addresses of a wallet's descriptor.
+    The keys are derived down to the receiving and the change branch only once, so an address
+    costs one derivation per key rather than two. Derived addresses are memoized both ways:
+    (change, index) -> address and address -> (change, index).
+    Larger ranges can be derived in a process pool, see PROCESSES and PROCESS_THRESHOLD.
+    """
+
+    # number of processes for larger ranges, 0 derives everything in the calling thread
+    PROCESSES = 0
+    # min number of addresses for which it's worth to start a process pool
+    PROCESS_THRESHOLD = 1000
+
+    def __init__(self, descriptor, network):
+        self.descriptor = descriptor
+        self.network = network
+        self._branches = {}
+        self._addresses = {}
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def branch_descriptor(self, branch: int):
+        """The descriptor of the branch with all keys derived down to the branch,
+        e.g. [fgp/84h/0h/0h]xpub/<0;1>/* --> [fgp/84h/0h/0h/1]xpub'/* for branch 1
+        """
+        if branch not in self._branches:
+            desc = self.descriptor.branch(branch)
+            # branch() copies the keys, so we can change them
+            for k in desc.keys:
+                self._derive_key_to_branch(k)
+            self._branches[branch] = desc
+        return self._branches[branch]
+
+    @classmethod
+    def _derive_key_to_branch(cls, k):
+        """Derives the xpub of a key down to the wildcard (if possible)"""
+        if not k.is_extended or k.allowed_derivation is None:
+            return
+        indexes = k.allowed_derivation.indexes
+        if indexes[-1] is not None or None in indexes[:-1] or not indexes[:-1]:
+            return
+        path = indexes[:-1]
+        if any(idx >= 0x80000000 for idx in path):
+            # can't derive hardened from an xpub
+            return
+        # the same origin as Key.derive would create
+        if k.origin:
+            origin = KeyOrigin(k.origin.fingerprint, k.origin.derivation + path)
+        else:
+            origin = KeyOrigin(k.key.child(0).fingerprint, path)
+        k.key = k.key.derive(path)
+        k.origin = origin
+        k.allowed_derivation = AllowedDerivation([None])
+
+    def derive(self, index: int, branch: int):
+        """Same as descriptor.derive(index, branch_index=branch) but cheaper"""
+        return self.branch_descriptor(branch).derive(index)
+
+    def address(self, index: int, change: bool) -> str:
+        key = (bool(change), index)
+        address = self._addresses.get(key)
+        if address is None:
+            address = self.derive(index, int(change)).address(self.network)
+            self._remember(key, address)
+        return address
+
+    def addresses(self, start: int, end: int, change: bool) -> list:
+        """Returns the addresses start..end-1 of the receiving or change branch"""
+        change = bool(change)
+        missing = [
+            idx for idx in range(start, end) if (change, idx) not in self._addresses
+        ]
+        if (
+            self.PROCESSES > 0
+            and len(missing) >= self.PROCESS_THRESHOLD
+            and missing == list(range(missing[0], missing[-1] + 1))
+        ):
+            self._derive_in_processes(missing[0], missing[-1] + 1, change)
+        else:
+            for idx in missing:
+                self.address(idx, change)
+        return [self._addresses[(change, idx)] for idx in range(start, end)]
+
+    def _derive_in_processes(self, start, end, change):
+        branch_descriptor = self.branch_descriptor(int(change)).to_string()
+        chunk = -(-(end - start) // self.PROCESSES)
+        ranges = [(i, min(i + chunk, end)) for i in range(start, end, chunk)]
+        with ProcessPoolExecutor(max_workers=self.PROCESSES) as executor:
+            results = executor.map(
+                _derive_addresses,
+                *zip(
+                    *[
+                        (type(self.descriptor), branch_descriptor, self.network, s, e)
+                        for s, e in ranges
+                    ]
+                ),
+            )
+            for (s, e), addresses in zip(ranges, results):
+                for idx, address in zip(range(s, e), addresses):
+                    self._remember((change, idx), address)
+
+    def _remember(self, key, address):
+        with self._lock:
+            self._addresses[key] = address
+            self._indexes[address] = key
+
+    def lookup(self, address: str):
+        """Returns (change, index) of an address derived so far or None"""
+        return self._indexes.get(address)
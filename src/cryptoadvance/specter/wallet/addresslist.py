@@ -17,6 +17,9 @@ def to_bool(v):
 
 
 class Address(dict):
+    # no instance-__dict__, there is one Address per address of a wallet
+    __slots__ = ("rpc",)
+
     columns = [
         "address",  # str, address itself
         "index",  # int, derivation index
@@ -132,6 +135,8 @@ class AddressList(dict):
         super().__init__()
         self.path = path
         self.rpc = rpc
+        # gets incremented on every change (e.g. labels), useful to invalidate derived data
+        self.version = 0
         file_exists = False
         if os.path.isfile(self.path):
             try:
@@ -145,6 +150,7 @@ class AddressList(dict):
         self._file_exists = file_exists
 
     def save(self):
+        self.version += 1
         if len(list(self.keys())) > 0:
             write_csv(self.path, list(self.values()), self.AddressCls)
         self._file_exists = True
@@ -227,6 +233,7 @@ class AddressList(dict):
         addr_obj = self.get_address(address)
         addr_obj.set_service_id(service_id)
         addr_obj.set_label(label)
+        self.version += 1
         if autosave:
             self.save()
 
@@ -237,6 +244,7 @@ class AddressList(dict):
         """
         addr_obj = self.get_address(address)
         addr_obj.set_service_id(None)
+        self.version += 1
         if autosave:
             self.save()
 
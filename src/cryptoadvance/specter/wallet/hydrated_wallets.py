@@ -0,0 +1,58 @@
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class HydratedWallets:
+    """An LRU of the wallets which have their AddressList and TxList loaded into memory.
+    Wallets load them lazily from their csv-files (see Wallet._addresses), so the memory used
+    only grows with the history of the wallets which are actually used. Once more than MAX_WALLETS
+    are loaded, the tables of the least recently used wallet are dropped from memory (unless a thread
+    is still working with them, then the wallet becomes the most recently used one).
+    They have been persisted on every change and get loaded again on the next access.
+    """
+
+    # max number of wallets with loaded tables, 0 means no limit
+    MAX_WALLETS = 20
+
+    def __init__(self):
+        # id(wallet) -> weakref(wallet), the most recently used last
+        self._wallets = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def touch(self, wallet):
+        """Marks the wallet as the most recently used one and evicts the least recently used ones"""
+        key = id(wallet)
+        if self._wallets and next(reversed(self._wallets)) == key:
+            return
+        evict = []
+        with self._lock:
+            self._wallets[key] = weakref.ref(wallet)
+            self._wallets.move_to_end(key)
+            while self.MAX_WALLETS and len(self._wallets) > self.MAX_WALLETS:
+                _, ref = self._wallets.popitem(last=False)
+                if ref() is not None:
+                    evict.append(ref())
+        for cold_wallet in evict:
+            if cold_wallet._evict_tables():
+                logger.debug(f"Unloaded the addresses and txs of {cold_wallet.alias}")
+                self.evictions += 1
+                continue
+            # still in use, so it's rather a hot one
+            with self._lock:
+                self._wallets[id(cold_wallet)] = weakref.ref(cold_wallet)
+
+    def discard(self, wallet):
+        with self._lock:
+            self._wallets.pop(id(wallet), None)
+
+    def __contains__(self, wallet):
+        ref = self._wallets.get(id(wallet))
+        return ref is not None and ref() is wallet
+
+    def __len__(self):
+        return len(self._wallets)
@@ -0,0 +1,118 @@
+import logging
+import os
+import threading
+
+from ..persistence import delete_files, delete_folder, read_json_file, write_json_file
+
+logger = logging.getLogger(__name__)
+
+
+class PsbtStore:
+    """The pending PSBTs of a wallet by txid. Each PSBT is stored in its own json-file in the folder path
+    which contains its to_dict(), so the base64 together with the decoded data. Adding, updating or deleting
+    a PSBT only writes (or deletes) its own file and listing them (see to_dict) doesn't need to parse them.
+    The PSBTs get parsed on first access, e.g. store[txid].
+    """
+
+    def __init__(self, path, parse):
+        """:param parse: a function creating the SpecterPSBT from its dict"""
+        self.path = path
+        self._parse = parse
+        self._lock = threading.RLock()
+        # txid -> dict of the PSBT, the oldest first
+        self._records = {}
+        # txid -> SpecterPSBT for the ones which got parsed already
+        self._psbts = {}
+        if os.path.isdir(path):
+            records = {}
+            for fname in os.listdir(path):
+                if not fname.endswith(".json"):
+                    continue
+                try:
+                    records[fname[:-5]] = read_json_file(os.path.join(path, fname))
+                except Exception as e:
+                    logger.exception(e)
+            self._records = dict(
+                sorted(records.items(), key=lambda item: item[1].get("time", 0))
+            )
+
+    def _filename(self, txid):
+        return os.path.join(self.path, f"{txid}.json")
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(list(self._records))
+
+    def __contains__(self, txid):
+        return txid in self._records
+
+    def keys(self):
+        return list(self._records)
+
+    def __getitem__(self, txid):
+        with self._lock:
+            psbt = self._psbts.get(txid)
+            if psbt is None:
+                psbt = self._parse(self._records[txid])
+                self._psbts[txid] = psbt
+            return psbt
+
+    def get(self, txid, default=None):
+        if txid not in self:
+            return default
+        return self[txid]
+
+    def values(self):
+        return [self[txid] for txid in self]
+
+    def items(self):
+        return [(txid, self[txid]) for txid in self]
+
+    def __setitem__(self, txid, psbt):
+        with self._lock:
+            self._psbts[txid] = psbt
+            self.save(txid)
+
+    def save(self, txid):
+        """Writes the PSBT of txid, call it after changing the PSBT"""
+        with self._lock:
+            record = self[txid].to_dict()
+            self._write(txid, record)
+
+    def add_record(self, txid, record):
+        """Adds a PSBT by its dict (as returned by to_dict) without parsing it"""
+        with self._lock:
+            self._psbts.pop(txid, None)
+            self._write(txid, record)
+
+    def _write(self, txid, record):
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        write_json_file(record, self._filename(txid))
+        self._records[txid] = record
+
+    def __delitem__(self, txid):
+        with self._lock:
+            del self._records[txid]
+            self._psbts.pop(txid, None)
+            delete_files([self._filename(txid), self._filename(txid) + ".bkp"])
+
+    def utxo_dict(self, txid):
+        """The inputs of the PSBT of txid like SpecterPSBT.utxo_dict, without parsing it"""
+        return [
+            {"txid": inp["txid"], "vout": inp["vout"]}
+            for inp in self._records[txid]["inputs"]
+        ]
+
+    def to_dict(self):
+        """Returns the dicts of all PSBTs by txid (as SpecterPSBT.to_dict), without parsing them"""
+        return dict(self._records)
+
+    def delete(self):
+        """Deletes all the files"""
+        with self._lock:
+            self._records = {}
+            self._psbts = {}
+            delete_folder(self.path)
@@ -0,0 +1,154 @@
+"""
+Stores the raw transactions of a wallet in a single pack-file
+"""
+import logging
+import mmap
+import os
+import struct
+from threading import RLock
+from typing import Dict
+
+from ..persistence import append_binary, delete_file, delete_folder
+
+logger = logging.getLogger(__name__)
+
+
+class RawTxStore:
+    """An append-only pack-file with the raw (binary) transactions of a wallet.
+    Each record consists of a header (the txid as 32 bytes and the length of the tx as
+    4 bytes little-endian) followed by the serialized transaction.
+    The index (txid -> (offset, length)) is built on startup by only reading the headers and
+    the transactions are read via mmap, so accessing a tx doesn't need any syscall.
+    If a txid has been appended more than once, the last record wins.
+    """
+
+    HEADER = struct.Struct("<32sI")
+
+    def __init__(self, path, rawdir=None):
+        self.path = path
+        self._index = {}
+        self._mmap = None
+        self._lock = RLock()
+        try:
+            self._load_index()
+        except Exception as e:
+            logger.exception(e)
+        if rawdir and os.path.isdir(rawdir):
+            self.migrate(rawdir)
+
+    def _load_index(self):
+        if not os.path.isfile(self.path) or os.path.getsize(self.path) == 0:
+            return
+        mm = self._get_mmap()
+        offset = 0
+        while offset + self.HEADER.size <= len(mm):
+            txid, length = self.HEADER.unpack_from(mm, offset)
+            start = offset + self.HEADER.size
+            if start + length > len(mm):
+                break
+            self._index[txid.hex()] = (start, length)
+            offset = start + length
+        if offset != len(mm):
+            # an interrupted write, cut it off so we can append properly again
+            logger.warning(
+                f"Truncating {self.path} from {len(mm)} to {offset} bytes (incomplete record)"
+            )
+            self._close_mmap()
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+    def _get_mmap(self):
+        """Returns the mmap of the pack-file, (re)created if the file has grown"""
+        with self._lock:
+            if self._mmap is None:
+                with open(self.path, "rb") as f:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._mmap
+
+    def _close_mmap(self):
+        with self._lock:
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+
+    def __contains__(self, txid):
+        return txid in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def get(self, txid) -> bytes:
+        """Returns the raw transaction or None if it's not in the store"""
+        with self._lock:
+            if txid not in self._index:
+                return None
+            start, length = self._index[txid]
+            mm = self._get_mmap()
+            if start + length > len(mm):
+                # The file has grown since we've mapped it
+                self._close_mmap()
+                mm = self._get_mmap()
+            return mm[start : start + length]
+
+    def add(self, txs: Dict[str, bytes]):
+        """Appends the raw transactions (txid -> bytes) which are not in the store yet
+        with a single write.
+        """
+        with self._lock:
+            records = []
+            positions = {}
+            size = 0
+            for txid, raw in txs.items():
+                if txid in self._index or txid in positions or not raw:
+                    continue
+                size += self.HEADER.size
+                positions[txid] = (size, len(raw))
+                records.append(self.HEADER.pack(bytes.fromhex(txid), len(raw)))
+                records.append(bytes(raw))
+                size += len(raw)
+            if not records:
+                return
+            offset = append_binary(self.path, b"".join(records))
+            for txid, (start, length) in positions.items():
+                self._index[txid] = (offset + start, length)
+
+    def discard(self, txid):
+        """Forgets a tx. The record stays in the file until clear() is called, so it
+        will be back after a restart (which doesn't matter as the raw tx won't change).
+        """
+        with self._lock:
+            self._index.pop(txid, None)
+
+    def clear(self):
+        """Removes all txs and the pack-file"""
+        with self._lock:
+            self._close_mmap()
+            self._index = {}
+            delete_file(self.path)
+
+    def migrate(self, rawdir):
+        """Moves all <txid>.bin files from rawdir (the old format) into the pack-file
+        and deletes the rawdir afterwards
+        """
+        txs = {}
+        failed = False
+        for fname in os.listdir(rawdir):
+            txid, ext = os.path.splitext(fname)
+            if ext != ".bin" or txid in self:
+                continue
+            try:
+                with open(os.path.join(rawdir, fname), "rb") as f:
+                    txs[txid] = f.read()
+            except Exception as e:
+                failed = True
+                logger.exception(e)
+        try:
+            self.add(txs)
+            # keep the rawdir if something went wrong, the next start will try again
+            if not failed:
+                delete_folder(rawdir)
+            logger.info(
+                f"Migrated {len(txs)} raw transactions from {rawdir} to {self.path}"
+            )
+        except Exception as e:
+            logger.exception(e)
@@ -1,4 +1,5 @@
 import logging
+from ..specter_error import SpecterError
 from .abstract_wallet import AbstractWallet
 
 logger = logging.getLogger(__name__)
@@ -8,9 +9,15 @@ class TxFetcher:
     """A class to refactor the fetch_transaction_method which no one understands"""
 
     LISTTRANSACTIONS_BATCH_SIZE = 1000
+    # Use listsinceblock starting at the last processed block instead of paging through listtransactions
+    # (which is still used for the first sync, after clearing the cache and as a fallback)
+    INCREMENTAL_SYNC = True
 
     def __init__(self, wallet: AbstractWallet):
         self.wallet = wallet
+        # The blockhash and the txcount of the wallet the transactions are in sync with after this fetch
+        self.lastblock = None
+        self.txcount = None
 
     def _fetch_transactions(self):
 
@@ -51,17 +58,13 @@ class TxFetcher:
                 max_used_receiving + self.wallet.GAP_LIMIT
                 > self.wallet._addresses.max_index(change=False)
             ):
+                start = self.wallet.addresses.max_index(change=False)
+                end = max_used_receiving + self.wallet.GAP_LIMIT
                 addresses = [
-                    dict(
-                        address=self.wallet.get_address(
-                            idx, change=False, check_keypool=False
-                        ),
-                        index=idx,
-                        change=False,
-                    )
-                    for idx in range(
-                        self.wallet.addresses.max_index(change=False),
-                        max_used_receiving + self.wallet.GAP_LIMIT,
+                    dict(address=address, index=idx, change=False)
+                    for idx, address in zip(
+                        range(start, end),
+                        self.wallet.deriver.addresses(start, end, change=False),
                     )
                 ]
                 self.wallet.addresses.add(addresses, check_rpc=False)
@@ -72,17 +75,13 @@ class TxFetcher:
                 > self.wallet.addresses.max_index(change=True)
             ):
                 # Add change addresses until the new max address plus the GAP_LIMIT
+                start = self.wallet.addresses.max_index(change=True)
+                end = max_used_change + self.wallet.GAP_LIMIT
                 change_addresses = [
-                    dict(
-                        address=self.wallet.get_address(
-                            idx, change=True, check_keypool=False
-                        ),
-                        index=idx,
-                        change=True,
-                    )
-                    for idx in range(
-                        self.wallet.addresses.max_index(change=True),
-                        max_used_change + self.wallet.GAP_LIMIT,
+                    dict(address=address, index=idx, change=True)
+                    for idx, address in zip(
+                        range(start, end),
+                        self.wallet.deriver.addresses(start, end, change=True),
                     )
                 ]
                 self.wallet.addresses.add(change_addresses, check_rpc=False)
@@ -96,6 +95,9 @@ class TxFetcher:
             ]
         )
         self.wallet.transactions.add(txs)
+        if self.lastblock:
+            self.wallet.transactions.synced_blockhash = self.lastblock
+            self.wallet.transactions.synced_txcount = self.txcount
 
     def is_interesting_tx(self, tx: dict):
         """transactions that we don't know about,
@@ -122,6 +124,84 @@ class TxFetcher:
         """returns an array of interesting transactions (see is_interesting_tx() ) where txid is
         the key and the result is whatever listtransactions is retuirning as values
         """
+        if self.INCREMENTAL_SYNC:
+            arr = self.interesting_txs_since_block()
+            if arr is not None:
+                return arr
+        return self.interesting_txs_paged()
+
+    def interesting_txs_since_block(self):
+        """Like interesting_txs() but only asks for the txs since the last processed block via listsinceblock.
+        A reorg is handled by Core: the txs are listed since the fork point and the ones which are not in the
+        chain anymore are in "removed".
+        Returns None if that's not possible, in that case the caller needs to fall back to interesting_txs_paged():
+        * no block processed yet
+        * the block is not known by the node
+        * the wallet knows more new txs than listsinceblock returned (e.g. after a rescan or an import)
+        """
+        synced_blockhash = self.wallet.transactions.synced_blockhash
+        if not synced_blockhash:
+            return None
+        try:
+            res, walletinfo = self.wallet.rpc.multi(
+                [
+                    ("listsinceblock", synced_blockhash, 1, True, True),
+                    ("getwalletinfo",),
+                ]
+            )
+            if res["error"] or walletinfo["error"]:
+                raise SpecterError(res["error"] or walletinfo["error"])
+            res, walletinfo = res["result"], walletinfo["result"]
+        except Exception as e:
+            logger.warning(
+                f"listsinceblock from {synced_blockhash} failed, falling back to listtransactions: {e}"
+            )
+            return None
+        txlist = res["transactions"] + res.get("removed", [])
+        new_txids = set(
+            tx["txid"] for tx in txlist if tx["txid"] not in self.wallet._transactions
+        )
+        txcount = walletinfo.get("txcount")
+        synced_txcount = self.wallet.transactions.synced_txcount
+        if (
+            txcount is not None
+            and synced_txcount is not None
+            and txcount - synced_txcount > len(new_txids)
+        ):
+            logger.info(
+                "The wallet got older transactions (rescan?), falling back to listtransactions"
+            )
+            return None
+        arr = [tx for tx in txlist if self.is_interesting_tx(tx)]
+        # A new tx might conflict with an old one which needs to get the conflict as well
+        known_txids = set(tx["txid"] for tx in arr)
+        for tx in list(arr):
+            for txid in tx.get("walletconflicts", []):
+                if txid in self.wallet._transactions and txid not in known_txids:
+                    known_txids.add(txid)
+                    arr.append({"txid": txid})
+        self.lastblock = res["lastblock"]
+        self.txcount = txcount
+        return arr
+
+    def interesting_txs_paged(self):
+        """Pages through listtransactions (newest first) until a batch doesn't contain only interesting txs.
+        Returns an array of interesting transactions like interesting_txs()
+        """
+        # get the tip first, so we don't miss a block which is found while paging
+        try:
+            bestblockhash, walletinfo = self.wallet.rpc.multi(
+                [("getbestblockhash",), ("getwalletinfo",)]
+            )
+            if bestblockhash["error"] or walletinfo["error"]:
+                raise SpecterError(bestblockhash["error"] or walletinfo["error"])
+            if bestblockhash["result"] and walletinfo["result"]:
+                self.lastblock = bestblockhash["result"]
+                self.txcount = walletinfo["result"].get("txcount")
+        except Exception as e:
+            # e.g. Spectrum doesn't know getbestblockhash (and its listsinceblock
+            # returns no txs anyway), without a tip the next fetch pages again
+            logger.debug(f"Tip unknown, the next fetch pages through all txs: {e}")
         idx = 0
         arr = []
         while True:
@@ -5,6 +5,7 @@ import json
 import logging
 import math
 import os
+import sys
 from typing import Dict, List, Union
 
 from embit import bip32
@@ -12,7 +13,7 @@ from embit.liquid.networks import get_network
 from embit.transaction import Transaction
 
 from ..helpers import get_address_from_dict
-from ..persistence import delete_file, read_csv, write_csv
+from ..persistence import append_csv, delete_file, read_csv, write_csv
 from ..specter_error import SpecterError, SpecterInternalException
 from embit.descriptor import Descriptor
 from embit.liquid.descriptor import LDescriptor
@@ -25,11 +26,17 @@ from ..util.psbt import (
     SpecterTx,
 )
 from ..util.tx import decoderawtransaction
+from .rawtx_store import RawTxStore
 from threading import RLock
 
 logger = logging.getLogger(__name__)
 
 
+def intern_str(v):
+    """For columns with many equal values (e.g. blockhash), so the rows share one string"""
+    return sys.intern(str(v))
+
+
 def parse_arr(v):
     if not isinstance(v, str):
         return v
@@ -48,6 +55,8 @@ class AbstractTxListContext(AbstractTxContext):
     * It's derived from AbstractTxContext so it's also providing the attributes "descriptor" and "network"
     """
 
+    __slots__ = ()
+
     @property
     def rpc(self):
         if hasattr(self, "parent"):
@@ -64,14 +73,18 @@ class AbstractTxListContext(AbstractTxContext):
 class TxItem(dict, AbstractTxListContext):
     """A TxItem tries to be a clever dict which can easily be cached, holding all sorts of values which belongs to a Tx
     and might be valuable for client-code.
-    The hex-represeantation of a Tx is cached in the "rawdir". If the the txid is existing as file in the rawdir, the hex
-    representation will be loaded from there.
+    The binary representation of a Tx is cached in the RawTxStore of the TxList it belongs to. A TxItem without a TxList
+    uses the "rawdir" instead: If the the txid is existing as file in the rawdir, the tx will be loaded from there.
     The keys for the values which are returned if you call dict(obj) need to be specified in:
     * columns
     * type_converter (basically the type of the key)
     * __dict__ method
+    As there might be hundreds of thousands of TxItems, the attributes are __slots__ to save the memory
+    of an instance-__dict__. Subclasses need to declare __slots__ as well (at least an empty one).
     """
 
+    __slots__ = ("parent", "_addresses", "rawdir", "_tx")
+
     TransactionCls = Transaction
     # columns will be used by _write_csv in order to derive the columns
     columns = [
@@ -90,11 +103,11 @@ class TxItem(dict, AbstractTxListContext):
     type_converter = [
         str,
         int,
-        str,
+        intern_str,
         int,
         int,
         int,
-        str,
+        intern_str,
         parse_arr,
         int,
         parse_arr,
@@ -122,15 +135,33 @@ class TxItem(dict, AbstractTxListContext):
         self.confirmations  # trigger calculation
 
     def copy(self):
-        """Creates a copy of this TxItem"""
-        mycopy = self.__class__(self.parent, self._addresses, self.rawdir, **self)
+        """Creates a copy of this TxItem.
+        The values are already converted, so this bypasses __init__ (type-conversion, parsing
+        the hex, the WalletAwareTxItem-properties, unblinding ...) and only recomputes the confirmations.
+        """
+        mycopy = self.__class__.__new__(self.__class__)
+        dict.update(mycopy, self)
+        mycopy.parent = self.parent
+        mycopy._addresses = self._addresses
+        mycopy.rawdir = self.rawdir
+        mycopy._tx = self._tx
+        mycopy.confirmations  # trigger calculation
         return mycopy
 
     def clear_cache(self):
         """removes the binary cache for this tx"""
-        if os.path.isfile(self.fname):
+        if self.rawtx_store is not None:
+            self.rawtx_store.discard(self.txid)
+        elif os.path.isfile(self.fname):
             delete_file(self.fname)
 
+    @property
+    def rawtx_store(self):
+        """The RawTxStore of the TxList this TxItem belongs to or None"""
+        if isinstance(self.parent, TxList):
+            return self.parent.rawtx_store
+        return None
+
     @property
     def fname(self):
         return os.path.join(self.rawdir, self.txid + ".bin")
@@ -138,11 +169,16 @@ class TxItem(dict, AbstractTxListContext):
     @property
     def tx(self):
         if not self._tx:
-            # Get transaction from file if we don't have it cached.
+            # Get transaction from the store/file if we don't have it cached.
             # We cache transactions to self._tx
             # only when new tx is added before dump() is called
             try:
-                if os.path.isfile(self.fname):
+                if self.rawtx_store is not None:
+                    raw = self.rawtx_store.get(self.txid)
+                    if raw:
+                        self._tx = self.TransactionCls.parse(raw)
+                        return self._tx
+                elif os.path.isfile(self.fname):
                     with open(self.fname, "rb") as f:
                         tx = self.TransactionCls.read_from(f)
                         self._tx = tx
@@ -162,9 +198,14 @@ class TxItem(dict, AbstractTxListContext):
         return self._tx
 
     def dump(self):
-        """Dumps transaction in binary to the folder if it's not there"""
-        # nothing to do if file exists or we don't have binary tx
-        if os.path.isfile(self.fname) or not self._tx:
+        """Dumps transaction in binary to the store or the folder if it's not there"""
+        if not self._tx:
+            return
+        if self.rawtx_store is not None:
+            self.rawtx_store.add({self.txid: self._tx.serialize()})
+            self._tx = None
+            return
+        if os.path.isfile(self.fname):
             return
         # Try to create a directory if it's not there
         # and write raw tx to file
@@ -291,6 +332,8 @@ class TxItem(dict, AbstractTxListContext):
 
 
 class WalletAwareTxItem(TxItem):
+    __slots__ = ("_psbt",)
+
     PSBTCls = SpecterPSBT
 
     # Columns for writing CSVs, type_converter for reading
@@ -299,9 +342,10 @@ class WalletAwareTxItem(TxItem):
         ["category", "flow_amount", "utxo_amount", "ismine"],
     )
     type_converter = TxItem.type_converter.copy()
-    type_converter.extend([str, float, float, str2bool])
+    type_converter.extend([intern_str, float, float, str2bool])
 
     def __init__(self, parent, addresses, rawdir, **kwargs):
+        self._psbt: SpecterPSBT = None
         super().__init__(parent, addresses, rawdir, **kwargs)
         if type(self.parent.descriptor) not in [Descriptor, LDescriptor]:
             raise SpecterInternalException(
@@ -313,12 +357,17 @@ class WalletAwareTxItem(TxItem):
         self.flow_amount
         self.ismine
 
+    def copy(self):
+        mycopy = super().copy()
+        mycopy._psbt = self._psbt
+        return mycopy
+
     @property
     def psbt(self) -> SpecterPSBT:
         """This tx but as a psbt. Need rpc-calls"""
-        if hasattr(self, "_psbt"):
+        if self._psbt is not None:
             return self._psbt
-        self._psbt: SpecterPSBT = self.PSBTCls.from_transaction(
+        self._psbt = self.PSBTCls.from_transaction(
             self.tx, self.descriptor, self.network
         )
         # fill derivation paths etc
@@ -447,19 +496,45 @@ class WalletAwareTxItem(TxItem):
 
 
 class TxList(dict, AbstractTxListContext):
-    """A TxList is a dict with txids as keys and TxItems as values."""
+    """A TxList is a dict with txids as keys and TxItems as values.
+    It's persisted in two files:
+    * the csv-file (path) which is a full snapshot of the list
+    * an append-only journal (journal_path) with all the changes since the last snapshot.
+      Each row has an "op"-column which is either "add" (add or replace the tx) or "del".
+    The journal gets compacted into the csv-file once it's becoming bigger than the csv itself
+    (but not before it has JOURNAL_COMPACTION_MIN_ROWS rows), so adding txs costs O(new txs)
+    rather than O(all txs).
+    """
 
     ItemCls = WalletAwareTxItem  # for inheritance
     PSBTCls = SpecterPSBT
 
+    # Compaction of the journal won't happen before it has that many rows
+    JOURNAL_COMPACTION_MIN_ROWS = 1000
+
     lock = RLock()
 
     def __init__(self, path, parent, addresses):
         self.parent = parent
         self.path = path
-        # folder to store transactions in binary form
+        self.journal_path = path.replace(".csv", "_journal.csv")
+        # folder to store transactions in binary form (old format, gets migrated to the store)
         self.rawdir = path.replace(".csv", "_raw")
+        # pack-file with all transactions in binary form
+        self.rawtx_path = path.replace(".csv", "_raw.pack")
+        self.rawtx_store = RawTxStore(self.rawtx_path, rawdir=self.rawdir)
         self._addresses = addresses
+        self._journal_rows = 0
+        # gets incremented on every change, useful to invalidate derived data
+        self.version = 0
+        # cache for get_transactions: (version, list of TxItems)
+        self._snapshot = (None, [])
+        # the blockhash up to which the TxList has been synced by the TxFetcher
+        # and the txcount of the Core-wallet at that point
+        self.synced_blockhash = None
+        self.synced_txcount = None
+        # the lowest blockheight of the txs, it's not raised if txs get removed
+        self.min_blockheight = None
         txs = []
         file_exists = False
         try:
@@ -474,29 +549,100 @@ class TxList(dict, AbstractTxListContext):
                 for tx in txs:
                     self[tx.txid] = tx
                 file_exists = True
+                self._replay_journal()
         except Exception as e:
             logger.exception(e)
         self._file_exists = file_exists
+        self._lower_min_blockheight(self.values())
+
+    def _lower_min_blockheight(self, txs):
+        blockheights = [tx.get("blockheight") for tx in txs if tx.get("blockheight")]
+        if self.min_blockheight:
+            blockheights.append(self.min_blockheight)
+        if blockheights:
+            self.min_blockheight = min(blockheights)
+
+    @property
+    def journal_columns(self):
+        return ["op"] + self.ItemCls.columns
 
-    def _save(self):
+    def _replay_journal(self):
+        """Applies the changes from the journal on top of what has been loaded from the csv"""
+        if not os.path.isfile(self.journal_path):
+            return
+        rows = read_csv(self.journal_path)
+        for row in rows:
+            op = row.pop("op")
+            if op == "del":
+                self.pop(row["txid"], None)
+            else:
+                tx = self.ItemCls(self, self._addresses, self.rawdir, **row)
+                self[tx.txid] = tx
+        self._journal_rows = len(rows)
+
+    def _save(self, added=None, removed=None):
+        """Persists the TxList. If the txids which have been added and/or removed
+        are passed, only those will get appended to the journal. Otherwise (or if the
+        journal became too big) the whole list gets written to the csv-file.
+        """
         # check if we have at least one transaction
-        if self:
-            # Dump all transactions to binary files
-            # This happens only if they have not been dumped before
-            for tx in self.values():
-                tx.dump()
-            write_csv(self.path, list(self.values()), self.ItemCls)
-            self._file_exists = True
-        else:
+        if not self:
             self.clear_cache()
+            return
+        added = added or []
+        removed = removed or []
+        journal_limit = max(self.JOURNAL_COMPACTION_MIN_ROWS, len(self))
+        if (
+            not (added or removed)
+            or not self.file_exists
+            or self._journal_rows + len(added) + len(removed) > journal_limit
+        ):
+            self._compact()
+            return
+        self._dump([self[txid] for txid in added])
+        rows = [{**self[txid], "op": "add"} for txid in added]
+        rows.extend([{"txid": txid, "op": "del"} for txid in removed])
+        append_csv(self.journal_path, rows, self.journal_columns)
+        self._journal_rows += len(rows)
+
+    def _compact(self):
+        """Writes the whole list to the csv-file and removes the journal"""
+        # Dump all transactions to the store
+        # This happens only if they have not been dumped before
+        self._dump(self.values())
+        write_csv(self.path, list(self.values()), self.ItemCls)
+        self._file_exists = True
+        if self._journal_rows or os.path.isfile(self.journal_path):
+            delete_file(self.journal_path)
+        self._journal_rows = 0
+
+    def _dump(self, txs):
+        """Appends the binary representation of the txs which are not yet in the store
+        with a single write and frees the memory of the txs
+        """
+        txs = [tx for tx in txs if tx._tx]
+        self.rawtx_store.add(
+            {
+                tx.txid: tx._tx.serialize()
+                for tx in txs
+                if tx.txid not in self.rawtx_store
+            }
+        )
+        for tx in txs:
+            tx._tx = None
 
     def clear_cache(self):
-        """Asks all Txs to clear its cache and removes the csv-file"""
-        for tx in self.values():
-            tx.clear_cache()
+        """Removes the store, the csv-file and the journal"""
+        self.rawtx_store.clear()
         delete_file(self.path)
+        delete_file(self.journal_path)
         self._file_exists = False
+        self._journal_rows = 0
         self.clear()
+        self.version += 1
+        self.synced_blockhash = None
+        self.synced_txcount = None
+        self.min_blockheight = None
 
         logger.info(f"Cleared the Cache for {self.path} (and rawdir)")
 
@@ -512,7 +658,47 @@ class TxList(dict, AbstractTxListContext):
             self.add({txid: tx})
         return self[txid]
 
-    def get_transactions(self, current_blockheight=None) -> WalletAwareTxItem:
+    def _get_snapshot(self) -> List[WalletAwareTxItem]:
+        """Returns the TxItems (not copies!) which are mine, sorted by time and conflict free
+        (only the newest one if conflicts). The result is cached until the TxList changes.
+        """
+        with self.lock:
+            version, transactions = self._snapshot
+            if version == self.version:
+                return transactions
+            version = self.version
+            transactions = sorted(
+                [tx for tx in self.values() if tx.ismine],
+                key=lambda tx: tx["time"],
+                reverse=True,
+            )
+            # conflict-filter: only tx which don't have conflicts or, if it has conflicts, only the one
+            # with the highest time-stamp
+            transactions = [
+                tx
+                for tx in transactions
+                if (
+                    not tx.conflicts
+                    or max(
+                        [
+                            self._conflict_time(conflicting_tx)
+                            for conflicting_tx in tx.conflicts
+                        ]
+                    )
+                    < tx["time"]
+                )
+            ]
+            # If unknown conflicting txs have been added meanwhile, the next call will rebuild
+            self._snapshot = (version, transactions)
+            return transactions
+
+    def _conflict_time(self, txid):
+        """The time of a conflicting tx, without asking Core if we know the tx already"""
+        if txid in self:
+            return self[txid]["time"]
+        return self.gettransaction(txid, 0, full=False)["time"]
+
+    def get_transactions(self, current_blockheight=None) -> List[WalletAwareTxItem]:
         """A great method to get massaged Txs. Those are all copies so mess with it as you see fit.
         This is what's added:
         1. sorted by time
@@ -520,44 +706,18 @@ class TxList(dict, AbstractTxListContext):
         3. have a confirmation key with the number of confirmations
         So what's missing?
         1. No labels (not cached in TxList)
+        Sorting and conflict-resolution are cached (see _get_snapshot), the copies are cheap
+        and only get their confirmations computed from current_blockheight.
         """
         if not current_blockheight:
             current_blockheight = self.rpc.getblockcount()
-
-        tx: WalletAwareTxItem
-
-        # Make a copy of all txs if the tx.ismine (which should be all of them)
-        # As TxItem is derived from Dict, the __Dict__ will return a TxItem
-        with self.lock:
-            tx_values = self.values()
-            transactions: List(TxItem) = [
-                tx.copy() for tx in self.values() if tx.ismine
-            ]
-        # 1. sorted
-        transactions = sorted(transactions, key=lambda tx: tx["time"], reverse=True)
-
-        # 2. conflict free
-        # conflict-filter: only tx which don't have conflicts or, if it has conflicts, only the one
-        # with the highest time-stamp
-        transactions = [
-            tx
-            for tx in transactions
-            if (
-                not tx.conflicts
-                or max(
-                    [
-                        self.gettransaction(conflicting_tx, 0, full=False)["time"]
-                        for conflicting_tx in tx["conflicts"]
-                    ]
-                )
-                < tx["time"]
-            )
-        ]
-        for tx in transactions:
+        transactions = []
+        for tx in self._get_snapshot():
+            tx = tx.copy()
             # 3. with a confirmation-key
             tx.set_current_blockheight = current_blockheight
             tx.confirmations  # trigger calculation
-
+            transactions.append(tx)
         return transactions
 
     def gettransaction(self, txid, blockheight=None, decode=False, full=True) -> Dict:
@@ -589,12 +749,49 @@ class TxList(dict, AbstractTxListContext):
             res.update(self._decoderawtransaction(tx.hex))
         return res
 
+    def get_raw_transactions(self, txids) -> Dict[str, bytes]:
+        """Returns {txid: raw transaction} without asking Bitcoin Core for the txs which are known
+        already. The others are fetched with one batch-request and added to the list.
+        Txids Core doesn't know (e.g. not related to the wallet) are missing in the result.
+        """
+        res = {}
+        missing = []
+        for txid in dict.fromkeys(txids):
+            raw = self.rawtx_store.get(txid)
+            if raw is None and txid in self:
+                tx = self[txid].tx
+                raw = tx.serialize() if tx else None
+            if raw is None:
+                missing.append(txid)
+            else:
+                res[txid] = bytes(raw)
+        if not missing:
+            return res
+        new_txs = {}
+        for txid, r in zip(
+            missing, self.rpc.multi([("gettransaction", txid) for txid in missing])
+        ):
+            if r["error"]:
+                logger.warning(f"Could not get transaction {txid}: {r['error']}")
+                continue
+            tx = r["result"]
+            if "time" not in tx:
+                tx["time"] = tx["timereceived"]
+            res[txid] = bytes.fromhex(tx["hex"])
+            if txid not in self:
+                new_txs[txid] = tx
+        if new_txs:
+            self.add(new_txs)
+        return res
+
     def invalidate(self, txid):
         """removes a tx from the list"""
         if txid not in self:
             raise SpecterError(f"TX with txid {txid} does not exit in {self}")
-        del self[txid]
-        self._save()
+        with self.lock:
+            del self[txid]
+            self.version += 1
+            self._save(removed=[txid])
 
     def _decoderawtransaction(self, tx: Union[Transaction, str, bytes]):
         return SpecterTx(self, tx).to_dict()
@@ -620,6 +817,8 @@ class TxList(dict, AbstractTxListContext):
             # here we store all addresses in transactions
             # to set them used later
             addresses = []
+            # txids we need to persist
+            added = []
             # first we add all transactions to cache
             for txid in txs:
                 tx = txs[txid]
@@ -643,6 +842,7 @@ class TxList(dict, AbstractTxListContext):
                 }
                 txitem = self.ItemCls(self, self._addresses, self.rawdir, **obj)
                 self[txid] = txitem
+                added.append(txid)
                 if txitem.tx:
                     for vout in txitem.tx.vout:
                         try:
@@ -652,7 +852,10 @@ class TxList(dict, AbstractTxListContext):
                         except:
                             pass  # maybe not an address, but a raw script?
             self._addresses.set_used(addresses)
-            self._save()
+            if added:
+                self._lower_min_blockheight(self[txid] for txid in added)
+                self.version += 1
+                self._save(added=added)
 
     def load(self, arr):
         """
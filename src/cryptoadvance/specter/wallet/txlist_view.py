@@ -0,0 +1,187 @@
+"""
+A materialized view on a list of transactions (or utxos) which serves the paginated tables in the UI
+"""
+import heapq
+import logging
+from datetime import datetime
+from numbers import Number
+
+logger = logging.getLogger(__name__)
+
+
+def _as_list(val):
+    return val if isinstance(val, list) else [val]
+
+
+class TxListView:
+    """Precomputes everything which is needed to filter, sort and paginate a txlist:
+    * the search-fields of each tx, split in a lowercased part (txid, labels) for case-insensitive search
+      and a part for case-sensitive search (addresses, amounts, confirmations, time, formatted date)
+    * a sort-index (a list of positions) per column and sort-direction
+    Both are created lazily on first use, so a query doesn't need to touch all the txs
+    anymore (except for the search itself).
+    The view doesn't get updated, create a new one if the underlying data has changed. The key can be used
+    to store whatever describes the state of the data the view has been created with.
+    """
+
+    # Separates the fields so that a search can't match across two fields
+    SEPARATOR = "\x00"
+
+    def __init__(self, txlist, key=None):
+        self.txlist = list(txlist)
+        self.key = key
+        self._search_ci = None
+        self._search_cs = None
+        self._amounts = None
+        self._sort_indexes = {}
+
+    def _build_search_fields(self):
+        search_ci, search_cs, amounts = [], [], []
+        for tx in self.txlist:
+            ci, cs, amount = self._search_fields(tx)
+            search_ci.append(ci)
+            search_cs.append(cs)
+            amounts.append(amount)
+        self._search_ci, self._search_cs, self._amounts = search_ci, search_cs, amounts
+
+    @classmethod
+    def _search_fields(cls, tx):
+        labels = tx.get("label", "") or ""
+        ci = [tx.get("txid", "")]
+        ci.extend([str(label).lower() for label in _as_list(labels) if label])
+        if isinstance(tx.get("flow_amount"), list):
+            amounts = [str(amount) for amount in tx.get("amount", [])]
+        else:
+            amounts = [str(tx.get("flow_amount"))]
+        cs = [address for address in _as_list(tx.get("address") or "")]
+        cs.extend(amounts)
+        cs.append(str(tx.get("confirmations")))
+        cs.append(str(tx.get("time")))
+        if tx.get("time"):
+            cs.append(format(datetime.fromtimestamp(tx["time"]), "%d.%m.%Y %H:%M"))
+        amount = tx.get("amount")
+        return (
+            cls.SEPARATOR.join(ci),
+            cls.SEPARATOR.join(cs),
+            amount if isinstance(amount, Number) else None,
+        )
+
+    def __len__(self):
+        return len(self.txlist)
+
+    def sort_index(self, sortby, sortdir="asc"):
+        """Returns (and caches) the positions of the txs sorted by the column sortby"""
+        if (sortby, sortdir) in self._sort_indexes:
+            return self._sort_indexes[(sortby, sortdir)]
+
+        def sort(pos):
+            val = self.txlist[pos].get(sortby, None)
+            final = val
+            if val:
+                if isinstance(val, list):
+                    if isinstance(val[0], Number):
+                        final = sum(val)
+                    elif isinstance(val[0], str):
+                        final = sorted(
+                            val, key=lambda s: s.lower(), reverse=sortdir != "asc"
+                        )[0].lower()
+                elif isinstance(val, str):
+                    final = val.lower()
+            return final
+
+        index = sorted(range(len(self.txlist)), key=sort, reverse=sortdir != "asc")
+        self._sort_indexes[(sortby, sortdir)] = index
+        return index
+
+    def search(self, search):
+        """Returns a list of booleans, True for each tx matching the search"""
+        if self._search_ci is None:
+            self._build_search_fields()
+        search_lower = search.lower()
+        lower_than = greater_than = None
+        parts = search.split(" ")
+        if len(parts) > 1 and parts[0] in ["<", ">"]:
+            try:
+                if parts[0] == "<":
+                    lower_than = float(parts[1])
+                else:
+                    greater_than = float(parts[1])
+            except ValueError:
+                pass
+        return [
+            search_lower in self._search_ci[pos]
+            or search in self._search_cs[pos]
+            or (
+                self._amounts[pos] is not None
+                and (
+                    (lower_than is not None and lower_than > self._amounts[pos])
+                    or (greater_than is not None and greater_than < self._amounts[pos])
+                )
+            )
+            for pos in range(len(self.txlist))
+        ]
+
+    def iter_query(self, search=None, sortby=None, sortdir="asc"):
+        """Like query() without the pagination, but yields the matching txs one by one
+        instead of creating a list, e.g. for streaming exports
+        """
+        if sortby:
+            positions = self.sort_index(sortby, sortdir)
+        else:
+            positions = range(len(self.txlist))
+        matches = self.search(search) if search else None
+        for pos in positions:
+            if matches is None or matches[pos]:
+                yield self.txlist[pos]
+
+    def query(self, idx=0, limit=100, search=None, sortby=None, sortdir="asc"):
+        """Filters the txs with the search-criterias, sorts and slices them.
+        returns a tuple of the txlist (the page) and the pagecount
+        """
+        if sortby:
+            positions = self.sort_index(sortby, sortdir)
+        else:
+            positions = range(len(self.txlist))
+        if search:
+            matches = self.search(search)
+            positions = [pos for pos in positions if matches[pos]]
+        if limit:
+            page_count = (len(positions) // limit) + (
+                0 if len(positions) % limit == 0 else 1
+            )
+            positions = positions[limit * idx : limit * (idx + 1)]
+        else:
+            page_count = 1
+        return [self.txlist[pos] for pos in positions], page_count
+
+
+def _with_wallet_alias(wallet_alias, txs):
+    for tx in txs:
+        yield {**tx, "wallet_alias": wallet_alias}
+
+
+def iter_merged_txlists(views, search=None, sortby="time", sortdir="desc"):
+    """Merges the TxListViews of several wallets into one stream of txs with a "wallet_alias".
+    Sorted by time, the (sorted) views only need to be merged, so the first txs are available
+    immediately. Any other column needs all the txs to be sorted first.
+    :param views: a list of tuples (wallet_alias, TxListView)
+    """
+    streams = [
+        _with_wallet_alias(
+            wallet_alias,
+            view.iter_query(
+                search=search,
+                sortby="time" if sortby == "time" else None,
+                sortdir=sortdir,
+            ),
+        )
+        for wallet_alias, view in views
+    ]
+    if sortby == "time":
+        return heapq.merge(
+            *streams, key=lambda tx: tx.get("time") or 0, reverse=sortdir != "asc"
+        )
+    txlist = [tx for stream in streams for tx in stream]
+    if not sortby:
+        return iter(txlist)
+    return TxListView(txlist).iter_query(sortby=sortby, sortdir=sortdir)
@@ -6,8 +6,11 @@ import re
 import threading
 import time
 from collections import OrderedDict
+from contextlib import contextmanager
 from csv import Error
+from functools import wraps
 from io import StringIO
+from math import ceil
 from typing import Dict, List
 
 import requests
@@ -25,8 +28,9 @@ from cryptoadvance.specter.rpc import RpcError
 from ..device import Device
 from ..helpers import get_address_from_dict
 from ..key import Key
-from ..persistence import delete_file, delete_folder, write_json_file
+from ..persistence import delete_file, delete_files, delete_folders
 from ..specter_error import SpecterError, handle_exception
+from ..util.debounced_writer import DebouncedWriter
 from ..util.descriptor import convert_receive_descriptor_to_combined_descriptor
 from ..util.merkleblock import is_valid_merkle_proof
 from ..util.psbt import SpecterPSBT
@@ -34,10 +38,50 @@ from ..util.tx import decoderawtransaction
 from ..util.xpub import get_xpub_fingerprint
 from .tx_fetcher import TxFetcher
 from .txlist import TxItem, TxList, WalletAwareTxItem
+from .txlist_view import TxListView
 from .abstract_wallet import AbstractWallet
 from .addresslist import AddressList, Address
+from .address_deriver import AddressDeriver
+from .hydrated_wallets import HydratedWallets
+from .psbt_store import PsbtStore
 
 logger = logging.getLogger(__name__)
+
+
+def uses_tables(method):
+    """Keeps the AddressList and the TxList of the wallet loaded while the method works with them,
+    see Wallet._evict_tables. Every method using _addresses or _transactions needs it, as these
+    properties hand out the tables and can't tell when the caller is done with them.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._pin_tables():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def delete_wallet_files(fullpath):
+    """Deletes the wallet file at fullpath and all the files of the wallet next to it.
+    Works without loading the wallet, e.g. for wallets which failed to load.
+    """
+    txs_path = fullpath.replace(".json", "_txs.csv")
+    delete_files(
+        [
+            fullpath,
+            fullpath + ".bkp",
+            fullpath.replace(".json", "_addr.csv"),
+            txs_path,
+            txs_path.replace(".csv", "_journal.csv"),
+            txs_path.replace(".csv", "_raw.pack"),
+        ]
+    )
+    delete_folders(
+        [fullpath.replace(".json", "_psbts"), txs_path.replace(".csv", "_raw")]
+    )
+
+
 LISTTRANSACTIONS_BATCH_SIZE = 1000
 
 purposes = OrderedDict(
@@ -70,12 +114,20 @@ class Wallet(AbstractWallet):
     # a gap of 20 addresses is what many wallets do (not used with descriptor wallets)
     GAP_LIMIT = 20
     MIN_FEE_RATE = 1
+    # number of decoded previous transactions kept for fill_psbt
+    PREVOUT_CACHE_SIZE = 1000
+    # relative deviation from the requested fee rate which is accepted without asking Core again
+    FEE_RATE_TOLERANCE = 0.01
     # for inheritance (to simplify LWallet logic)
     AddressListCls = AddressList
     TxListCls = TxList
     TxCls = Transaction
     PSBTCls = SpecterPSBT
     DescriptorCls = Descriptor
+    # the wallets with loaded AddressList and TxList
+    hydrated_wallets = HydratedWallets()
+    # writes the json-files of the wallets
+    writer = DebouncedWriter()
 
     def __init__(
         self,
@@ -131,6 +183,7 @@ class Wallet(AbstractWallet):
             raise SpecterError(
                 f"Descriptor has {self.descriptor.num_branches} branches, but we need 2."
             )
+        self._deriver = None
 
         self.keys = keys
 
@@ -144,27 +197,34 @@ class Wallet(AbstractWallet):
                 "A device used by this wallet could not have been found!"
             )
         self.sigs_required = int(sigs_required)
-        self.pending_psbts = {
-            psbtid: self.PSBTCls.from_dict(
-                psbtobj,
-                self.descriptor,
-                self.network,
-                devices=list(zip(self.keys, self._devices)),
-            )
-            for psbtid, psbtobj in pending_psbts.items()
-        }
         self.frozen_utxo = frozen_utxo
         self.fullpath = fullpath
         self.last_block = last_block
-
-        addr_path = self.fullpath.replace(".json", "_addr.csv")
-        self._addresses = self.AddressListCls(addr_path, self.rpc)
-        if not self._addresses.file_exists:
+        self.pending_psbts = PsbtStore(
+            self.fullpath.replace(".json", "_psbts"), self._parse_pending_psbt
+        )
+        # older wallet-files contain the pending PSBTs
+        for psbtid, psbtobj in pending_psbts.items():
+            if psbtid not in self.pending_psbts:
+                self.pending_psbts.add_record(psbtid, psbtobj)
+
+        # AddressList and TxList get loaded on first access, see _addresses
+        self._address_list = None
+        self._tx_list = None
+        self._tables_lock = threading.RLock()
+        # number of threads working with the tables, they don't get evicted meanwhile
+        self._tables_users = 0
+        # decoded previous transactions of PSBT-inputs, see get_prevout_transactions
+        self._prevout_cache = OrderedDict()
+        self._prevout_lock = threading.Lock()
+        # what needs to survive the eviction of the tables
+        self._tables_state = {}
+        # whether the tables have been synced with Core since the start, see _sync_tables
+        self._tables_synced = True
+        new_tables = not os.path.isfile(self.fullpath.replace(".json", "_addr.csv"))
+        if new_tables:
             self.fetch_labels()
 
-        txs_path = self.fullpath.replace(".json", "_txs.csv")
-        self._transactions = self.TxListCls(txs_path, self, self._addresses)
-
         if address == "":
             self.address = self.get_address(0, change=False)
             self.address_index = 0
@@ -172,8 +232,18 @@ class Wallet(AbstractWallet):
             self.change_address = self.get_address(0, change=True)
             self.change_index = 0
 
-        self.update()
-        if self.last_block != last_block or "" in [address, change_address]:
+        if new_tables:
+            self.update()
+        else:
+            # loading and syncing the tables of all wallets would make the startup
+            # as slow as the whole history is long, so it's done on their first use
+            self._tables_synced = False
+            self.update_balance()
+        if (
+            self.last_block != last_block
+            or "" in [address, change_address]
+            or pending_psbts
+        ):
             self.save_to_file()
 
     @property
@@ -192,6 +262,111 @@ class Wallet(AbstractWallet):
         )
         return self._rpc
 
+    @property
+    def _addresses(self) -> AddressList:
+        """The AddressList, loaded from the csv-file on first access"""
+        address_list = self._address_list
+        if address_list is None:
+            address_list = self._hydrate_tables()[0]
+        self.hydrated_wallets.touch(self)
+        return address_list
+
+    @property
+    def _transactions(self) -> TxList:
+        """The TxList, loaded from the csv-file on first access"""
+        tx_list = self._tx_list
+        if tx_list is None:
+            tx_list = self._hydrate_tables()[1]
+        self.hydrated_wallets.touch(self)
+        return tx_list
+
+    def _hydrate_tables(self):
+        with self._tables_lock:
+            if self._address_list is None:
+                address_list = self.AddressListCls(
+                    self.fullpath.replace(".json", "_addr.csv"), self.rpc
+                )
+                tx_list = self.TxListCls(
+                    self.fullpath.replace(".json", "_txs.csv"), self, address_list
+                )
+                state = self._tables_state
+                if state:
+                    # bump the versions to invalidate whatever has been derived from the evicted tables
+                    address_list.version = state["addresses_version"] + 1
+                    tx_list.version = state["transactions_version"] + 1
+                    tx_list.synced_blockhash = state["synced_blockhash"]
+                    tx_list.synced_txcount = state["synced_txcount"]
+                self._tx_list = tx_list
+                self._address_list = address_list
+            tables = self._address_list, self._tx_list
+            sync = not self._tables_synced
+            self._tables_synced = True
+        if sync:
+            self._sync_tables()
+        return tables
+
+    def _sync_tables(self):
+        """Syncs the tables with Core when they're loaded for the first time (instead of on construction)"""
+        last_block = self.last_block
+        with self._pin_tables():
+            try:
+                self.update()
+            except Exception as e:
+                logger.exception(f"Failed to sync the wallet {self.alias}: {e}")
+        if self.last_block != last_block:
+            self.save_to_file()
+
+    @property
+    def tables_loaded(self) -> bool:
+        """Whether the AddressList and the TxList are in memory, checking doesn't load them"""
+        return self._address_list is not None
+
+    def is_affected_by(self, addresses, prev_txids):
+        """Whether a tx paying to one of the addresses or spending an output of one of the
+        prev_txids concerns this wallet. Only the loaded tables are checked, so a cold wallet
+        neither gets loaded nor marked as used by this and returns False.
+        """
+        address_list, tx_list = self._address_list, self._tx_list
+        if address_list is None or tx_list is None:
+            return False
+        return any(address in address_list for address in addresses) or any(
+            txid in tx_list for txid in prev_txids
+        )
+
+    @contextmanager
+    def _pin_tables(self):
+        with self._tables_lock:
+            self._tables_users += 1
+        try:
+            yield
+        finally:
+            with self._tables_lock:
+                self._tables_users -= 1
+
+    def _evict_tables(self):
+        """Drops the AddressList and the TxList from memory, they get loaded again on the next access.
+        Everything has been persisted already, only the sync-state and the versions are kept.
+        Tables which are in use (see uses_tables) are kept, as the threads using them would
+        otherwise write to the same files as the instances loaded next.
+        Returns whether the tables have been dropped.
+        """
+        with self._tables_lock:
+            if self._address_list is None:
+                return True
+            if self._tables_users:
+                return False
+            self._tables_state = {
+                "addresses_version": self._address_list.version,
+                "transactions_version": self._tx_list.version,
+                "synced_blockhash": self._tx_list.synced_blockhash,
+                "synced_txcount": self._tx_list.synced_txcount,
+                "min_blockheight": self._tx_list.min_blockheight,
+            }
+            self._address_list = None
+            self._tx_list = None
+        self.hydrated_wallets.discard(self)
+        return True
+
     @property
     def recv_descriptor(self):
         return add_checksum(str(self.descriptor.branch(0)))
@@ -221,6 +396,13 @@ class Wallet(AbstractWallet):
         """Dictionary with network constants"""
         return get_network(self.chain)
 
+    @property
+    def deriver(self) -> AddressDeriver:
+        """Derives (and memoizes) the addresses of the descriptor"""
+        if self._deriver is None:
+            self._deriver = AddressDeriver(self.descriptor, self.network)
+        return self._deriver
+
     @classmethod
     def construct_descriptor(cls, sigs_required, key_type, keys, devices) -> Descriptor:
         """
@@ -419,6 +601,7 @@ class Wallet(AbstractWallet):
             wallet_manager,
         )
 
+    @uses_tables
     def fetch_labels(self):
         """Load addresses and labels to self._addresses"""
         recv = [
@@ -440,6 +623,7 @@ class Wallet(AbstractWallet):
         # TODO: load addresses for all txs here as well
         self._addresses.add(recv + change, check_rpc=True)
 
+    @uses_tables
     def fetch_transactions(self):
         """Loads new transactions from Bitcoin Core. A quite confusing method which mainly tries to figure out which transactions are new
         and need to be added to the local TxList self._transactions and adding them.
@@ -451,6 +635,7 @@ class Wallet(AbstractWallet):
         """
         TxFetcher.fetch_transactions(self)
 
+    @uses_tables
     def import_address_labels(self, address_labels):
         """
         Imports address_labels given in the formats:
@@ -542,6 +727,7 @@ class Wallet(AbstractWallet):
         except Exception as e:
             logger.exception(f"Failed to check for address reuse: {e}")
 
+    @uses_tables
     def check_addresses(self):
         """Checking the gap limit is still ok"""
         if self.last_block is None:
@@ -647,6 +833,7 @@ class Wallet(AbstractWallet):
         self.info = self.rpc.getwalletinfo()
         return self.info
 
+    @uses_tables
     def check_utxo(self):
         """fetches the utxo-set from core and stores the result in self.__full_utxo which is
         a List[WalletAwareTxItem] enriched with utxo specific data:
@@ -783,11 +970,35 @@ class Wallet(AbstractWallet):
                 key=lambda _full_utxo: _full_utxo["time"],
                 reverse=True,
             )
+            self._utxo_by_address = self._index_utxo_by_address(self._full_utxo)
+            self._utxo_version = getattr(self, "_utxo_version", 0) + 1
         except Exception as e:
             logger.exception(e)
             self._full_utxo = []
+            self._utxo_by_address = {}
             raise SpecterError(f"Failed to load utxos, {type(e).__name__}: {e}")
 
+    def _index_utxo_by_address(self, full_utxo) -> Dict[str, Dict]:
+        """Aggregates the utxo-set per address in one pass. Returns a dict like:
+        { "bcrt1q...": {"utxo": 2, "amount": 0.5} }
+        """
+        index = {}
+        for utxo in full_utxo:
+            addr_info = index.setdefault(utxo["address"], {"utxo": 0, "amount": 0})
+            addr_info["utxo"] += 1
+            addr_info["amount"] += utxo["amount"]
+        return index
+
+    @property
+    def utxo_by_address(self) -> Dict[str, Dict]:
+        """Lazy getter for the utxo count and amount per address, see _index_utxo_by_address().
+        It's rebuilt on every check_utxo().
+        """
+        if not hasattr(self, "_utxo_by_address"):
+            self.check_utxo()
+        return self._utxo_by_address
+
+    @uses_tables
     def getdata(self):
         self.fetch_transactions()
         self.check_utxo()
@@ -864,31 +1075,40 @@ class Wallet(AbstractWallet):
         if for_export:
             o["labels"] = self.export_labels()
         else:
-            o["pending_psbts"] = self.pending_psbts_dict()
+            # the pending PSBTs are in their own files, see PsbtStore
             o["frozen_utxo"] = self.frozen_utxo
             o["last_block"] = self.last_block
         return o
 
     def pending_psbts_dict(self):
-        return {
-            psbtid: psbtobj.to_dict() for psbtid, psbtobj in self.pending_psbts.items()
-        }
+        return self.pending_psbts.to_dict()
 
-    def save_to_file(self):
-        write_json_file(self.to_json(), self.fullpath)
-        self.update_balance()
+    def _parse_pending_psbt(self, psbtobj):
+        return self.PSBTCls.from_dict(
+            psbtobj,
+            self.descriptor,
+            self.network,
+            devices=list(zip(self.keys, self._devices)),
+        )
 
+    def save_to_file(self, flush=False):
+        """Writes the json-file in the background, see DebouncedWriter. It doesn't talk to Core,
+        call update_balance() if the balance might have changed.
+        :param flush: write it before returning
+        """
+        self.writer.schedule(self.fullpath, self.to_json())
+        if flush:
+            self.writer.flush(self.fullpath)
+
+    @uses_tables
     def delete_files(self):
-        delete_file(self.fullpath)
-        delete_file(self.fullpath + ".bkp")
-        delete_file(self._addresses.path)
-        delete_file(self._transactions.path)
-        # the folder might not exist
-        try:
-            delete_folder(self._transactions.rawdir)
-        except:
-            pass
+        self.writer.discard(self.fullpath)
+        # closes the pack-file and forgets the pending PSBTs
+        self._transactions.rawtx_store.clear()
+        self.pending_psbts.delete()
+        delete_wallet_files(self.fullpath)
 
+    @uses_tables
     def clear_cache(self):
         self._transactions.clear_cache()
 
@@ -933,11 +1153,14 @@ class Wallet(AbstractWallet):
         # all inputs in transactions
         inputs = sum([self.TxCls.from_string(hextx).vin for hextx in txs], [])
         # all unique utxos spent in these transactions
-        utxos = set([(vin.txid, vin.vout) for vin in inputs])
+        utxos = set([(vin.txid.hex(), vin.vout) for vin in inputs])
         # get psbt ids we need to delete
         psbtids = []
-        for psbtid, psbt in self.pending_psbts.items():
-            psbtutxos = [(inp.txid, inp.vout) for inp in psbt.inputs]
+        for psbtid in self.pending_psbts:
+            psbtutxos = [
+                (utxo["txid"], utxo["vout"])
+                for utxo in self.pending_psbts.utxo_dict(psbtid)
+            ]
             for utxo in psbtutxos:
                 if utxo in utxos:
                     psbtids.append(psbtid)
@@ -950,7 +1173,7 @@ class Wallet(AbstractWallet):
     def delete_pending_psbt(self, txid, save=True):
         if txid and txid in self.pending_psbts:
             try:
-                self.rpc.lockunspent(True, self.pending_psbts[txid].utxo_dict())
+                self.rpc.lockunspent(True, self.pending_psbts.utxo_dict(txid))
             except RpcError as e:
                 # UTXO was probably spent
                 logger.warning(str(e))
@@ -960,35 +1183,60 @@ class Wallet(AbstractWallet):
 
     def toggle_freeze_utxo(self, utxo_list):
         # utxo = ["txid:vout", "txid:vout"]
-        utxo_list_done = []  # Preventing Duplicates server-side
-        for utxo in utxo_list:
-            if utxo in utxo_list_done:
-                continue
-            if utxo in self.frozen_utxo:
-                try:
-                    self.rpc.lockunspent(
-                        True,
-                        [{"txid": utxo.split(":")[0], "vout": int(utxo.split(":")[1])}],
-                    )
-                except Exception as e:
-                    # UTXO was spent ?!
-                    logger.exception(e)
-                logger.info(f"Unfreeze {utxo}")
-                self.frozen_utxo.remove(utxo)
-            else:
-                try:
-                    self.rpc.lockunspent(
-                        False,
-                        [{"txid": utxo.split(":")[0], "vout": int(utxo.split(":")[1])}],
-                    )
-                except Exception as e:
-                    # UTXO was spent
-                    logger.debug("Failed to lock UTXO %s: %s", utxo, e)
-                logger.info(f"Freeze {utxo}")
-                self.frozen_utxo.append(utxo)
-            utxo_list_done.append(utxo)
+        frozen = set(self.frozen_utxo)
+        utxo_list = list(dict.fromkeys(utxo_list))  # Preventing Duplicates server-side
+        self.freeze_utxos(
+            freeze=[utxo for utxo in utxo_list if utxo not in frozen],
+            unfreeze=[utxo for utxo in utxo_list if utxo in frozen],
+        )
 
+    def freeze_utxos(self, freeze=None, unfreeze=None):
+        """Freezes and unfreezes many utxos ("txid:vout") at once: the lockunspent-calls for both sets
+        go to Core in one batch-request and the wallet-file is saved once.
+        Returns {"frozen": [...], "unfrozen": [...]} with the utxos which actually changed.
+        """
+        frozen = set(self.frozen_utxo)
+        to_freeze = [utxo for utxo in dict.fromkeys(freeze or []) if utxo not in frozen]
+        to_unfreeze = [utxo for utxo in dict.fromkeys(unfreeze or []) if utxo in frozen]
+        calls = []
+        if to_unfreeze:
+            calls.append(("lockunspent", True, self.utxo_dicts(to_unfreeze)))
+        if to_freeze:
+            calls.append(("lockunspent", False, self.utxo_dicts(to_freeze)))
+        if not calls:
+            return {"frozen": [], "unfrozen": []}
+        self.lockunspent_multi(calls)
+        logger.info(f"Freeze {to_freeze}, unfreeze {to_unfreeze}")
+        unfrozen = set(to_unfreeze)
+        self.frozen_utxo = [
+            utxo for utxo in self.frozen_utxo if utxo not in unfrozen
+        ] + to_freeze
         self.save_to_file()
+        return {"frozen": to_freeze, "unfrozen": to_unfreeze}
+
+    def lockunspent_multi(self, calls):
+        """Makes the ("lockunspent", unlock, [utxo_dict]) calls in one batch-request.
+        Core rejects a whole call if one of its utxos can't be (un)locked (e.g. it got spent),
+        so those get retried one utxo per call in a second batch-request.
+        """
+        retries = []
+        for call, res in zip(calls, self.rpc.multi(calls)):
+            if res["error"]:
+                retries += [("lockunspent", call[1], [utxo]) for utxo in call[2]]
+        if not retries:
+            return
+        for call, res in zip(retries, self.rpc.multi(retries)):
+            if res["error"]:
+                # UTXO was spent ?!
+                logger.debug("Failed to (un)lock UTXO %s: %s", call[2][0], res["error"])
+
+    @staticmethod
+    def utxo_dicts(utxo_list):
+        """["txid:vout"] -> [{"txid": txid, "vout": vout}] as used by lockunspent"""
+        return [
+            {"txid": utxo.split(":")[0], "vout": int(utxo.split(":")[1])}
+            for utxo in utxo_list
+        ]
 
     def update_pending_psbt(self, psbt, txid, raw):
         if txid not in self.pending_psbts:
@@ -996,8 +1244,8 @@ class Wallet(AbstractWallet):
 
         cur_psbt = self.pending_psbts[txid]
         cur_psbt.update(psbt, raw)
-        self.save_to_file()
-        return cur_psbt.to_dict()
+        self.pending_psbts.save(txid)
+        return self.pending_psbts.to_dict()[txid]
 
     def save_pending_psbt(self, psbt):
         self.pending_psbts[psbt.txid] = psbt
@@ -1007,8 +1255,8 @@ class Wallet(AbstractWallet):
             logger.debug(
                 "Failed to lock UTXO for transaction, might be fine if the transaction is an RBF."
             )
-        self.save_to_file()
 
+    @uses_tables
     def txlist(
         self,
         fetch_transactions=True,
@@ -1037,7 +1285,7 @@ class Wallet(AbstractWallet):
         ):
             self.fetch_transactions()
 
-        transactions = self._transactions.get_transactions()
+        transactions = self._transactions.get_transactions(current_blockheight)
         result = []
         for tx in transactions:
 
@@ -1083,6 +1331,59 @@ class Wallet(AbstractWallet):
             result.append(tx)
         return result
 
+    @uses_tables
+    def txlist_view(
+        self,
+        fetch_transactions=True,
+        validate_merkle_proofs=False,
+        current_blockheight=None,
+        service_id: str = None,
+    ) -> TxListView:
+        """Same as txlist() but returns a TxListView which can be queried (filter, sort and paginate)
+        cheaply. The view is cached and only recreated if the txs or the labels have changed
+        or if there is a new block.
+        """
+        if fetch_transactions:
+            self.fetch_transactions()
+        if current_blockheight is None:
+            current_blockheight = self.rpc.getblockcount()
+        key = (
+            self._transactions.version,
+            self._addresses.version,
+            current_blockheight,
+            validate_merkle_proofs,
+            service_id,
+        )
+        view = getattr(self, "_txlist_view", None)
+        if view is None or view.key != key:
+            view = TxListView(
+                self.txlist(
+                    fetch_transactions=False,
+                    validate_merkle_proofs=validate_merkle_proofs,
+                    current_blockheight=current_blockheight,
+                    service_id=service_id,
+                ),
+                key=key,
+            )
+            self._txlist_view = view
+        return view
+
+    @uses_tables
+    def utxo_view(self) -> TxListView:
+        """A cached TxListView of the full_utxo (with labels), recreated after check_utxo()
+        or if the labels have changed
+        """
+        full_utxo = self.full_utxo
+        key = (getattr(self, "_utxo_version", 0), self._addresses.version)
+        view = getattr(self, "_utxo_view", None)
+        if view is None or view.key != key:
+            for tx in full_utxo:
+                tx["label"] = self.getlabel(tx["address"])
+            view = TxListView(full_utxo, key=key)
+            self._utxo_view = view
+        return view
+
+    @uses_tables
     def gettransaction(self, txid, blockheight=None, decode=False, full=True) -> Dict:
         """Gets transaction from cache
         If full=True it will also contain "hex" key with full hex transaction.
@@ -1121,6 +1422,7 @@ class Wallet(AbstractWallet):
             )
         self.rpc.abandontransaction(txid)
 
+    @uses_tables
     def rescanutxo(self, explorer=None, requests_session=None, only_tor=False):
         """rescans the utxo via a thread. internally calls _rescan_utxo_thread
         explorer: something like https://mempool.space/testnet/
@@ -1130,9 +1432,11 @@ class Wallet(AbstractWallet):
         command = UtxoScanner(self, requests_session, explorer, only_tor)
         command.execute(asyncc=True)
 
+    @uses_tables
     def export_labels(self):
         return self._addresses.get_labels()
 
+    @uses_tables
     def import_labels(self, labels):
         # format:
         #   {
@@ -1158,22 +1462,19 @@ class Wallet(AbstractWallet):
 
     @property
     def blockheight(self):
-        self.fetch_transactions()
-        MAX_BLOCKHEIGHT = 999999999999  # Replace before we reach this height
-        first_tx = sorted(
-            self._transactions.values(),
-            key=lambda tx: tx.get("blockheight", None)
-            if tx.get("blockheight", None)
-            else MAX_BLOCKHEIGHT,
-        )
-        first_tx_blockheight = (
-            first_tx[0].get("blockheight", None) if first_tx else None
-        )
-        if first_tx:
-            if first_tx_blockheight and first_tx_blockheight - 101 > 0:
-                return (
-                    first_tx_blockheight - 101
-                )  # Give tiny margin to catch edge case of mined coins
+        """A blockheight before the first tx of the wallet, e.g. to rescan from.
+        It's based on the txs which are known already (see TxList.min_blockheight), so it doesn't
+        load the txs from Core (or from disk if they have been unloaded).
+        """
+        with self._tables_lock:
+            if self._tx_list is not None:
+                first_tx_blockheight = self._tx_list.min_blockheight
+            else:
+                first_tx_blockheight = self._tables_state.get("min_blockheight")
+        if first_tx_blockheight and first_tx_blockheight - 101 > 0:
+            return (
+                first_tx_blockheight - 101
+            )  # Give tiny margin to catch edge case of mined coins
         return 481824 if self.manager.chain == "main" else 0
 
     @property
@@ -1214,10 +1515,9 @@ class Wallet(AbstractWallet):
             # )
             if pool < index + self.GAP_LIMIT:
                 self.keypoolrefill(pool, index + self.GAP_LIMIT, change=change)
-        return self.descriptor.derive(index, branch_index=int(change)).address(
-            self.network
-        )
+        return self.deriver.address(index, change)
 
+    @uses_tables
     def get_address_obj(self, address: str) -> Address:
         return self._addresses.get(address)
 
@@ -1237,14 +1537,14 @@ class Wallet(AbstractWallet):
             if desc.is_basic_multisig and desc.is_sorted:
                 args = desc.miniscript.args
                 # sort by derived sec(), first arg is a threshold
-                desc.miniscript.args = [args[0]] + sorted(
-                    args[1:], key=lambda k: k.derive(index).sec()
-                )
+                secs = [k.sec() for k in self.deriver.derive(index, branch).keys]
+                order = sorted(range(len(secs)), key=lambda i: secs[i])
+                desc.miniscript.args = [args[0]] + [args[1 + i] for i in order]
             # fill indexes in allowed derivations
             for k in desc.keys:
                 k.allowed_derivation.indexes = k.allowed_derivation.fill(index)
         else:
-            desc = self.descriptor.derive(index, branch_index=branch)
+            desc = self.deriver.derive(index, branch)
             # replace xpubs with pubkeys
             for k in desc.keys:
                 k.key = k.key.get_public_key()
@@ -1256,6 +1556,7 @@ class Wallet(AbstractWallet):
                 )
         return desc
 
+    @uses_tables
     def get_descriptor(
         self,
         index=None,
@@ -1271,12 +1572,14 @@ class Wallet(AbstractWallet):
         """
         if address is not None:
             # only ask rpc if address is not known directly
-            if address not in self._addresses:
-                return self.rpc.getaddressinfo(address).get("desc", "")
-            else:
+            if address in self._addresses:
                 a = self._addresses[address]
                 index = a.index
                 change = a.change
+            elif self.deriver.lookup(address) is not None:
+                change, index = self.deriver.lookup(address)
+            else:
+                return self.rpc.getaddressinfo(address).get("desc", "")
         if index is None:
             index = self.change_index if change else self.address_index
         if not to_string:
@@ -1288,6 +1591,7 @@ class Wallet(AbstractWallet):
             else:
                 return desc_string
 
+    @uses_tables
     def get_address_info(self, address) -> Address:
         # TODO: This is a misleading name. This is really fetching an Address obj
         return self._addresses.get(address)
@@ -1387,6 +1691,7 @@ class Wallet(AbstractWallet):
         self.balance = balance
         return self.balance
 
+    @uses_tables
     def keypoolrefill(self, start, end=None, change=False):
         if end is None:
             # end is ignored for descriptor wallets
@@ -1412,12 +1717,10 @@ class Wallet(AbstractWallet):
 
         try:
             addresses = [
-                dict(
-                    address=self.get_address(idx, change=change, check_keypool=False),
-                    index=idx,
-                    change=change,
+                dict(address=address, index=idx, change=change)
+                for idx, address in zip(
+                    range(start, end), self.deriver.addresses(start, end, change)
                 )
-                for idx in range(start, end)
             ]
             self._addresses.add(addresses, check_rpc=False)
         except Exception as e:
@@ -1438,6 +1741,7 @@ class Wallet(AbstractWallet):
         self.save_to_file()
         return end
 
+    @uses_tables
     def associate_address_with_service(
         self, address: str, service_id: str, label: str, autosave: bool = True
     ):
@@ -1448,12 +1752,14 @@ class Wallet(AbstractWallet):
             address=address, service_id=service_id, label=label, autosave=autosave
         )
 
+    @uses_tables
     def deassociate_address(self, address: str, autosave: bool = True):
         """
         Clears any Service associations on the Address.
         """
         self._addresses.deassociate(address=address, autosave=autosave)
 
+    @uses_tables
     def get_associated_addresses(
         self, service_id: str, unused_only: bool = False
     ) -> List[Address]:
@@ -1467,9 +1773,11 @@ class Wallet(AbstractWallet):
                     addrs.append(addr_obj)
         return addrs
 
+    @uses_tables
     def setlabel(self, address, label):
         self._addresses.set_label(address, label)
 
+    @uses_tables
     def getlabel(self, address):
         # TODO: This is confusing. The Address["label"] attr may be blank but the
         # Address.label property will auto-populate a value (e.g. "Address #4").
@@ -1513,8 +1821,8 @@ class Wallet(AbstractWallet):
     def amount_locked_unsigned(self):
         """Outputs locked in unsigned PSBTs"""
         amount = 0
-        for psbt in self.pending_psbts.values():
-            amount += sum([inp.float_amount for inp in psbt.inputs])
+        for psbt in self.pending_psbts.to_dict().values():
+            amount += sum([inp.get("float_amount", 0) for inp in psbt["inputs"]])
         return round(amount, 8)
 
     @property
@@ -1566,6 +1874,7 @@ class Wallet(AbstractWallet):
     def wallet_addresses(self):
         return self.addresses + self.change_addresses
 
+    @uses_tables
     def createpsbt(
         self,
         addresses: List[str],
@@ -1635,63 +1944,101 @@ class Wallet(AbstractWallet):
         if self.manager.bitcoin_core_version_raw >= 210000:
             options["add_inputs"] = not selected_coins
 
+        core_fee_rate = None
         if fee_rate > 0:
-            # bitcoin core needs us to convert sat/B to BTC/kB
-            options["feeRate"] = round((fee_rate * 1000) / 1e8, 8)
+            if selected_coins:
+                num_inputs = len(selected_coins)
+            else:
+                # Core selects the coins, let's guess it takes the biggest ones
+                num_inputs, missing = 0, total_btc
+                utxos = [utxo for utxo in self.full_utxo if not utxo["locked"]]
+                for utxo in sorted(
+                    utxos, key=lambda utxo: utxo["amount"], reverse=True
+                ):
+                    if missing <= 0:
+                        break
+                    missing -= utxo["amount"]
+                    num_inputs += 1
+            # Core estimates the size of our inputs differently
+            core_fee_rate = self._up_front_fee_rate(
+                fee_rate, max(num_inputs, 1), len(addresses) + 1  # change
+            )
 
         try:
             locktime = min([tip["height"] for tip in self.rpc.getchaintips()])
         except:
             locktime = 0
 
-        # first run to get estimate
-        r = self.rpc.walletcreatefundedpsbt(
-            extra_inputs,  # inputs
-            [{addresses[i]: amounts[i]} for i in range(len(addresses))],  # outputs
-            locktime,
-            options,
-            True,  # bip32-der
+        outputs = [{addresses[i]: amounts[i]} for i in range(len(addresses))]
+        r = self._fund_psbt(
+            extra_inputs, outputs, locktime, options, fee_rate, core_fee_rate
         )
 
         # Always explicitly fill psbt with any missing fields
         # TODO: Re-evaluate if this is necessary if user is running Bitcoin Core w/BIP-371 support
         b64psbt = self.fill_psbt(r["psbt"])
 
-        psbt = self.PSBTCls(
+        psbt: SpecterPSBT = self.PSBTCls(
             b64psbt,
             self.descriptor,
             self.network,
             devices=list(zip(self.keys, self._devices)),
         )
+        if not readonly:
+            self.save_pending_psbt(psbt)
+        return psbt
 
-        # Core's fee rate is wrong so we need to "adjust" it
-        if fee_rate > 0:
-            # scale by which Core misses the fee rate
-            scale = fee_rate / psbt.fee_rate
-            adjusted_fee_rate = fee_rate * scale
-            options["feeRate"] = round((adjusted_fee_rate * 1000) / 1e8, 8)
+    @staticmethod
+    def _core_fee_rate(fee_rate):
+        """sat/vB -> BTC/kvB as Bitcoin Core wants it"""
+        return round((fee_rate * 1000) / 1e8, 8)
 
-            r = self.rpc.walletcreatefundedpsbt(
-                extra_inputs,  # inputs
-                [{addresses[i]: amounts[i]} for i in range(len(addresses))],  # outputs
-                locktime,
-                options,
-                True,  # bip32-der
+    def _up_front_fee_rate(self, fee_rate, num_inputs, num_outputs):
+        """The fee rate to ask Core for, so that the PSBT pays fee_rate according to our
+        own size estimation (SpecterPSBT.full_size). Core sizes the inputs with dummy
+        signatures instead, the rest of the transaction is the same for both of us.
+        """
+        # version, locktime, input and output counts, unsigned inputs
+        # and outputs (as big as P2WSH ones, they are the same for both estimations)
+        weight = (4 + 4 + 1 + 1 + num_inputs * 41 + num_outputs * 43) * 4
+        our_size = ceil(
+            (weight + 4 + num_inputs * self.PSBTCls.input_weight(self.descriptor)) / 4
+        )
+        core_size = ceil(
+            (
+                weight
+                + (2 if self.descriptor.is_segwit else 0)  # marker and flag
+                + num_inputs * self.PSBTCls.core_input_weight(self.descriptor)
             )
+            / 4
+        )
+        return fee_rate * our_size / core_size
 
-            # Always explicitly fill psbt with any missing fields
-            # TODO: Re-evaluate if this is necessary if user is running Bitcoin Core w/BIP-371 support
-            b64psbt = self.fill_psbt(r["psbt"])
-
-            psbt: SpecterPSBT = self.PSBTCls(
-                b64psbt,
-                self.descriptor,
-                self.network,
-                devices=list(zip(self.keys, self._devices)),
+    def _fund_psbt(
+        self, inputs, outputs, locktime, options, fee_rate, core_fee_rate=None
+    ):
+        """Calls walletcreatefundedpsbt asking for core_fee_rate (fee_rate if not set, see
+        _up_front_fee_rate) and checks the fee rate of the result with our own size estimation.
+        Only if it misses fee_rate by more than FEE_RATE_TOLERANCE (e.g. Core selected another
+        number of inputs than expected), Core is asked again with a corrected fee rate.
+        """
+        if fee_rate > 0:
+            core_fee_rate = core_fee_rate or fee_rate
+            options["feeRate"] = self._core_fee_rate(core_fee_rate)
+        r = self.rpc.walletcreatefundedpsbt(
+            inputs, outputs, locktime, options, True  # bip32-der
+        )
+        if fee_rate <= 0:
+            return r
+        psbt = self.PSBTCls(r["psbt"], self.descriptor, self.network)
+        # scale by which Core misses the fee rate
+        scale = fee_rate / psbt.fee_rate
+        if abs(scale - 1) > self.FEE_RATE_TOLERANCE:
+            options["feeRate"] = self._core_fee_rate(core_fee_rate * scale)
+            r = self.rpc.walletcreatefundedpsbt(
+                inputs, outputs, locktime, options, True  # bip32-der
             )
-        if not readonly:
-            self.save_pending_psbt(psbt)
-        return psbt
+        return r
 
     def get_rbf_utxo(self, rbf_tx_id):
         decoded_tx = self.decode_tx(rbf_tx_id)
@@ -1756,7 +2103,7 @@ class Wallet(AbstractWallet):
             change_out = psbt.psbt.outputs[change_index]
         else:
             # create fresh output and replace script_pubkey in output
-            desc = self.descriptor.branch(1).derive(self.change_index)
+            desc = self.deriver.derive(self.change_index, 1)
             change_out = psbt.psbt.PSBTOUT_CLS(vout=psbt.psbt.outputs[0].vout)
             change_out.script_pubkey = desc.script_pubkey()
             self.PSBTCls.fill_output(change_out, desc)
@@ -1808,6 +2155,7 @@ class Wallet(AbstractWallet):
     def is_taproot(self):
         return self.descriptor.is_taproot
 
+    @uses_tables
     def fill_psbt(
         self,
         b64psbt,
@@ -1827,9 +2175,7 @@ class Wallet(AbstractWallet):
                 addr = sc.script_pubkey.address(net)
                 info = self._addresses.get(addr)
                 if info and not info.is_external:
-                    d = self.descriptor.derive(
-                        info.index, branch_index=int(info.change)
-                    )
+                    d = self.deriver.derive(info.index, int(info.change))
                     for k in d.keys:
                         # TODO: support keysigns from within the taptree (note: embit
                         # must be updated first).
@@ -1845,17 +2191,16 @@ class Wallet(AbstractWallet):
                         sc.taproot_internal_key = pub
 
         if non_witness:
-            for inp in psbt.inputs:
-                # we don't need to fill what is already filled
-                if inp.non_witness_utxo is not None:
-                    continue
+            # we don't need to fill what is already filled
+            inputs = [inp for inp in psbt.inputs if inp.non_witness_utxo is None]
+            prevouts = self.get_prevout_transactions([inp.txid.hex() for inp in inputs])
+            for inp in inputs:
                 txid = inp.txid.hex()
-                try:
-                    res = self.gettransaction(txid)
-                    inp.non_witness_utxo = self.TxCls.from_string(res["hex"])
-                except Exception as e:
-                    logger.exception(
-                        f"Can't find previous transaction in the wallet. Signing might not be possible for certain devices... Txid: {txid}, Exception: {e}"
+                if txid in prevouts:
+                    inp.non_witness_utxo = prevouts[txid]
+                else:
+                    logger.error(
+                        f"Can't find previous transaction in the wallet. Signing might not be possible for certain devices... Txid: {txid}"
                     )
         else:
             # remove non_witness_utxo if we don't want them
@@ -1881,6 +2226,41 @@ class Wallet(AbstractWallet):
             psbt.xpubs = {}
         return psbt.to_string()
 
+    @uses_tables
+    def get_prevout_transactions(self, txids) -> Dict[str, Transaction]:
+        """Returns {txid: decoded transaction} for the previous transactions of PSBT-inputs.
+        The raw txs come from the TxList which asks Core for the unknown ones with one batch-request.
+        Transactions never change, so the decoded ones are kept (see PREVOUT_CACHE_SIZE) and shared
+        by all inputs spending the same tx and by the fill_psbt calls for the different devices.
+        """
+        res = {}
+        missing = []
+        with self._prevout_lock:
+            for txid in dict.fromkeys(txids):
+                if txid in self._prevout_cache:
+                    self._prevout_cache.move_to_end(txid)
+                    res[txid] = self._prevout_cache[txid]
+                else:
+                    missing.append(txid)
+        if not missing:
+            return res
+        try:
+            raw_txs = self._transactions.get_raw_transactions(missing)
+        except Exception as e:
+            logger.exception(e)
+            return res
+        with self._prevout_lock:
+            for txid, raw in raw_txs.items():
+                try:
+                    res[txid] = self.TxCls.parse(raw)
+                except Exception as e:
+                    logger.exception(e)
+                    continue
+                self._prevout_cache[txid] = res[txid]
+            while len(self._prevout_cache) > self.PREVOUT_CACHE_SIZE:
+                self._prevout_cache.popitem(last=False)
+        return res
+
     def get_signed_devices(self, decodedpsbt):
         signed_devices = []
         # check who already signed
@@ -1918,6 +2298,7 @@ class Wallet(AbstractWallet):
         self.save_pending_psbt(psbt)
         return psbt.to_dict()
 
+    @uses_tables
     def addresses_info(
         self,
         is_change: bool = False,
@@ -1938,30 +2319,24 @@ class Wallet(AbstractWallet):
         addresses_cache = [
             v for _, v in self._addresses.items() if v.change == is_change and v.is_mine
         ]
+        utxo_by_address = self.utxo_by_address
+        no_utxo = {"utxo": 0, "amount": 0}
 
         for addr in addresses_cache:
-            addr_utxo = 0
-            addr_amount = 0
-
-            for utxo in [
-                utxo for utxo in self._full_utxo if utxo["address"] == addr.address
-            ]:
-                addr_amount = addr_amount + utxo["amount"]
-                addr_utxo = addr_utxo + 1
-
             if service_id and (
                 "service_id" not in addr or addr["service_id"] != service_id
             ):
                 # Filter this address out
                 continue
 
+            addr_utxo_info = utxo_by_address.get(addr.address, no_utxo)
             addr_info = {
                 "index": addr.index,
                 "address": addr.address,
                 "label": addr.label,
-                "amount": addr_amount,
+                "amount": addr_utxo_info["amount"],
                 "used": bool(addr.used),
-                "utxo": addr_utxo,
+                "utxo": addr_utxo_info["utxo"],
                 "type": "change" if is_change else "receive",
                 "service_id": addr.service_id,
             }
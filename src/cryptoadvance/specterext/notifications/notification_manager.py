@@ -1,5 +1,7 @@
 import logging
 import secrets
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -80,6 +82,15 @@ class NotificationManager:
 
     """
 
+    # notifications which have been shown (but not closed) are deleted after that many seconds
+    DELIVERED_RETENTION = 3600
+    # all notifications are deleted after that many seconds
+    MAX_AGE = 24 * 3600
+    # if a user has more notifications, the oldest ones are deleted
+    MAX_NOTIFICATIONS_PER_USER = 100
+    # min seconds between two checks for notifications to delete
+    SWEEP_INTERVAL = 60
+
     def __init__(
         self,
         host,
@@ -96,8 +107,19 @@ class NotificationManager:
             - ui_notifications:  {user_id: [list of ui_notifications]}
                     The "default" ui_notifications is at position 0
         """
-        self.ui_notifications = ui_notifications if ui_notifications else []
-        self.notifications = []
+        self.ui_notifications = []
+        # indexes of the ui_notifications by name and by user_id (None for the public ones)
+        self._ui_notifications_by_name = {}
+        self._ui_notifications_by_user = {}
+        for ui_notification in ui_notifications or []:
+            self.register_ui_notification(ui_notification)
+        # {notification.id: (notification, time received)}
+        self._notifications = {}
+        # {user_id: {notification.id: notification}}
+        self._notifications_by_user = {}
+        # notifications are added and shown from several threads (websockets, requests)
+        self._notifications_lock = threading.RLock()
+        self._last_sweep = time.time()
         self._websocket_tokens = {}
         self.ssl_cert, self.ssl_key = ssl_cert, ssl_key
         self._register_default_ui_notifications()
@@ -173,13 +195,17 @@ class NotificationManager:
             f'Registering "{ui_notification.name}" for user "{ui_notification.user_id}" in {self.__class__.__name__}'
         )
         self.ui_notifications.append(ui_notification)
+        self._ui_notifications_by_name.setdefault(ui_notification.name, []).append(
+            ui_notification
+        )
+        self._ui_notifications_by_user.setdefault(ui_notification.user_id, []).append(
+            ui_notification
+        )
 
     def _find_target_ui(self, target_ui, user_id):
         "Returns the ui_notification matching (target_ui, user_id)"
-        for ui_notification in self.ui_notifications:
-            if (ui_notification.name == target_ui) and (
-                (ui_notification.user_id == user_id or ui_notification.user_id is None)
-            ):
+        for ui_notification in self._ui_notifications_by_name.get(target_ui, []):
+            if ui_notification.user_id == user_id or ui_notification.user_id is None:
                 return ui_notification
 
     def get_default_target_ui_name(self):
@@ -190,11 +216,21 @@ class NotificationManager:
         "Returns the names of all ui_notifications"
         return {ui_notification.name for ui_notification in self.ui_notifications}
 
+    @property
+    def notifications(self):
+        "The stored notifications, the oldest first"
+        with self._notifications_lock:
+            return [notification for notification, _ in self._notifications.values()]
+
     def get_notification_by_id(self, notification_id):
         "Finds and returns the notification with notification_id"
-        for notification in self.notifications:
-            if notification.id == notification_id:
-                return notification
+        entry = self._notifications.get(notification_id)
+        return entry[0] if entry else None
+
+    def get_notifications_of_user(self, user_id):
+        "The stored notifications of the user, the oldest first"
+        with self._notifications_lock:
+            return list(self._notifications_by_user.get(user_id, {}).values())
 
     def _get_ui_notifications_of_user(
         self, user_id, callable_from_any_session_required=False
@@ -203,12 +239,9 @@ class NotificationManager:
         user_targeted_ui_notification = (
             [
                 ui_notification
-                for ui_notification in self.ui_notifications
-                if ui_notification.user_id == user_id
-                and (
-                    ui_notification.callable_from_any_session
-                    or not callable_from_any_session_required
-                )
+                for ui_notification in self._ui_notifications_by_user.get(user_id, [])
+                if ui_notification.callable_from_any_session
+                or not callable_from_any_session_required
             ]
             if user_id
             else []
@@ -216,12 +249,9 @@ class NotificationManager:
 
         public_ui_notification = [
             ui_notification
-            for ui_notification in self.ui_notifications
-            if ui_notification.user_id is None
-            and (
-                ui_notification.callable_from_any_session
-                or not callable_from_any_session_required
-            )
+            for ui_notification in self._ui_notifications_by_user.get(None, [])
+            if ui_notification.callable_from_any_session
+            or not callable_from_any_session_required
         ]
 
         return user_targeted_ui_notification + public_ui_notification
@@ -236,18 +266,61 @@ class NotificationManager:
             return
         notification.set_shown(target_ui)
 
+    def _add_notification(self, notification):
+        "Stores the notification, deleting the oldest one of the user if there are too many"
+        with self._notifications_lock:
+            self._notifications[notification.id] = (notification, time.time())
+            notifications_of_user = self._notifications_by_user.setdefault(
+                notification.user_id, {}
+            )
+            notifications_of_user[notification.id] = notification
+            if len(notifications_of_user) > self.MAX_NOTIFICATIONS_PER_USER:
+                self._delete_notification(next(iter(notifications_of_user.values())))
+            self._sweep()
+
     def _delete_notification(self, notification):
         "Deletes the notification from self.notifications"
-        if notification not in self.notifications:
-            logging.warning(
-                f"_delete_notification: notification {notification} was not found in self.notifications"
-            )
-            return
+        with self._notifications_lock:
+            if self.get_notification_by_id(notification.id) is not notification:
+                logging.warning(
+                    f"_delete_notification: notification {notification} was not found in self.notifications"
+                )
+                return
 
-        del self.notifications[self.notifications.index(notification)]
+            del self._notifications[notification.id]
+            notifications_of_user = self._notifications_by_user[notification.user_id]
+            del notifications_of_user[notification.id]
+            if not notifications_of_user:
+                del self._notifications_by_user[notification.user_id]
         if self.verbose_debug:
             logger.debug(f"Deleted {notification}")
 
+    def _is_expired(self, notification, received, now):
+        if now - received > self.MAX_AGE:
+            return True
+        # shown but never closed
+        if not notification.last_shown_date:
+            return False
+        last_shown = max(notification.last_shown_date.values()).timestamp()
+        return now - last_shown > self.DELIVERED_RETENTION
+
+    def _sweep(self, force=False):
+        "Deletes the expired notifications, at most every SWEEP_INTERVAL seconds"
+        now = time.time()
+        if not force and now - self._last_sweep < self.SWEEP_INTERVAL:
+            return
+        with self._notifications_lock:
+            self._last_sweep = now
+            expired = [
+                notification
+                for notification, received in self._notifications.values()
+                if self._is_expired(notification, received, now)
+            ]
+            for notification in expired:
+                self._delete_notification(notification)
+        if expired:
+            logger.debug(f"Deleted {len(expired)} expired notifications")
+
     def set_target_ui_availability(self, target_ui, user_id, is_available):
         "Sets ui_notification.is_available"
         ui_notification = self._find_target_ui(target_ui, user_id)
@@ -397,7 +470,7 @@ class NotificationManager:
             # in case       _treat_internal_message returns a notification, then proceed with that
             return self._treat_internal_message(notification)
 
-        self.notifications.append(notification)
+        self._add_notification(notification)
         if self.verbose_debug:
             logger.debug(f"Created notification {notification}")
         return notification
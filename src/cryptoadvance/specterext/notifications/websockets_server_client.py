@@ -3,6 +3,8 @@ This file enabled to keep an open websocket connection with the browser sessions
 """
 import logging, threading, time, secrets
 import time, json
+import queue
+from collections import deque
 from cryptoadvance.specter.util.common import robust_json_dumps
 import simple_websocket, ssl
 from cryptoadvance.specter.specter_error import SpecterError
@@ -12,6 +14,101 @@ logger = logging.getLogger(__name__)
 IGNORE_NOTIFICATION_TITLE = "IGNORE_NOTIFICATION_TITLE"
 
 
+class WebsocketSender:
+    """
+    Sends messages to websockets with a fixed pool of writer threads.
+    Each websocket has its own queue, so a slow browser only delays its own messages.
+    If a queue is full (QUEUE_SIZE), the oldest message gets dropped.
+    The messages of one websocket are sent in order and by one writer at a time.
+    """
+
+    WRITER_THREADS = 4
+    QUEUE_SIZE = 100
+    # max number of messages sent to one websocket before the writer turns to the next one
+    BATCH_SIZE = 10
+
+    def __init__(self, on_closed=None, verbose_debug=False):
+        """
+        Args:
+            on_closed: called with the websocket if it turns out to be closed while sending
+        """
+        self.on_closed = on_closed
+        self.verbose_debug = verbose_debug
+        self._queues = {}
+        # websockets with messages which are waiting for or being handled by a writer
+        self._scheduled = set()
+        self._ready = queue.Queue()
+        self._lock = threading.Lock()
+        self.threads = []
+        self.dropped = 0
+
+    def start(self):
+        for i in range(self.WRITER_THREADS):
+            thread = threading.Thread(target=self._writer, name=f"websocket_writer_{i}")
+            thread.daemon = True  # die when the main thread dies
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        for thread in self.threads:
+            self._ready.put(None)
+        self.threads = []
+
+    def send(self, websocket, data: str):
+        "Queues data for the websocket, returns immediately"
+        with self._lock:
+            if not self.threads:
+                self.start()
+            websocket_queue = self._queues.get(websocket)
+            if websocket_queue is None:
+                websocket_queue = deque(maxlen=self.QUEUE_SIZE)
+                self._queues[websocket] = websocket_queue
+            if len(websocket_queue) == websocket_queue.maxlen:
+                # the deque drops the oldest message
+                self.dropped += 1
+                logger.warning(f"Send queue of {websocket} is full, dropping a message")
+            websocket_queue.append(data)
+            if websocket not in self._scheduled:
+                self._scheduled.add(websocket)
+                self._ready.put(websocket)
+
+    def remove(self, websocket):
+        "Drops the pending messages of the websocket"
+        with self._lock:
+            self._queues.pop(websocket, None)
+
+    def pending(self):
+        "Number of messages which have not been sent yet"
+        with self._lock:
+            return sum(len(q) for q in self._queues.values())
+
+    def _writer(self):
+        while True:
+            websocket = self._ready.get()
+            if websocket is None:
+                return
+            for i in range(self.BATCH_SIZE):
+                with self._lock:
+                    websocket_queue = self._queues.get(websocket)
+                    if not websocket_queue:
+                        self._scheduled.discard(websocket)
+                        break
+                    data = websocket_queue.popleft()
+                try:
+                    if self.verbose_debug:
+                        logger.debug(f"Sending to {websocket} message: {data}")
+                    websocket.send(data)
+                except simple_websocket.ConnectionClosed:
+                    self.remove(websocket)
+                    if self.on_closed:
+                        self.on_closed(websocket)
+                except Exception as e:
+                    logger.exception(e)
+            else:
+                # give the other websockets a chance
+                self._ready.put(websocket)
+
+
 class WebsocketServer:
     """
     A forever lived websockets server in a different thread.
@@ -68,6 +165,9 @@ class WebsocketServer:
         self.connections = list()
         self.notification_manager = notification_manager
         self.verbose_debug = verbose_debug
+        self.sender = WebsocketSender(
+            on_closed=self._unregister, verbose_debug=verbose_debug
+        )
 
     def __str__(self):
         return str(self.__dict__)
@@ -170,6 +270,7 @@ class WebsocketServer:
             )
         )
         self.connections = [d for d in self.connections if d["websocket"] != websocket]
+        self.sender.remove(websocket)
         logger.debug(
             f"Unregistered {websocket} belonging to {username}, started at {connection_dict['opening_time']}"
         )
@@ -318,24 +419,6 @@ class WebsocketServer:
         )
         return notification
 
-    def _send(self, websocket, message_dictionary):
-        "Starts a new thread and sends the data to websocket"
-
-        def target():
-            try:
-                if self.verbose_debug:
-                    logger.debug(
-                        f"_send_to_websockets  {websocket} message: {message_dictionary}"
-                    )
-                websocket.send(robust_json_dumps(message_dictionary))
-            except simple_websocket.ConnectionClosed:
-                self._unregister(websocket)
-
-        thread = threading.Thread(target=target)
-        thread.daemon = True  # die when the main thread dies
-        thread.start()
-        thread.join()
-
     def _send_to_websockets(self, message_dictionary, broadcaster_token):
         """
         This sends out messages to the connected websockets, which are associated with message_dictionary['options']['user_id']
@@ -356,8 +439,10 @@ class WebsocketServer:
                 f"No websocket for this recipient_user.websocket_token could be found"
             )
             return
+        # serialize only once for all the connections
+        data = robust_json_dumps(message_dictionary)
         for websocket in connections:
-            self._send(websocket, message_dictionary)
+            self.sender.send(websocket, data)
 
 
 class WebsocketClient:
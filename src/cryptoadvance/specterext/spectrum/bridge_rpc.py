@@ -4,6 +4,7 @@ import json
 import logging
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 import urllib3
@@ -14,6 +15,7 @@ from cryptoadvance.specter.rpc import BitcoinRPC
 from cryptoadvance.specter.rpc import RpcError as SpecterRpcError
 from cryptoadvance.spectrum.spectrum import RPCError as SpectrumRpcError
 from cryptoadvance.specter.specter_error import BrokenCoreConnectionException
+from cryptoadvance.specter.util.flask import with_app_context
 
 from cryptoadvance.spectrum.spectrum import Spectrum
 from cryptoadvance.spectrum.spectrum_error import RPCError
@@ -28,6 +30,40 @@ logger = logging.getLogger(__name__)
 class BridgeRPC(BitcoinRPC):
     """A class which behaves like a BitcoinRPC but internally bridges to Spectrum.jsonrpc"""
 
+    # max number of read-only calls of a batch which are made concurrently, 1 makes all calls sequentially
+    CONCURRENCY = 1
+    # the calls without side effects, only these are made concurrently
+    # (not e.g. getnewaddress, which looks read-only but moves the address index)
+    READ_ONLY_METHODS = frozenset(
+        [
+            "getblockchaininfo",
+            "getblockcount",
+            "getblockfilter",
+            "getblockhash",
+            "getmempoolinfo",
+            "getmininginfo",
+            "getnetworkinfo",
+            "gettxoutsetinfo",
+            "uptime",
+            "estimatesmartfee",
+            "getrawtransaction",
+            "testmempoolaccept",
+            "listwallets",
+            "listwalletdir",
+            "getwalletinfo",
+            "getaddressinfo",
+            "getaddressesbylabel",
+            "getbalances",
+            "getreceivedbyaddress",
+            "gettransaction",
+            "listlabels",
+            "listlockunspent",
+            "listsinceblock",
+            "listtransactions",
+            "listunspent",
+        ]
+    )
+
     def __init__(
         self,
         spectrum,
@@ -92,19 +128,9 @@ class BridgeRPC(BitcoinRPC):
         try:
             if not has_app_context() and self._app is not None:
                 with self._app.app_context():
-                    result = [
-                        self.spectrum.jsonrpc(
-                            item, wallet_name=self.wallet_name, catch_exceptions=False
-                        )
-                        for item in payload
-                    ]
+                    result = self._jsonrpc_batch(payload)
             else:
-                result = [
-                    self.spectrum.jsonrpc(
-                        item, wallet_name=self.wallet_name, catch_exceptions=False
-                    )
-                    for item in payload
-                ]
+                result = self._jsonrpc_batch(payload)
             return result
 
         except ValueError as ve:
@@ -118,5 +144,36 @@ class BridgeRPC(BitcoinRPC):
                 str(se), status_code=500, error_code=se.code, error_msg=se.message
             )
 
+    def _jsonrpc(self, item):
+        return self.spectrum.jsonrpc(
+            item, wallet_name=self.wallet_name, catch_exceptions=False
+        )
+
+    def _jsonrpc_batch(self, payload):
+        """Makes the calls of the payload and returns the results in the same order.
+        Consecutive read-only calls are made concurrently (up to CONCURRENCY at a time),
+        all other calls are made on their own after the calls before them have finished.
+        As with sequential calls, the first failing call (in payload order) raises.
+        """
+        if self.CONCURRENCY <= 1 or len(payload) <= 1:
+            return [self._jsonrpc(item) for item in payload]
+        result = []
+        jsonrpc = with_app_context(self._jsonrpc)
+        with ThreadPoolExecutor(
+            max_workers=min(self.CONCURRENCY, len(payload)),
+            thread_name_prefix="BridgeRPC",
+        ) as executor:
+            read_only = []
+            for item in payload + [None]:
+                if item is not None and item["method"] in self.READ_ONLY_METHODS:
+                    read_only.append(item)
+                    continue
+                # map() yields the results in order and raises the first exception
+                result += list(executor.map(jsonrpc, read_only))
+                read_only = []
+                if item is not None:
+                    result.append(self._jsonrpc(item))
+        return result
+
     def __repr__(self) -> str:
         return f"<BridgeRPC {self.spectrum}>"
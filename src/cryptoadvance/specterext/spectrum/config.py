@@ -40,6 +40,9 @@ class BaseConfig(object):
         "SUPPRESS_JSONRPC_LOGGING", default="false"
     )
 
+    # Max number of read-only calls of a batch the BridgeRPC makes concurrently, 1 makes them sequentially
+    SPECTRUM_RPC_CONCURRENCY = int(os.getenv("SPECTRUM_RPC_CONCURRENCY", "1"))
+
 
 # Level 1: How does persistence work?
 # Convention: BlaConfig
@@ -12,6 +12,7 @@ from cryptoadvance.specter.specter_error import SpecterError
 from flask import current_app as app
 from flask import url_for
 from flask_apscheduler import APScheduler
+from cryptoadvance.specterext.spectrum.bridge_rpc import BridgeRPC
 from cryptoadvance.specterext.spectrum.spectrum_node import SpectrumNode
 from cryptoadvance.spectrum.server import init_app, Spectrum
 from cryptoadvance.spectrum.db import db
@@ -80,6 +81,7 @@ class SpectrumService(Service):
         )
         db.init_app(app)
         db.create_all()
+        BridgeRPC.CONCURRENCY = app.config["SPECTRUM_RPC_CONCURRENCY"]
         # Check whether there is a Spectrum node in the node manager of Specter
         if self.is_spectrum_node_available:
             try:
@@ -95,16 +95,27 @@ def pytest_addoption(parser):
         default=False,
         help="Run tests marked jade_hardware (real Jade attached + operator).",
     )
+    parser.addoption(
+        "--run-benchmarks",
+        action="store_true",
+        default=False,
+        help="Run tests marked benchmark (they print their measurements).",
+    )
     listen()
 
 
 def pytest_collection_modifyitems(config, items):
-    if config.getoption("--run-jade-hardware"):
-        return
-    skip = pytest.mark.skip(reason="opt-in via --run-jade-hardware")
-    for item in items:
-        if item.get_closest_marker("jade_hardware") is not None:
-            item.add_marker(skip)
+    opt_in_markers = {
+        "jade_hardware": "--run-jade-hardware",
+        "benchmark": "--run-benchmarks",
+    }
+    for marker, option in opt_in_markers.items():
+        if config.getoption(option):
+            continue
+        skip = pytest.mark.skip(reason=f"opt-in via {option}")
+        for item in items:
+            if item.get_closest_marker(marker) is not None:
+                item.add_marker(skip)
 
 
 def pytest_generate_tests(metafunc):
@@ -1,6 +1,7 @@
 import json
 import logging
 import os
+import threading
 import time
 from unittest.mock import MagicMock, patch
 
@@ -17,6 +18,8 @@ from cryptoadvance.specter.managers.wallet_manager import WalletManager
 from cryptoadvance.specter.specter_error import SpecterError
 from cryptoadvance.specter.util.descriptor import AddChecksum, Descriptor
 from cryptoadvance.specter.util.wallet_importer import WalletImporter
+from embit.script import address_to_scriptpubkey
+from embit.transaction import Transaction, TransactionInput, TransactionOutput
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +85,36 @@ def test_WalletManager(
         "a_multisig_test_wallet",
         "wallet_for_wallet_manager_test",
     ]
+    # Another WalletManager on the same folder loads the wallets (in parallel)
+    wm2 = WalletManager(
+        devices_filled_data_folder,
+        bitcoin_regtest.get_rpc(),
+        "regtest",
+        device_manager,
+    )
+    assert wm2.wallets_names == wm.wallets_names
+    assert wm2.loading_progress == {"total": 2, "done": 2}
+    assert wm2.wallets["a_multisig_test_wallet"].amount_total == 4
+
+    # refresh_wallets updates balance and utxo of all wallets in parallel ...
+    tip = wm.rpc.getbestblockhash()
+    assert wm.refresh_wallets(tip=tip)
+    assert len(multisig_wallet.full_utxo) == 1
+    # ... but skips the ones which are still fresh for the tip
+    bitcoin_regtest.testcoin_faucet(multisig_address, amount=1, confirm_payment=False)
+    assert wm.refresh_wallets(tip=tip)
+    assert multisig_wallet.amount_total == 4
+    assert wm.refresh_wallets([multisig_wallet], tip=tip, force=True)
+    assert multisig_wallet.amount_total == 5
+    # while a refresh is running, the wallets keep their last balance ...
+    with wm._refresh_lock:
+        assert not wm.refresh_wallets(tip=tip)
+    # ... unless the refresh is forced, which waits for the running one
+    bitcoin_regtest.testcoin_faucet(multisig_address, amount=1, confirm_payment=False)
+    wm._refresh_lock.acquire()
+    threading.Timer(0.5, wm._refresh_lock.release).start()
+    assert wm.refresh_wallets([multisig_wallet], tip=tip, force=True)
+    assert multisig_wallet.amount_total == 6
 
     # You can rename a wallet using the wallet manager using `rename_wallet`, passing the wallet object and the new name to assign to it
     wm.rename_wallet(multisig_wallet, "new_name_test_wallet")
@@ -734,3 +767,80 @@ def test_threading(specter_regtest_configured_with_threading):
     wallet = wm.create_wallet("test_wallet", 1, "wpkh", [device.keys[5]], [device])
     assert wm.wallets_names == ["test_wallet"]
     assert wm.data_folder.endswith("wallets")
+
+
+ADDRESS = "bcrt1q7mlxxdna2e2ufzgalgp5zhtnndl7qddlxjy5eg"
+
+
+class ZmqWallet:
+    """Stands in for a Wallet in the ZMQ tests, records what is done with it"""
+
+    def __init__(self, name, addresses=(), txids=(), tables_loaded=True, fails=False):
+        self.name = self.alias = name
+        self.addresses, self.txids = set(addresses), set(txids)
+        self.tables_loaded = tables_loaded
+        self.fails = fails
+        self.calls = []
+
+    def is_affected_by(self, addresses, prev_txids):
+        return bool(self.addresses & addresses or self.txids & prev_txids)
+
+    def fetch_transactions(self):
+        if self.fails:
+            raise SpecterError("Wallet not loaded in Bitcoin Core")
+        self.calls.append("fetch_transactions")
+
+    def update_balance(self):
+        self.calls.append("update_balance")
+
+
+def zmq_wallet_manager(tmp_path, wallets):
+    wm = WalletManager(str(tmp_path), None, "regtest", None)
+    wm.wallets = {wallet.name: wallet for wallet in wallets}
+    for wallet in wallets:
+        wm._refreshed[wallet.name] = ("sometip", time.time())
+    return wm
+
+
+def test_wallets_affected_by_tx(tmp_path):
+    prev_txid = "aa" * 32
+    script = address_to_scriptpubkey(ADDRESS)
+    tx = Transaction(
+        vin=[TransactionInput(bytes.fromhex(prev_txid), 0)],
+        vout=[TransactionOutput(1000, script)],
+    )
+    receiving = ZmqWallet("receiving", addresses=[ADDRESS])
+    spending = ZmqWallet("spending", txids=[prev_txid])
+    cold = ZmqWallet("cold", addresses=[ADDRESS], tables_loaded=False)
+    cold.is_affected_by = lambda *args: False  # like Wallet.is_affected_by
+    other = ZmqWallet("other", addresses=["bcrt1qother"], txids=["bb" * 32])
+    wm = zmq_wallet_manager(tmp_path, [receiving, spending, cold, other])
+    assert wm.wallets_affected_by_tx(tx) == [receiving, spending]
+
+
+def test_on_zmq_notification(tmp_path):
+    failing = ZmqWallet("failing", addresses=[ADDRESS], fails=True)
+    loaded = ZmqWallet("loaded", addresses=[ADDRESS])
+    cold = ZmqWallet("cold", tables_loaded=False)
+    wm = zmq_wallet_manager(tmp_path, [failing, loaded, cold])
+
+    # a failing wallet doesn't stop the others, cold wallets are left alone
+    wm.on_zmq_notification("hashblock", b"\xaa" * 32)
+    assert loaded.calls == ["fetch_transactions", "update_balance"]
+    assert cold.calls == []
+    assert wm._refreshed == {"cold": ("sometip", wm._refreshed["cold"][1])}
+
+    # a tx refreshes only the affected wallets
+    loaded.calls = []
+    tx = Transaction(
+        vin=[TransactionInput(b"\xcc" * 32, 0)],
+        vout=[TransactionOutput(1000, address_to_scriptpubkey(ADDRESS))],
+    )
+    wm.on_zmq_notification("rawtx", tx.serialize())
+    assert loaded.calls == ["fetch_transactions", "update_balance"]
+    assert cold.calls == []
+
+    # other topics are ignored
+    loaded.calls = []
+    wm.on_zmq_notification("hashtx", b"\xaa" * 32)
+    assert loaded.calls == []
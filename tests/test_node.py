@@ -143,3 +143,21 @@ def test_Node_elm(elements_elreg):
         # {'version': 200100, 'subversion': '/Satoshi:0.20.1/', 'protocolversion': 70015, 'localservices': '0000000000000409', 'localservicesnames': ['NETWORK', 'WITNESS', 'NETWORK_LIMITED'], 'localrelay': True, 'timeoffset': 0, 'networkactive': True, 'connections': 0, 'networks': [{'name': 'ipv4', 'limited': False, 'reachable': True, 'proxy': '', 'proxy_randomize_credentials': False}, {'name': 'ipv6', 'limited': False, 'reachable': True, 'proxy': '', 'proxy_randomize_credentials': False}, {'name': 'onion', 'limited': True, 'reachable': False, 'proxy': '', 'proxy_randomize_credentials': False}], 'relayfee': 1e-05, 'incrementalfee': 1e-05, 'localaddresses': [{'address': '2a02:810d:d00:7700:233e:a7e:ded8:f2da', 'port': 18542, 'score': 1}, {'address': '2a02:810d:d00:7700:29ec:5c5b:196b:78b2', 'port': 18542, 'score': 1}], 'warnings': ''}
         assert node.network_info["connections"] == 0
         assert node.network_info["warnings"] == ""
+
+
+def test_Node_zmq_endpoints():
+    node = MagicMock(host="10.0.0.2")
+    node.rpc.getzmqnotifications.return_value = [
+        {"type": "pubhashblock", "address": "tcp://0.0.0.0:28332", "hwm": 1000},
+        {"type": "pubrawtx", "address": "tcp://127.0.0.1:28333", "hwm": 1000},
+    ]
+    # wildcards are replaced by the host of the node
+    assert Node.zmq_endpoints(node) == {
+        "hashblock": "tcp://10.0.0.2:28332",
+        "rawtx": "tcp://127.0.0.1:28333",
+    }
+    # no ZMQ notifications configured or no connection
+    node.rpc.getzmqnotifications.return_value = []
+    assert Node.zmq_endpoints(node) == {}
+    node.rpc.getzmqnotifications.side_effect = SpecterError("no connection")
+    assert Node.zmq_endpoints(node) == {}
@@ -150,3 +150,49 @@ def test_sending_flash_notification(specter_with_user: Specter, caplog):
 
     # the notification was deleted again
     assert len(notification_manager.notifications) == 0
+
+
+def test_notification_indexes_and_retention():
+    notification_manager = NotificationManager(
+        host="localhost",
+        port="1234",
+        ssl_cert=None,
+        ssl_key=None,
+        enable_websockets=False,
+    )
+    notification_manager.MAX_NOTIFICATIONS_PER_USER = 3
+
+    notifications = [
+        notification_manager.create_notification(
+            f"title {i}", "someuser", target_uis={"js_message_box"}
+        )
+        for i in range(4)
+    ]
+    other = notification_manager.create_notification(
+        "other", "otheruser", target_uis={"js_message_box"}
+    )
+    # the oldest one of someuser was deleted
+    assert notification_manager.get_notification_by_id(notifications[0].id) is None
+    assert (
+        notification_manager.get_notifications_of_user("someuser") == notifications[1:]
+    )
+    assert notification_manager.get_notifications_of_user("otheruser") == [other]
+    assert notification_manager.notifications == notifications[1:] + [other]
+    assert notification_manager.get_notification_by_id(other.id) is other
+
+    # shown notifications are deleted after DELIVERED_RETENTION
+    notifications[1].set_shown("js_message_box", datetime.datetime.now())
+    notifications[2].set_shown(
+        "js_message_box", datetime.datetime.now() - datetime.timedelta(hours=2)
+    )
+    notification_manager._sweep(force=True)
+    assert notification_manager.get_notifications_of_user("someuser") == [
+        notifications[1],
+        notifications[3],
+    ]
+
+    # and all after MAX_AGE
+    notification_manager.MAX_AGE = -1
+    notification_manager._sweep(force=True)
+    assert notification_manager.notifications == []
+    assert notification_manager.get_notifications_of_user("someuser") == []
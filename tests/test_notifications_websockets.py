@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+
+import pytest
+import simple_websocket
+from cryptoadvance.specterext.notifications.websockets_server_client import (
+    WebsocketSender,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class FakeWebsocket:
+    """Stands in for a simple_websocket connection to a browser"""
+
+    def __init__(self, delay=0, closed=False):
+        self.delay = delay
+        self.closed = closed
+        self.received = []
+        self.event = threading.Event()
+        self.expected = 0
+
+    def send(self, data):
+        if self.closed:
+            raise simple_websocket.ConnectionClosed()
+        if self.delay:
+            time.sleep(self.delay)
+        self.received.append(data)
+        if len(self.received) >= self.expected:
+            self.event.set()
+
+
+def wait_until(condition, timeout=5):
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_WebsocketSender():
+    closed_websockets = []
+    sender = WebsocketSender(on_closed=closed_websockets.append)
+    sender.QUEUE_SIZE = 5
+    fast = FakeWebsocket()
+    slow = FakeWebsocket(delay=0.2)
+    closed = FakeWebsocket(closed=True)
+    try:
+        for i in range(5):
+            sender.send(fast, f"msg{i}")
+        # in order
+        assert wait_until(lambda: len(fast.received) == 5)
+        assert fast.received == [f"msg{i}" for i in range(5)]
+
+        # a slow websocket doesn't block the others, its oldest messages get dropped
+        for i in range(8):
+            sender.send(slow, f"slow{i}")
+        sender.send(fast, "after slow")
+        assert wait_until(lambda: fast.received[-1] == "after slow", timeout=0.5)
+        assert sender.dropped > 0
+        assert wait_until(lambda: len(slow.received) == 8 - sender.dropped)
+        assert slow.received[-1] == "slow7"
+        assert sender.pending() == 0
+
+        # closed websockets are reported
+        sender.send(closed, "nobody listens")
+        assert wait_until(lambda: closed_websockets == [closed])
+    finally:
+        sender.stop()
+
+
+def send_with_threads(websockets, data):
+    """What WebsocketServer did before WebsocketSender: one thread per message and websocket"""
+    for websocket in websockets:
+        thread = threading.Thread(target=websocket.send, args=(data,))
+        thread.daemon = True
+        thread.start()
+        thread.join()
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("clients,delay", [(10, 0), (100, 0), (100, 0.001)])
+def test_WebsocketSender_benchmark(clients, delay):
+    messages = 200
+    websockets = [FakeWebsocket(delay=delay) for i in range(clients)]
+    # one slow client
+    websockets[0].delay = 0.05
+    for websocket in websockets:
+        websocket.expected = messages
+
+    sender = WebsocketSender()
+    sender.QUEUE_SIZE = messages
+    start = time.perf_counter()
+    for i in range(messages):
+        for websocket in websockets:
+            sender.send(websocket, f"message {i}")
+    for websocket in websockets[1:]:
+        assert websocket.event.wait(timeout=60)
+    duration = time.perf_counter() - start
+    sender.stop()
+
+    for websocket in websockets:
+        websocket.received = []
+    websockets[0].delay = delay
+    # the old way takes too long with a slow client, so without it
+    start = time.perf_counter()
+    for i in range(messages // 10):
+        send_with_threads(websockets, f"message {i}")
+    old_duration = (time.perf_counter() - start) * 10
+
+    print(
+        f"\n{clients} clients, {delay * 1000}ms per send: "
+        f"WebsocketSender {messages * (clients - 1) / duration:.0f} messages/s to the fast clients, "
+        f"thread per message {messages * clients / old_duration:.0f} messages/s"
+    )
@@ -170,6 +170,46 @@ def test_rr_psbt_post(specter_regtest_configured, bitcoin_regtest, client, caplo
     assert data["result"]["sigs_count"] == 0
 
 
+def test_rr_frozen_utxos(client, specter_regtest_configured, bitcoin_regtest):
+    create_a_simple_wallet(specter_regtest_configured, bitcoin_regtest)
+    url = "/api/v1alpha/wallets/a_simple_wallet/frozen_utxos"
+
+    # the wallet is owned by someuser, not by admin
+    headers = {
+        "Authorization": "Bearer "
+        + create_registered_jwt_token(specter_regtest_configured, "admin")
+    }
+    for result in [
+        client.get(url, follow_redirects=True, headers=headers),
+        client.post(url, json={"freeze": []}, headers=headers),
+    ]:
+        assert result.status_code == 403
+        assert (
+            json.loads(result.data)["message"]
+            == "The wallet does not belong to the user in the request."
+        )
+
+    headers = {
+        "Authorization": "Bearer "
+        + create_registered_jwt_token(specter_regtest_configured, "someuser")
+    }
+    result = client.get(
+        "/api/v1alpha/wallets/unknown_wallet/frozen_utxos",
+        follow_redirects=True,
+        headers=headers,
+    )
+    assert result.status_code == 403
+    result = client.post(url, json={"freeze": ["notautxo"]}, headers=headers)
+    assert result.status_code == 400
+    assert (
+        json.loads(result.data)["message"]
+        == '"freeze" needs to be a list of "txid:vout"'
+    )
+    result = client.get(url, follow_redirects=True, headers=headers)
+    assert result.status_code == 200
+    assert json.loads(result.data)["result"] == []
+
+
 def create_a_simple_wallet(specter: Specter, bitcoin_regtest):
     """ToDo: Could potentially do this with a fixture but this is only relevant for this file only"""
     payload = jwt.decode(
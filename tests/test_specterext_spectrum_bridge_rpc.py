@@ -1,3 +1,5 @@
+import threading
+import time
 from unittest.mock import MagicMock
 from cryptoadvance.specterext.spectrum.bridge_rpc import BridgeRPC
 from cryptoadvance.spectrum.spectrum import RPCError as SpectrumRpcError
@@ -51,3 +53,70 @@ def test_exceptionHandling():
     brpc = BridgeRPC(spectrum_mock)
     with pytest.raises(SpecterRpcError):
         brpc.walletcreatefundedpsbt()
+
+
+class SlowSpectrum:
+    """Answers like Spectrum.jsonrpc but takes its time and records the concurrency"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.calls = []
+
+    def jsonrpc(self, item, wallet_name=None, catch_exceptions=True):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            # non-read-only calls must not overlap with anything
+            if self.calls and self.calls[-1] in ["lockunspent", "getnewaddress"]:
+                assert self.running == 1
+            if item["method"] in ["lockunspent", "getnewaddress"]:
+                assert self.running == 1
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+            self.calls.append(item["method"])
+        if item["params"] == ["fails"]:
+            raise SpectrumRpcError("Muh")
+        return {"result": item["params"], "error": None, "id": item["id"]}
+
+
+def test_multi_concurrently(monkeypatch):
+    spectrum = SlowSpectrum()
+    brpc = BridgeRPC(spectrum, wallet_name="w")
+    calls = [("gettransaction", i) for i in range(10)]
+
+    # sequentially by default
+    assert [r["id"] for r in brpc.multi(calls)] == list(range(10))
+    assert spectrum.max_running == 1
+
+    monkeypatch.setattr(BridgeRPC, "CONCURRENCY", 4)
+    start = time.time()
+    result = brpc.multi(calls)
+    assert time.time() - start < 10 * spectrum.delay
+    assert spectrum.max_running == 4
+    assert [r["id"] for r in result] == list(range(10))
+    assert [r["result"] for r in result] == [[i] for i in range(10)]
+
+    # calls which are not read-only are made on their own, in order
+    spectrum.calls = []
+    calls = [
+        ("getaddressinfo", "a"),
+        ("getaddressinfo", "b"),
+        ("lockunspent", False, []),
+        ("getaddressinfo", "c"),
+    ]
+    result = brpc.multi(calls)
+    assert [r["id"] for r in result] == [0, 1, 2, 3]
+    assert spectrum.calls[2] == "lockunspent"
+    # even if they look read-only
+    spectrum.calls = []
+    calls = [("getaddressinfo", "a"), ("getnewaddress",), ("getaddressinfo", "b")]
+    brpc.multi(calls)
+    assert spectrum.calls == ["getaddressinfo", "getnewaddress", "getaddressinfo"]
+
+    # errors are raised like in sequential mode
+    with pytest.raises(SpecterRpcError):
+        brpc.multi([("gettransaction", "a"), ("gettransaction", "fails")])
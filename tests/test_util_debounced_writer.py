@@ -0,0 +1,46 @@
+import json
+import os
+import time
+
+from cryptoadvance.specter.util.debounced_writer import DebouncedWriter
+
+
+def read(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def test_DebouncedWriter(tmp_path):
+    writer = DebouncedWriter()
+    writer.DELAY = 0.2
+    path = str(tmp_path / "wallet.json")
+    other = str(tmp_path / "other.json")
+    # a burst of saves is one write of the last content
+    for i in range(10):
+        writer.schedule(path, {"i": i})
+    writer.schedule(other, {"other": True})
+    assert not os.path.isfile(path)
+    assert writer.is_pending(path)
+    time.sleep(0.5)
+    assert read(path) == {"i": 9}
+    assert read(other) == {"other": True}
+    assert writer.writes == 2
+
+    # flush writes the pending content immediately
+    writer.schedule(path, {"i": 10})
+    writer.flush(path)
+    assert read(path) == {"i": 10}
+    assert not writer.is_pending(path)
+
+    # discarded writes don't recreate deleted files
+    writer.schedule(other, {"other": False})
+    writer.discard(other)
+    os.remove(other)
+    time.sleep(0.5)
+    assert not os.path.isfile(other)
+    assert writer.writes == 3
+
+    # without a delay it's written immediately
+    writer.DELAY = 0
+    writer.schedule(path, {"i": 11})
+    assert read(path) == {"i": 11}
@@ -1,7 +1,12 @@
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+
 from cryptoadvance.specter.util.fee_estimation import (
     FeeEstimationResult,
     FeeEstimationResultEncoder,
+    FeeEstimator,
 )
 
 
@@ -21,3 +26,93 @@ def test_FeeEstimationResultEncoder():
     my_dict = json.loads(my_json)
     assert my_dict["result"]["fastestFee"] == 1
     assert my_dict["error_messages"][1] == "yet another one"
+
+
+def test_FeeEstimator():
+    specter_mock = MagicMock()
+    specter_mock.is_liquid = False
+    specter_mock.chain = "main"
+    specter_mock.fee_estimator = "bitcoin_core"
+    calls = []
+
+    def multi(batch):
+        calls.append(batch)
+        time.sleep(0.1)
+        return [
+            {"result": {"feerate": 0.0001 * (4 - i)}, "error": None}
+            for i in range(len(batch))
+        ]
+
+    specter_mock.rpc.multi.side_effect = multi
+    config = {"FEEESTIMATION_REQUEST_TIMEOUT": 1}
+    estimator = FeeEstimator()
+    # concurrent requests share one fetch with all targets in one batch
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        results = list(
+            executor.map(lambda i: estimator.get(specter_mock, config), range(5))
+        )
+    assert len(calls) == 1
+    assert [call[1] for call in calls[0]] == [1, 3, 6, 20]
+    assert all(result.result == results[0].result for result in results)
+    assert results[0].result == {
+        "fastestFee": 40,
+        "halfHourFee": 30,
+        "hourFee": 20,
+        "minimumFee": 10,
+    }
+    # cached, callers get their own copy
+    results[0].add_error_message("only mine")
+    json.dumps(results[0], cls=FeeEstimationResultEncoder)
+    result = estimator.get(specter_mock, config)
+    assert result.result["fastestFee"] == 40
+    assert result.error_messages == []
+    assert len(calls) == 1
+
+    # refreshed in the background on a new block
+    estimator.on_new_block()
+    for i in range(50):
+        if len(calls) == 2 and estimator._results:
+            break
+        time.sleep(0.05)
+    assert len(calls) == 2
+    estimator.get(specter_mock, config)
+    assert len(calls) == 2
+
+
+def test_FeeEstimator_refreshes_the_last_request():
+    def specter_mock(node_alias):
+        specter_mock = MagicMock()
+        specter_mock.is_liquid = False
+        specter_mock.fee_estimator = "bitcoin_core"
+        specter_mock.active_node_alias = node_alias
+        specter_mock.rpc.multi.side_effect = lambda batch: [
+            {"result": {"feerate": 0.0001}, "error": None} for _ in batch
+        ]
+        return specter_mock
+
+    config = {"FEEESTIMATION_REQUEST_TIMEOUT": 1}
+    estimator = FeeEstimator()
+    alice, bob = specter_mock("alice_node"), specter_mock("bob_node")
+    estimator.get(alice, config)
+    estimator.get(bob, config)
+    estimator.get(alice, config)
+    # without a request context the specter would resolve the admin's settings,
+    # the refresh uses the ones captured with the last request instead
+    alice.active_node_alias = "admin_node"
+    alice.rpc.multi.reset_mock()
+    estimator.on_new_block()
+    for i in range(50):
+        if estimator._results:
+            break
+        time.sleep(0.05)
+    assert list(estimator._results) == [("bitcoin_core", None, "alice_node")]
+    assert alice.rpc.multi.call_count == 1
+    assert bob.rpc.multi.call_count == 1
+
+    # nothing to refresh without the cache
+    estimator = FeeEstimator()
+    estimator.TTL = 0
+    estimator.get(alice, config)
+    estimator.on_new_block()
+    assert estimator.fetch_count == 1
+    assert not estimator._fetches
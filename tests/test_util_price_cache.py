@@ -0,0 +1,163 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+from cryptoadvance.specter.util.price_cache import DAY, HOUR, PriceCache
+
+DAY0 = 1636502400  # 2021-11-10 00:00 UTC
+
+
+def price(timestamp):
+    return 60000 + (timestamp - DAY0) / HOUR
+
+
+class StubExchange(BaseHTTPRequestHandler):
+    """Answers like bitstamp's ohlc and spotbit's history endpoints"""
+
+    paths = []
+    # seconds each answer takes
+    delay = 0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: int(v[0]) for k, v in parse_qs(url.query).items()}
+        self.paths.append(self.path)
+        time.sleep(self.delay)
+        if url.path.startswith("/api/v2/ohlc/"):
+            data = {
+                "data": {
+                    "ohlc": [
+                        {
+                            "timestamp": str(timestamp),
+                            "close": str(price(timestamp)),
+                        }
+                        for timestamp in range(
+                            query["start"],
+                            query["start"] + query["limit"] * query["step"],
+                            query["step"],
+                        )
+                        if timestamp + query["step"] <= time.time()
+                    ]
+                }
+            }
+        else:
+            data = {
+                "data": [
+                    [0, timestamp * 1000, "", "BTC-USD", 0, 0, 0, price(timestamp), 1]
+                    for timestamp in range(
+                        query["start"] // 1000, query["end"] // 1000, 60
+                    )
+                ]
+            }
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_url(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubExchange)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(PriceCache, "BITSTAMP_URL", url)
+    monkeypatch.setattr(PriceCache, "SPOTBIT_URL", url)
+    StubExchange.paths = []
+    StubExchange.delay = 0
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+def test_PriceCache(stub_url, tmp_path):
+    session = requests.Session()
+    cache = PriceCache(str(tmp_path))
+    # hourly, one request for the hours around as well
+    assert cache.price_at(session, "bitstamp", "usd", DAY0 + 3 * HOUR + 5) == price(
+        DAY0 + 3 * HOUR
+    )
+    assert cache.price_at(session, "bitstamp", "usd", DAY0 + 400 * HOUR) == price(
+        DAY0 + 400 * HOUR
+    )
+    assert len(StubExchange.paths) == 1
+    assert "limit=999&step=3600" in StubExchange.paths[0]
+    # daily ranges
+    prices = cache.prices(session, "bitstamp", "usd", DAY0, DAY0 + 10 * DAY)
+    assert len(prices) == 11
+    assert prices[DAY0 + DAY] == price(DAY0 + DAY)
+    assert len(StubExchange.paths) == 2
+
+    # spotbit, the close of an hour is the close of its last minute
+    assert cache.price_at(session, "spotbit_bitstamp", "usd", DAY0 + 10) == price(
+        DAY0 + HOUR - 60
+    )
+    assert "/api/history/usd/bitstamp?" in StubExchange.paths[-1]
+    assert cache.requests == 3
+
+    # persisted and shared with other instances
+    other = PriceCache(str(tmp_path))
+    assert other.price_at(session, "bitstamp", "usd", DAY0) == price(DAY0)
+    assert other.prices(session, "bitstamp", "usd", DAY0, DAY0 + 10 * DAY) == prices
+    assert other.requests == 0
+    assert len(StubExchange.paths) == 3
+
+    # only MAX_SERIES series are kept in memory
+    other.MAX_SERIES = 1
+    other.price_at(session, "spotbit_bitstamp", "usd", DAY0)
+    assert list(other._series) == [("spotbit_bitstamp", "usd", HOUR)]
+    assert other.requests == 0
+
+
+def test_PriceCache_incomplete_candles(stub_url):
+    session = requests.Session()
+    cache = PriceCache()
+    now = int(time.time())
+    current = now - now % DAY
+    yesterday = current - DAY
+    # the current day is not complete, so not cached
+    prices = cache.prices(session, "bitstamp", "usd", yesterday, current)
+    assert prices == {yesterday: price(yesterday), current: None}
+    cache.prices(session, "bitstamp", "usd", yesterday, current)
+    assert cache.requests == 2
+    # and nothing in the future is requested
+    assert cache.price_at(session, "bitstamp", "usd", now + 2 * DAY, DAY) is None
+    assert cache.requests == 2
+
+
+def test_PriceCache_doesnt_block_while_fetching(stub_url):
+    session = requests.Session()
+    cache = PriceCache()
+    cache.price_at(session, "spotbit_bitstamp", "usd", DAY0)
+    StubExchange.delay = 1
+    results = []
+
+    def fetch():
+        results.append(cache.prices(session, "bitstamp", "usd", DAY0, DAY0 + DAY))
+
+    threads = [threading.Thread(target=fetch) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    while len(StubExchange.paths) < 2:
+        time.sleep(0.01)
+    # other series are answered while the fetch is running
+    start = time.time()
+    assert cache.price_at(session, "spotbit_bitstamp", "usd", DAY0) == price(
+        DAY0 + HOUR - 60
+    )
+    assert time.time() - start < StubExchange.delay / 2
+    for thread in threads:
+        thread.join()
+    # the second thread waited for the fetch of the first one
+    assert len(StubExchange.paths) == 2
+    assert (
+        results[0] == results[1] == {DAY0: price(DAY0), DAY0 + DAY: price(DAY0 + DAY)}
+    )
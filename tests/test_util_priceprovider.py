@@ -4,6 +4,7 @@ import pytest
 from cryptoadvance.specter.specter import Specter
 from cryptoadvance.specter.specter_error import SpecterError
 from cryptoadvance.specter.util.price_providers import (
+    DailyPriceSeries,
     get_price_at,
     currency_mapping,
     _parse_exchange_currency,
@@ -216,3 +217,71 @@ def test_parse_exchange_currency():
         _parse_exchange_currency("something_spotbit_bitstamp_eur")
     with pytest.raises(SpecterError):
         _parse_exchange_currency("bitstamp")
+
+
+def test_DailyPriceSeries():
+    specter_mock = MagicMock()
+    specter_mock.requests_session.return_value = requests.Session()
+    specter_mock.price_check = True
+    specter_mock.price_provider = "bitstamp_usd"
+    day = 1636502400  # 2021-11-10 00:00 UTC
+    urls = []
+
+    def mock_get(url):
+        urls.append(url)
+        response = Mock()
+        response.status_code = 200
+        response.json.return_value = {
+            "data": {
+                "ohlc": [
+                    {"close": str(60000 + i), "timestamp": str(day + i * 86400)}
+                    for i in range(-3, 3)
+                ]
+            }
+        }
+        return response
+
+    series = DailyPriceSeries(specter_mock)
+    with patch("requests.Session.get", side_effect=mock_get):
+        assert series.price_at(day + 3600) == 60000
+        assert series.price_at(day - 86400) == 59999
+        assert series.price_at(day + 2 * 86400 + 10) == 60002
+    # one request for the whole window
+    assert len(urls) == 1
+    assert "limit=999&step=86400" in urls[0]
+
+    # spotbit returns the minutes of one day per request, so only the day itself is fetched
+    specter_mock.price_provider = "spotbit_bitstamp_usd"
+    urls = []
+
+    def mock_spotbit_get(url):
+        urls.append(url)
+        start = int(url.split("start=")[1].split("&")[0]) // 1000
+        response = Mock()
+        response.status_code = 200
+        response.json.return_value = {
+            "data": [[0, (start + 86400 - 60) * 1000, "", "BTC-USD", 0, 0, 0, 61000, 1]]
+        }
+        return response
+
+    series = DailyPriceSeries(specter_mock)
+    with patch("requests.Session.get", side_effect=mock_spotbit_get):
+        assert series.price_at(day + 3600) == 61000
+        assert series.price_at(day + 7200) == 61000
+    assert len(urls) == 1
+    assert f"start={day * 1000}&end={(day + 86400) * 1000}" in urls[0]
+
+    # providers without ranges: one get_price_at per day
+    specter_mock.price_provider = "coindesk_usd"
+    get_price_at_mock = MagicMock(return_value=(50000, "$"))
+    series = DailyPriceSeries(specter_mock, get_price_at=get_price_at_mock)
+    assert series.price_at(day) == 50000
+    assert series.price_at(day + 100) == 50000
+    assert get_price_at_mock.call_count == 1
+    # failures are remembered as well
+    get_price_at_mock.side_effect = SpecterError("no prices")
+    with pytest.raises(SpecterError):
+        series.price_at(day + 86400)
+    with pytest.raises(SpecterError):
+        series.price_at(day + 86400)
+    assert get_price_at_mock.call_count == 2
@@ -35,3 +35,20 @@ def test_taproot_psbt_to_dict():
     assert obj["outputs"][1]["change"] == True
     assert obj["outputs"][1]["is_mine"] == True
     assert obj["inputs"][0]["is_mine"] == True
+
+
+def test_core_input_weight():
+    xpub = "[78738c82/84h/1h/0h]vpub5YN2RvKrA9vGAoAdpsruQGfQMWZzaGt3M5SGMMhW8i2W4SyNSHMoLtyyLLS6EjSzLfrQcbtWdQcwNS6AkCWne1Y7U8bt9JgVYxfeH9mCVPH"
+    multi = "sortedmulti(2,X/0/*,X/1/*,X/2/*)"
+    weights = {
+        "wpkh(X/0/*)": 108,
+        "sh(wpkh(X/0/*))": 200,
+        "pkh(X/0/*)": 428,
+        "tr(X/0/*)": 66,
+        f"wsh({multi})": 254,
+        f"sh(wsh({multi}))": 394,
+        f"sh({multi})": 1012,
+    }
+    for desc, weight in weights.items():
+        descriptor = Descriptor.from_string(desc.replace("X", xpub))
+        assert SpecterPSBT.core_input_weight(descriptor) == weight, desc
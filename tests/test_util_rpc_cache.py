@@ -0,0 +1,88 @@
+from cryptoadvance.specter.util.rpc_cache import RpcCache
+
+
+class FakeNode:
+    """Answers batch requests like BitcoinRPC.multi and records them"""
+
+    def __init__(self):
+        self.requests = []
+        self.tip = "aa" * 32
+        self.height = 100
+        self.locked = []
+
+    def multi(self, calls, **kwargs):
+        self.requests.append([call[0] for call in calls])
+        results = []
+        for i, (method, *args) in enumerate(calls):
+            if method == "getbestblockhash":
+                result = self.tip
+            elif method == "getblockcount":
+                result = self.height
+            elif method == "listlockunspent":
+                result = list(self.locked)
+            elif method == "lockunspent":
+                self.locked.append(args[1][0])
+                result = True
+            elif method == "gettransaction":
+                results.append(
+                    {"result": None, "error": {"code": -5, "message": "no"}, "id": i}
+                )
+                continue
+            else:
+                result = {"method": method, "args": args}
+            results.append({"result": result, "error": None, "id": i})
+        return results
+
+
+def test_RpcCache():
+    node = FakeNode()
+    cache = RpcCache()
+    url = "http://127.0.0.1:18443/wallet/w"
+
+    def multi(calls):
+        return cache.multi(node.multi, url, calls)
+
+    # the first tip-dependent call checks the tip in the same request
+    assert multi([("getblockcount",)])[0]["result"] == 100
+    assert node.requests == [["getblockcount", "getbestblockhash"]]
+    assert cache.tip == "aa" * 32
+    # now it's a hit
+    assert multi([("getblockcount",)])[0]["result"] == 100
+    assert len(node.requests) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # only the misses are requested, the results keep their order
+    res = multi([("getblockcount",), ("decodescript", "00"), ("listsinceblock",)])
+    assert [r["id"] for r in res] == [0, 1, 2]
+    assert res[0]["result"] == 100
+    assert res[1]["result"] == {"method": "decodescript", "args": ["00"]}
+    assert node.requests[-1] == ["decodescript", "listsinceblock"]
+    # results are copies
+    res[1]["result"]["args"].append("modified")
+    assert multi([("decodescript", "00")])[0]["result"]["args"] == ["00"]
+    # errors are not cached
+    multi([("gettransaction", "bb" * 32)])
+    multi([("gettransaction", "bb" * 32)])
+    assert node.requests[-2:] == [["gettransaction"], ["gettransaction"]]
+
+    # a new block invalidates the tip-dependent results
+    node.height = 101
+    node.tip = "cc" * 32
+    cache.tip_checked = 0
+    assert multi([("getblockcount",)])[0]["result"] == 101
+    assert node.requests[-2:] == [["getbestblockhash"], ["getblockcount"]]
+    # immutable results survive
+    n = len(node.requests)
+    multi([("decodescript", "00")])
+    assert len(node.requests) == n
+
+    # mempool-dependent results expire and get invalidated by calls changing the state
+    assert multi([("listlockunspent",)])[0]["result"] == []
+    multi([("lockunspent", False, ["dd" * 32])])
+    assert multi([("listlockunspent",)])[0]["result"] == ["dd" * 32]
+    n = len(node.requests)
+    multi([("listlockunspent",)])
+    assert len(node.requests) == n
+    cache.MEMPOOL_TTL = -1
+    multi([("listlockunspent",)])
+    assert len(node.requests) == n + 1
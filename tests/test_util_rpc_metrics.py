@@ -0,0 +1,57 @@
+from cryptoadvance.specter.util.rpc_metrics import RpcMetrics
+
+
+def test_RpcMetrics():
+    metrics = RpcMetrics()
+    metrics.observe_request(["getblockcount"], 0.003, 60, 40)
+    metrics.observe_request(["getblockcount"], 0.2, 60, 40)
+    metrics.observe_request(["gettransaction"] * 3 + ["getblock"], 1.5, 300, 5000)
+    metrics.observe_errors(["gettransaction"])
+    metrics.observe_timeout(["rescanblockchain"], 70)
+    metrics.observe_connection_error(["getblockcount"])
+
+    assert metrics.calls == {
+        "getblockcount": 3,
+        "gettransaction": 3,
+        "getblock": 1,
+        "rescanblockchain": 1,
+    }
+    assert metrics.errors == {"gettransaction": 1}
+    assert metrics.timeouts == 1
+    assert metrics.connection_errors == 1
+    assert metrics.bytes_sent == 490
+    assert metrics.bytes_received == 5080
+    # mixed batches get their own label
+    assert set(metrics.latencies.keys()) == {"getblockcount", "batch"}
+    assert metrics.latencies["getblockcount"].count == 2
+
+    text = metrics.to_prometheus()
+    lines = text.splitlines()
+    assert 'specter_rpc_calls_total{method="getblockcount"} 3' in lines
+    assert 'specter_rpc_errors_total{method="gettransaction"} 1' in lines
+    # histograms are cumulative
+    assert (
+        'specter_rpc_request_duration_seconds_bucket{method="getblockcount",le="0.005"} 1'
+        in lines
+    )
+    assert (
+        'specter_rpc_request_duration_seconds_bucket{method="getblockcount",le="0.25"} 2'
+        in lines
+    )
+    assert (
+        'specter_rpc_request_duration_seconds_bucket{method="getblockcount",le="+Inf"} 2'
+        in lines
+    )
+    assert 'specter_rpc_request_duration_seconds_count{method="batch"} 1' in lines
+    assert 'specter_rpc_batch_size_bucket{le="1"} 2' in lines
+    assert 'specter_rpc_batch_size_bucket{le="5"} 3' in lines
+    assert "specter_rpc_batch_size_count 3" in lines
+    assert "specter_rpc_timeouts_total 1" in lines
+    assert "specter_rpc_connection_errors_total 1" in lines
+    assert "specter_rpc_sent_bytes_total 490" in lines
+    assert "specter_rpc_received_bytes_total 5080" in lines
+    assert "# TYPE specter_rpc_request_duration_seconds histogram" in lines
+
+    metrics.reset()
+    assert metrics.calls == {}
+    assert "specter_rpc_batch_size_count 0" in metrics.to_prometheus().splitlines()
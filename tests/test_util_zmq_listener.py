@@ -0,0 +1,62 @@
+import time
+
+import pytest
+from cryptoadvance.specter.util.zmq_listener import ZMQListener
+
+zmq = pytest.importorskip("zmq")
+
+
+def test_ZMQListener():
+    # A stand-in for Bitcoin Core publishing hashblock and rawtx on the same address
+    context = zmq.Context()
+    publisher = context.socket(zmq.PUB)
+    port = publisher.bind_to_random_port("tcp://127.0.0.1")
+    address = f"tcp://127.0.0.1:{port}"
+
+    notifications = []
+    listener = ZMQListener(
+        {"hashblock": address, "rawtx": address, "sequence": address},
+        lambda topic, body: notifications.append((topic, body)),
+        desc="test",
+    )
+    # topics we don't handle are ignored
+    assert list(listener.endpoints.keys()) == ["hashblock", "rawtx"]
+    listener.POLL_TIMEOUT = 100
+    listener.start()
+    try:
+        # wait for the subscription to arrive at the publisher
+        for i in range(50):
+            publisher.send_multipart([b"hashblock", b"\xaa" * 32, b"\x00" * 4])
+            time.sleep(0.1)
+            if notifications:
+                break
+        assert notifications[0] == ("hashblock", b"\xaa" * 32)
+        publisher.send_multipart([b"rawtx", b"\x02\x00", b"\x01\x00\x00\x00"])
+        # not subscribed
+        publisher.send_multipart([b"hashtx", b"\xbb" * 32, b"\x00" * 4])
+        for i in range(50):
+            if notifications[-1][0] == "rawtx":
+                break
+            time.sleep(0.1)
+        assert notifications[-1] == ("rawtx", b"\x02\x00")
+        assert "hashtx" not in [topic for topic, _ in notifications]
+    finally:
+        listener.stop()
+        listener.thread.join(timeout=5)
+        publisher.close(linger=0)
+        context.term()
+    assert not listener.thread.is_alive()
+
+
+def test_ZMQListener_queue_is_bounded():
+    context = zmq.Context()
+    listener = ZMQListener({"rawtx": "tcp://127.0.0.1:28333"}, None)
+    sockets = listener._create_sockets(context)
+    try:
+        assert [socket.getsockopt(zmq.RCVHWM) for socket in sockets] == [
+            ZMQListener.RCVHWM
+        ]
+    finally:
+        for socket in sockets:
+            socket.close(linger=0)
+        context.term()
@@ -1,19 +1,25 @@
 from asyncio.streams import FlowControlMixin
+import inspect
+import os
 import random
 import time
 from typing import List
 import pytest, logging
+from types import SimpleNamespace
+from embit.descriptor import Descriptor
 from cryptoadvance.specter.util.psbt import SpecterPSBT
 from cryptoadvance.specter.commands.psbt_creator import PsbtCreator
 from cryptoadvance.specter.wallet.txlist import WalletAwareTxItem
 from cryptoadvance.specter.device import Device
 
 from cryptoadvance.specter.specter import Specter
-from cryptoadvance.specter.wallet import Wallet
+from cryptoadvance.specter.wallet import Wallet, delete_wallet_files
+from cryptoadvance.specter.liquid.wallet import LWallet
 from cryptoadvance.specter.process_controller.bitcoind_controller import (
     BitcoindPlainController,
 )
 from cryptoadvance.specter.specter_error import SpecterError
+from cryptoadvance.specter.util.rpc_metrics import rpc_metrics
 from fix_devices_and_wallets import create_hot_wallet_device, create_hot_segwit_wallet
 
 logger = logging.getLogger(__name__)
@@ -279,6 +285,11 @@ def test_check_utxo_and_amounts(funded_hot_wallet_1: Wallet):
     assert len(wallet.full_utxo) == 12
     # 2 are locked
     assert len([tx for tx in wallet.full_utxo if tx["locked"]]) == 2
+    # the address index covers all utxo, locked or not
+    assert sum(a["utxo"] for a in wallet.utxo_by_address.values()) == 12
+    assert round(sum(a["amount"] for a in wallet.utxo_by_address.values()), 8) == 15
+    addresses_info = wallet.addresses_info() + wallet.addresses_info(is_change=True)
+    assert sum(a["utxo"] for a in addresses_info) == 12
 
     # Check total amount
     assert wallet.amount_total == 15
@@ -429,3 +440,156 @@ def test_amount_available_floating_point_precision(
     assert wallet.amount_available == amounts[0]
 
     wallet.delete_pending_psbt(psbt.to_dict()["tx"]["txid"])
+
+
+def test_evict_tables(funded_hot_wallet_1: Wallet):
+    wallet = funded_hot_wallet_1
+    txids = sorted(wallet.transactions.keys())
+    addresses = sorted(wallet.addresses.keys())
+    versions = (wallet.addresses.version, wallet.transactions.version)
+    synced_blockhash = wallet.transactions.synced_blockhash
+
+    # tables which are in use are kept
+    with wallet._pin_tables():
+        assert not wallet._evict_tables()
+        assert wallet._tx_list is not None
+    # the ZMQ-matching only looks at loaded tables
+    assert wallet.is_affected_by(addresses[:1], [])
+    wallet._evict_tables()
+    assert wallet._address_list is None and wallet._tx_list is None
+    assert wallet not in Wallet.hydrated_wallets
+    assert not wallet.is_affected_by(addresses[:1], txids[:1])
+    assert wallet._address_list is None and wallet._tx_list is None
+
+    # loaded again from the csv-files on the next access
+    assert sorted(wallet.transactions.keys()) == txids
+    assert sorted(wallet.addresses.keys()) == addresses
+    assert wallet.transactions._addresses is wallet.addresses
+    assert wallet in Wallet.hydrated_wallets
+    # the versions got bumped, the sync-state survived
+    assert wallet.addresses.version > versions[0]
+    assert wallet.transactions.version > versions[1]
+    assert wallet.transactions.synced_blockhash == synced_blockhash
+    wallet.update_balance()
+
+    # a wallet loaded from its file loads and syncs its tables on their first use only
+    reloaded = Wallet.from_json(
+        wallet.to_json(),
+        wallet.device_manager,
+        wallet.manager,
+        default_fullpath=wallet.fullpath,
+    )
+    assert not reloaded.tables_loaded
+    assert reloaded.amount_total == wallet.amount_total
+    assert sorted(reloaded.transactions.keys()) == txids
+    assert reloaded.tables_loaded and reloaded._tables_synced
+    reloaded._evict_tables()
+
+
+def test_freeze_utxos(funded_hot_wallet_1: Wallet):
+    wallet = funded_hot_wallet_1
+    wallet.freeze_utxos(unfreeze=list(wallet.frozen_utxo))
+    utxos = [f"{u['txid']}:{u['vout']}" for u in wallet.rpc.listunspent()][:3]
+    # an unknown utxo makes Core reject the whole call, the others get locked anyway
+    unknown = f"{'00' * 32}:0"
+    result = wallet.freeze_utxos(freeze=utxos + [unknown, utxos[0]])
+    assert result == {"frozen": utxos + [unknown], "unfrozen": []}
+    locked = [f"{u['txid']}:{u['vout']}" for u in wallet.rpc.listlockunspent()]
+    assert sorted(locked) == sorted(utxos)
+    # already frozen ones are skipped
+    result = wallet.freeze_utxos(freeze=utxos[:1], unfreeze=utxos[1:] + [unknown])
+    assert result == {"frozen": [], "unfrozen": utxos[1:] + [unknown]}
+    assert wallet.frozen_utxo == utxos[:1]
+    assert wallet.rpc.listlockunspent() == wallet.utxo_dicts(utxos[:1])
+    wallet.toggle_freeze_utxo(utxos[:1])
+    assert wallet.frozen_utxo == []
+    assert wallet.rpc.listlockunspent() == []
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("inputs", [1, 50, 500])
+def test_createpsbt_benchmark(inputs, bitcoin_regtest, unfunded_hot_wallet_1: Wallet):
+    wallet = unfunded_hot_wallet_1
+    # make sure the default wallet is funded and send all the utxos with one tx
+    bitcoin_regtest.testcoin_faucet(wallet.getnewaddress(), amount=0.01)
+    default_rpc = bitcoin_regtest.get_rpc().wallet("")
+    if inputs > 1:
+        default_rpc.sendmany(
+            "", {wallet.get_address(i + 1): 0.001 for i in range(inputs - 1)}
+        )
+    bitcoin_regtest.get_rpc().generatetoaddress(1, default_rpc.getnewaddress())
+    wallet.update()
+    wallet.check_utxo()
+    utxos = wallet.rpc.listunspent()
+    assert len(utxos) == inputs
+    selected_coins = [{"txid": u["txid"], "vout": u["vout"]} for u in utxos]
+    amount = round(sum([u["amount"] for u in utxos]), 8)
+
+    results = []
+    for run in ["first", "second"]:
+        calls = rpc_metrics.calls.get("walletcreatefundedpsbt", 0)
+        start = time.time()
+        psbt = wallet.createpsbt(
+            ["bcrt1q7mlxxdna2e2ufzgalgp5zhtnndl7qddlxjy5eg"],
+            [amount],
+            True,
+            0,
+            5,
+            selected_coins=selected_coins,
+            readonly=True,
+        )
+        duration = time.time() - start
+        calls = rpc_metrics.calls.get("walletcreatefundedpsbt", 0) - calls
+        assert len(psbt.inputs) == inputs
+        assert abs(psbt.fee_rate / 5 - 1) <= 2 * wallet.FEE_RATE_TOLERANCE
+        # the fee rate for Core is computed up-front, so one funding call is enough
+        assert calls == 1
+        results.append(f"{run} {duration * 1000:.0f} ms ({calls} funding calls)")
+    print(f"\ncreatepsbt with {inputs} inputs: " + ", ".join(results))
+
+
+@pytest.mark.parametrize(
+    "descriptor,num_inputs,core_fee_rate",
+    [
+        ("wpkh(X/0/*)", 1, 10.06),
+        ("wsh(sortedmulti(2,X/0/*,X/1/*,X/2/*))", 1, 11.34),
+        ("wsh(sortedmulti(2,X/0/*,X/1/*,X/2/*))", 10, 12.3),
+    ],
+)
+def test_up_front_fee_rate(descriptor, num_inputs, core_fee_rate):
+    xpub = "[78738c82/84h/1h/0h]vpub5YN2RvKrA9vGAoAdpsruQGfQMWZzaGt3M5SGMMhW8i2W4SyNSHMoLtyyLLS6EjSzLfrQcbtWdQcwNS6AkCWne1Y7U8bt9JgVYxfeH9mCVPH"
+    wallet = SimpleNamespace(
+        PSBTCls=SpecterPSBT,
+        descriptor=Descriptor.from_string(descriptor.replace("X", xpub)),
+    )
+    fee_rate = Wallet._up_front_fee_rate(wallet, 10, num_inputs, 2)
+    assert round(fee_rate, 2) == core_fee_rate
+
+
+def test_delete_wallet_files(tmp_path):
+    for name in [
+        "wallet.json",
+        "wallet.json.bkp",
+        "wallet_addr.csv",
+        "wallet_txs.csv",
+        "wallet_txs_journal.csv",
+        "wallet_txs_raw.pack",
+        "other.json",
+    ]:
+        (tmp_path / name).write_text("")
+    for name in ["wallet_psbts", "wallet_txs_raw"]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "some.file").write_text("")
+    delete_wallet_files(str(tmp_path / "wallet.json"))
+    assert os.listdir(tmp_path) == ["other.json"]
+
+
+def test_methods_using_tables_pin_them():
+    # the tables of a wallet must not be evicted while a method works with them
+    for cls in [Wallet, LWallet]:
+        for name, method in vars(cls).items():
+            if not inspect.isfunction(method) or name.startswith("__"):
+                continue
+            source = inspect.getsource(method)
+            if "self._addresses" in source or "self._transactions" in source:
+                assert hasattr(method, "__wrapped__"), f"{cls.__name__}.{name}"
@@ -0,0 +1,51 @@
+import pytest
+from embit.descriptor import Descriptor
+from embit.networks import NETWORKS
+
+from cryptoadvance.specter.wallet.address_deriver import AddressDeriver
+
+XPUB1 = "tpubDDzWqfZ5TH4819JtJT1MaJGh2FYnbn2KGoqkznXRFdNZAuKLD2CsYtQiV5rEVCUezzz9GaRkeHct5NSxVEG9KWUaRoeEtcafVHr2SVE5DRN"
+XPUB2 = "tpubDFH9dgzveyD8yHQb8VrpG8FYAuwcLMHMje2CCcbBo1FpaGzYVtJeYYxcYgRqSTta5utUFts8nPPHs9C2bqoxrey5jia6Dwf9mpwrPq7YvcJ"
+
+
+@pytest.mark.parametrize(
+    "descriptor",
+    [
+        f"wpkh([1ef4e492/84h/1h/0h]{XPUB1}/{{0,1}}/*)",
+        f"wsh(sortedmulti(2,[1ef4e492/48h/1h/0h/2h]{XPUB1}/{{0,1}}/*,{XPUB2}/{{0,1}}/*))",
+        f"sh(wpkh({XPUB1}/5/{{0,1}}/*))",
+    ],
+)
+def test_AddressDeriver(descriptor):
+    net = NETWORKS["test"]
+    desc = Descriptor.from_string(descriptor)
+    deriver = AddressDeriver(desc, net)
+    # the same as deriving from the descriptor
+    for branch in [0, 1]:
+        for idx in [0, 7]:
+            expected = desc.derive(idx, branch_index=branch)
+            assert str(deriver.derive(idx, branch)) == str(expected)
+            assert deriver.address(idx, bool(branch)) == expected.address(net)
+    addresses = deriver.addresses(0, 20, change=True)
+    assert addresses == [
+        desc.derive(idx, branch_index=1).address(net) for idx in range(20)
+    ]
+    # lookups in both directions
+    assert deriver.lookup(addresses[12]) == (True, 12)
+    assert deriver.lookup("tb1qunknown") is None
+    assert deriver.addresses(5, 8, change=True) == addresses[5:8]
+
+
+def test_AddressDeriver_processes():
+    net = NETWORKS["test"]
+    desc = Descriptor.from_string(f"wpkh([1ef4e492/84h/1h/0h]{XPUB1}/{{0,1}}/*)")
+    deriver = AddressDeriver(desc, net)
+    deriver.PROCESSES = 2
+    deriver.PROCESS_THRESHOLD = 10
+    # 2 are derived already, the rest in the process pool
+    deriver.address(0, False)
+    deriver.address(1, False)
+    assert deriver.addresses(0, 25, change=False) == [
+        desc.derive(idx, branch_index=0).address(net) for idx in range(25)
+    ]
+    assert deriver.lookup(deriver.addresses(0, 25, change=False)[24]) == (False, 24)
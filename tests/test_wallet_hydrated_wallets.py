@@ -0,0 +1,60 @@
+from cryptoadvance.specter.wallet.hydrated_wallets import HydratedWallets
+
+
+class FakeWallet:
+    def __init__(self, alias):
+        self.alias = alias
+        self.evicted = 0
+        self.in_use = False
+
+    def _evict_tables(self):
+        if self.in_use:
+            return False
+        self.evicted += 1
+        return True
+
+
+def test_HydratedWallets():
+    hydrated_wallets = HydratedWallets()
+    hydrated_wallets.MAX_WALLETS = 2
+    w1, w2, w3 = FakeWallet("w1"), FakeWallet("w2"), FakeWallet("w3")
+
+    hydrated_wallets.touch(w1)
+    hydrated_wallets.touch(w2)
+    # w1 is used again, so w2 is the least recently used one
+    hydrated_wallets.touch(w1)
+    hydrated_wallets.touch(w1)
+    hydrated_wallets.touch(w3)
+    assert (w1.evicted, w2.evicted, w3.evicted) == (0, 1, 0)
+    assert w2 not in hydrated_wallets
+    assert w1 in hydrated_wallets and w3 in hydrated_wallets
+    assert hydrated_wallets.evictions == 1
+
+    # discarded and garbage collected wallets don't count
+    hydrated_wallets.discard(w1)
+    del w3
+    hydrated_wallets.touch(w2)
+    hydrated_wallets.touch(w1)
+    assert (w1.evicted, w2.evicted) == (0, 1)
+    assert len(hydrated_wallets) == 2
+
+    # wallets which are in use are kept
+    hydrated_wallets.touch(w2)
+    w1.in_use = True
+    w4 = FakeWallet("w4")
+    hydrated_wallets.touch(w4)
+    assert w1.evicted == 0 and w1 in hydrated_wallets
+    assert list(hydrated_wallets._wallets) == [id(w2), id(w4), id(w1)]
+    assert hydrated_wallets.evictions == 1
+    w1.in_use = False
+    hydrated_wallets.touch(w4)
+    assert (w1.evicted, w2.evicted, w4.evicted) == (0, 2, 0)
+    assert hydrated_wallets.evictions == 2
+
+    # no limit
+    hydrated_wallets.MAX_WALLETS = 0
+    wallets = [FakeWallet(f"w{i}") for i in range(10)]
+    for wallet in wallets:
+        hydrated_wallets.touch(wallet)
+    assert len(hydrated_wallets) == 12
+    assert not any(wallet.evicted for wallet in wallets)
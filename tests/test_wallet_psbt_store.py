@@ -0,0 +1,54 @@
+import os
+
+from cryptoadvance.specter.wallet.psbt_store import PsbtStore
+
+
+class FakePsbt:
+    def __init__(self, record):
+        self.record = dict(record)
+
+    def to_dict(self):
+        return self.record
+
+
+def record(txid, time, amount=0.1):
+    return {
+        "tx": {"txid": txid},
+        "inputs": [{"txid": "ab" * 32, "vout": 1, "float_amount": amount}],
+        "time": time,
+    }
+
+
+def test_PsbtStore(tmp_path):
+    path = os.path.join(tmp_path, "wallet_psbts")
+    parsed = []
+
+    def parse(obj):
+        parsed.append(obj["tx"]["txid"])
+        return FakePsbt(obj)
+
+    store = PsbtStore(path, parse)
+    assert len(store) == 0
+    store["bb"] = FakePsbt(record("bb", 2))
+    store.add_record("aa", record("aa", 1))
+    assert sorted(os.listdir(path)) == ["aa.json", "bb.json"]
+    assert store.utxo_dict("aa") == [{"txid": "ab" * 32, "vout": 1}]
+
+    # listing them doesn't parse them
+    store = PsbtStore(path, parse)
+    assert store.keys() == ["aa", "bb"]
+    assert store.to_dict()["bb"] == record("bb", 2)
+    assert parsed == []
+    # but accessing them does, once
+    assert store["aa"].to_dict() == record("aa", 1)
+    store["aa"].record["time"] = 3
+    store.save("aa")
+    assert parsed == ["aa"]
+    assert PsbtStore(path, parse).keys() == ["bb", "aa"]
+
+    del store["bb"]
+    assert "bb" not in store
+    assert "bb.json" not in os.listdir(path)
+    store.delete()
+    assert not os.path.exists(path)
+    assert len(store) == 0
@@ -0,0 +1,60 @@
+import json
+import os
+
+from cryptoadvance.specter.wallet.rawtx_store import RawTxStore
+from embit.transaction import Transaction
+
+with open("tests/xtestdata_txlist/tx1_confirmed.json") as f:
+    tx1_confirmed = json.load(f)
+
+
+def test_RawTxStore(empty_data_folder):
+    path = os.path.join(empty_data_folder, "wallet_raw.pack")
+    store = RawTxStore(path)
+    assert len(store) == 0
+    assert store.get(tx1_confirmed["txid"]) is None
+
+    raw = bytes.fromhex(tx1_confirmed["hex"])
+    store.add({tx1_confirmed["txid"]: raw, "ab" * 32: b"\x01\x02\x03"})
+    assert tx1_confirmed["txid"] in store
+    assert store.get(tx1_confirmed["txid"]) == raw
+    tx = Transaction.parse(store.get(tx1_confirmed["txid"]))
+    assert tx.txid().hex() == tx1_confirmed["txid"]
+    # already known txs don't get appended again
+    size = os.path.getsize(path)
+    store.add({tx1_confirmed["txid"]: raw})
+    assert os.path.getsize(path) == size
+    # appending after reading (the mmap needs to grow)
+    store.add({"cd" * 32: b"\x04\x05"})
+    assert store.get("cd" * 32) == b"\x04\x05"
+
+    # The index is recreated from the headers
+    store = RawTxStore(path)
+    assert len(store) == 3
+    assert store.get("ab" * 32) == b"\x01\x02\x03"
+    assert store.get(tx1_confirmed["txid"]) == raw
+
+    # An incomplete record at the end gets cut off
+    with open(path, "ab") as f:
+        f.write(RawTxStore.HEADER.pack(bytes.fromhex("ef" * 32), 100) + b"\x00")
+    store = RawTxStore(path)
+    assert len(store) == 3
+    assert os.path.getsize(path) == size + RawTxStore.HEADER.size + 2
+    store.add({"ef" * 32: b"\x06"})
+    assert RawTxStore(path).get("ef" * 32) == b"\x06"
+
+    store.clear()
+    assert not os.path.isfile(path)
+    assert len(store) == 0
+
+
+def test_RawTxStore_migrate(empty_data_folder):
+    rawdir = os.path.join(empty_data_folder, "wallet_raw")
+    os.mkdir(rawdir)
+    raw = bytes.fromhex(tx1_confirmed["hex"])
+    with open(os.path.join(rawdir, tx1_confirmed["txid"] + ".bin"), "wb") as f:
+        f.write(raw)
+    path = os.path.join(empty_data_folder, "wallet_raw.pack")
+    store = RawTxStore(path, rawdir=rawdir)
+    assert store.get(tx1_confirmed["txid"]) == raw
+    assert not os.path.isdir(rawdir)
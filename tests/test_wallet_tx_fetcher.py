@@ -0,0 +1,38 @@
+import logging
+from unittest.mock import MagicMock
+
+from cryptoadvance.specter.rpc import RpcError
+from cryptoadvance.specter.wallet.tx_fetcher import TxFetcher
+
+
+def test_interesting_txs_paged_without_tip(caplog):
+    caplog.set_level(logging.DEBUG)
+    wallet = MagicMock()
+    wallet.rpc.listtransactions.return_value = []
+
+    # Spectrum doesn't know getbestblockhash: BridgeRPC raises ...
+    wallet.rpc.multi.side_effect = RpcError("Method not found (-32601)")
+    fetcher = TxFetcher(wallet)
+    assert fetcher.interesting_txs_paged() == []
+    assert fetcher.lastblock is None
+    # ... which is logged quietly
+    assert not [r for r in caplog.records if r.levelno > logging.DEBUG]
+
+    # Core answers with an error per call
+    wallet.rpc.multi.side_effect = None
+    wallet.rpc.multi.return_value = [
+        {"result": None, "error": {"code": -32601, "message": "Method not found"}},
+        {"result": {"txcount": 3}, "error": None},
+    ]
+    fetcher = TxFetcher(wallet)
+    assert fetcher.interesting_txs_paged() == []
+    assert fetcher.lastblock is None and fetcher.txcount is None
+
+    wallet.rpc.multi.return_value = [
+        {"result": "aa" * 32, "error": None},
+        {"result": {"txcount": 3}, "error": None},
+    ]
+    fetcher = TxFetcher(wallet)
+    fetcher.interesting_txs_paged()
+    assert fetcher.lastblock == "aa" * 32 and fetcher.txcount == 3
+    assert not [r for r in caplog.records if r.levelno > logging.DEBUG]
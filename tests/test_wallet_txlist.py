@@ -2,6 +2,7 @@ import json
 import os
 import shutil
 import time
+import tracemalloc
 from binascii import hexlify
 from datetime import datetime
 from pathlib import Path
@@ -13,7 +14,13 @@ from cryptoadvance.specter.process_controller.bitcoind_controller import (
     BitcoindPlainController,
 )
 from cryptoadvance.specter.rpc import BitcoinRPC
-from cryptoadvance.specter.wallet.txlist import TxItem, TxList, WalletAwareTxItem
+from cryptoadvance.specter.wallet.addresslist import Address
+from cryptoadvance.specter.wallet.txlist import (
+    TxItem,
+    TxList,
+    WalletAwareTxItem,
+    intern_str,
+)
 from cryptoadvance.specter.util.psbt import (
     SpecterInputScope,
     SpecterOutputScope,
@@ -201,6 +208,153 @@ def test_TxItem(empty_data_folder):
     mydict = dict(mytxitem)
 
 
+class PlainTxList(TxList):
+    """A TxList which doesn't need a wallet (and therefore no rpc)"""
+
+    ItemCls = TxItem
+
+
+def test_txlist_journal(empty_data_folder):
+    filename = os.path.join(empty_data_folder, "my_filename_txs.csv")
+    journal = os.path.join(empty_data_folder, "my_filename_txs_journal.csv")
+    mytxlist = PlainTxList(filename, MagicMock(), MagicMock())
+    # The first save writes the full csv
+    mytxlist.add({tx1_confirmed["txid"]: tx1_confirmed})
+    assert os.path.isfile(filename)
+    assert not os.path.isfile(journal)
+    # the raw tx went into the pack-file
+    assert tx1_confirmed["txid"] in mytxlist.rawtx_store
+    assert mytxlist[tx1_confirmed["txid"]].tx.txid().hex() == tx1_confirmed["txid"]
+    # further adds only get appended to the journal
+    mytxlist.add({tx2_unconfirmed["txid"]: tx2_unconfirmed})
+    assert os.path.isfile(journal)
+    with open(filename) as f:
+        assert tx2_unconfirmed["txid"] not in f.read()
+    # an updated tx (here: confirmed) is appended again
+    mytxlist.add({tx2_confirmed["txid"]: tx2_confirmed})
+    assert mytxlist[tx2_confirmed["txid"]]["blockhash"] == tx2_confirmed["blockhash"]
+
+    # loading replays the journal on top of the csv
+    reloaded = PlainTxList(filename, MagicMock(), MagicMock())
+    assert set(reloaded.keys()) == set(mytxlist.keys())
+    assert reloaded[tx2_confirmed["txid"]]["blockhash"] == tx2_confirmed["blockhash"]
+    assert reloaded._journal_rows == 2
+
+    # removals get journaled as well
+    reloaded.invalidate(tx1_confirmed["txid"])
+    reloaded = PlainTxList(filename, MagicMock(), MagicMock())
+    assert list(reloaded.keys()) == [tx2_confirmed["txid"]]
+
+    # compaction rewrites the csv and deletes the journal
+    reloaded.JOURNAL_COMPACTION_MIN_ROWS = 0
+    reloaded.add({tx1_confirmed["txid"]: tx1_confirmed})
+    assert not os.path.isfile(journal)
+    reloaded = PlainTxList(filename, MagicMock(), MagicMock())
+    assert len(reloaded) == 2
+    assert reloaded._journal_rows == 0
+
+
+def test_txlist_min_blockheight(empty_data_folder):
+    filename = os.path.join(empty_data_folder, "my_filename_txs.csv")
+    mytxlist = PlainTxList(filename, MagicMock(), MagicMock())
+    assert mytxlist.min_blockheight is None
+    mytxlist.add({tx2_confirmed["txid"]: tx2_confirmed})
+    assert mytxlist.min_blockheight == 2271
+    # txs without blockheight don't count
+    mytxlist.add({tx1_confirmed["txid"]: tx1_confirmed})
+    assert mytxlist.min_blockheight == 2271
+    mytxlist.add({tx1_confirmed["txid"]: {**tx1_confirmed, "blockheight": 2049}})
+    assert mytxlist.min_blockheight == 2049
+    # loaded from the csv and the journal
+    assert PlainTxList(filename, MagicMock(), MagicMock()).min_blockheight == 2049
+    mytxlist.clear_cache()
+    assert mytxlist.min_blockheight is None
+
+
+def test_txlist_get_raw_transactions(empty_data_folder):
+    filename = os.path.join(empty_data_folder, "my_filename_txs.csv")
+    parent = MagicMock()
+    mytxlist = PlainTxList(filename, parent, MagicMock())
+    mytxlist.add({tx1_confirmed["txid"]: tx1_confirmed})
+    # known txs don't need Core
+    assert mytxlist.get_raw_transactions([tx1_confirmed["txid"]] * 2) == {
+        tx1_confirmed["txid"]: bytes.fromhex(tx1_confirmed["hex"])
+    }
+    parent.rpc.multi.assert_not_called()
+    # the others are fetched with one batch-request and added
+    parent.rpc.multi.return_value = [
+        {"result": tx2_confirmed, "error": None},
+        {"result": None, "error": {"code": -5, "message": "Invalid or non-wallet"}},
+    ]
+    raw_txs = mytxlist.get_raw_transactions(
+        [tx1_confirmed["txid"], tx2_confirmed["txid"], "00" * 32]
+    )
+    parent.rpc.multi.assert_called_once_with(
+        [("gettransaction", tx2_confirmed["txid"]), ("gettransaction", "00" * 32)]
+    )
+    assert list(raw_txs) == [tx1_confirmed["txid"], tx2_confirmed["txid"]]
+    assert raw_txs[tx2_confirmed["txid"]] == bytes.fromhex(tx2_confirmed["hex"])
+    assert tx2_confirmed["txid"] in mytxlist
+
+
+class MineTxItem(TxItem):
+    @property
+    def ismine(self):
+        return True
+
+
+class MineTxList(TxList):
+    ItemCls = MineTxItem
+
+
+def test_txlist_get_transactions(empty_data_folder):
+    filename = os.path.join(empty_data_folder, "my_filename_txs.csv")
+    mytxlist = MineTxList(filename, MagicMock(), MagicMock())
+    mytxlist.add(
+        {
+            tx1_confirmed["txid"]: tx1_confirmed,
+            tx2_confirmed["txid"]: tx2_confirmed,
+        }
+    )
+    # A replaced (older) tx conflicting with tx2
+    replaced_txid = "ff" * 32
+    replaced_tx = {
+        "txid": replaced_txid,
+        "time": tx2_confirmed["time"] - 10,
+        "walletconflicts": [tx2_confirmed["txid"]],
+        "hex": tx2_confirmed["hex"],
+    }
+    mytxlist.add({replaced_txid: replaced_tx})
+    txs = mytxlist.get_transactions(current_blockheight=2300)
+    # sorted by time and conflict free
+    assert [tx["txid"] for tx in txs] == [tx2_confirmed["txid"], tx1_confirmed["txid"]]
+    assert txs[0]["confirmations"] == 30
+    # The snapshot is cached until the TxList changes
+    assert mytxlist._get_snapshot() is mytxlist._get_snapshot()
+    # and the txs are copies
+    txs[0]["label"] = "some label"
+    assert "label" not in mytxlist[tx2_confirmed["txid"]]
+    assert mytxlist.get_transactions(current_blockheight=2301)[0]["confirmations"] == 31
+    snapshot = mytxlist._get_snapshot()
+    mytxlist.add({tx1_confirmed["txid"]: tx1_confirmed})
+    assert mytxlist._get_snapshot() is not snapshot
+
+
+def test_WalletAwareTxItem_without_node(empty_data_folder):
+    parent = MagicMock()
+    parent.descriptor = Descriptor.from_string(
+        "wpkh([78738c82/84h/1h/0h]vpub5YN2RvKrA9vGAoAdpsruQGfQMWZzaGt3M5SGMMhW8i2W4SyNSHMoLtyyLLS6EjSzLfrQcbtWdQcwNS6AkCWne1Y7U8bt9JgVYxfeH9mCVPH/{0,1}/*)"
+    )
+    parent.network = NETWORKS["regtest"]
+    parent.rpc.walletprocesspsbt.return_value = {}
+    mytxitem = WalletAwareTxItem(parent, [], empty_data_folder, **tx1_confirmed)
+    # the psbt is cached in its slot
+    assert mytxitem.psbt is mytxitem.psbt
+    assert mytxitem.category in ["mixed", "generate", "selftransfer", "receive", "send"]
+    assert mytxitem.copy().category == mytxitem.category
+    parent.rpc.walletprocesspsbt.assert_called_once()
+
+
 def test_WalletAwareTxItem_fromTxItem(bitcoin_regtest, parent_mock, empty_data_folder):
     result = bitcoin_regtest.get_rpc().createwallet(
         "test_WalletAwareTxItem_fromTxItem", False, False, "", False, True
@@ -549,3 +703,81 @@ def test_txlist_invalidate(empty_data_folder, bitcoin_regtest: BitcoindPlainCont
     assert (
         tx["blocktime"] > mpool_hittime
     ), "The time of the transaction should now be bigger than the time it got hit the mempool"
+
+
+def csv_row(i, blocksize=10):
+    """A row like it's read from a csv-file, all values are strings"""
+    return {
+        "txid": f"{i:064x}",
+        "fee": "141",
+        "blockhash": f"{i // blocksize:064x}",
+        "blockheight": str(100 + i // blocksize),
+        "time": "1660000000",
+        "blocktime": "1660000000",
+        "bip125-replaceable": "no",
+        "conflicts": "[]",
+        "vsize": "141",
+        "address": "['bcrt1q7mlxxdna2e2ufzgalgp5zhtnndl7qddlxjy5eg']",
+    }
+
+
+def test_TxItem_slots(tmp_path):
+    tx = TxItem(None, None, str(tmp_path), **csv_row(1))
+    with pytest.raises(AttributeError):
+        tx.something = 1
+    # still a dict
+    assert tx["fee"] == 141
+    assert tx.get("conflicts") == []
+    assert json.loads(json.dumps(tx))["blockheight"] == 100
+    mycopy = tx.copy()
+    assert mycopy == tx and mycopy is not tx
+    assert mycopy.rawdir == str(tmp_path)
+    # rows of the same block share the blockhash
+    other = TxItem(None, None, str(tmp_path), **csv_row(2))
+    assert other["blockhash"] is tx["blockhash"]
+
+    address = Address(None, address="bcrt1qxyz", index="3", change="True")
+    with pytest.raises(AttributeError):
+        address.something = 1
+    assert address.label == "Change #3"
+
+
+class DictTxItem(TxItem):
+    """The TxItem as it used to be: with an instance-__dict__ and without interning"""
+
+    type_converter = [str if c is intern_str else c for c in TxItem.type_converter]
+
+
+class DictAddress(Address):
+    pass
+
+
+def measure(create, count):
+    tracemalloc.start()
+    items = [create(i) for i in range(count)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(items) == count
+    return size / count
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("count", [10000, 100000])
+def test_records_memory_benchmark(count, tmp_path):
+    rawdir = str(tmp_path)
+    results = {}
+    for name, cls in [("TxItem", TxItem), ("old TxItem", DictTxItem)]:
+        results[name] = measure(lambda i: cls(None, None, rawdir, **csv_row(i)), count)
+    for name, cls in [("Address", Address), ("old Address", DictAddress)]:
+        results[name] = measure(
+            lambda i: cls(
+                None, address=f"bcrt1q{i:038x}", index=str(i), change="False"
+            ),
+            count,
+        )
+    assert results["TxItem"] < results["old TxItem"]
+    assert results["Address"] < results["old Address"]
+    print(
+        f"\n{count} records, bytes per record: "
+        + ", ".join(f"{name} {size:.0f}" for name, size in results.items())
+    )
@@ -0,0 +1,122 @@
+from cryptoadvance.specter.wallet.txlist_view import TxListView, iter_merged_txlists
+
+
+def create_txlist():
+    return [
+        {
+            "txid": "aa" * 32,
+            "address": "bcrt1qsj30deg0fgzckvlrn5757yk55yajqv6dqx0x7u",
+            "label": "Rent",
+            "flow_amount": 1.5,
+            "amount": 1.5,
+            "confirmations": 3,
+            "time": 1642494258,
+        },
+        {
+            "txid": "bb" * 32,
+            "address": "bcrt1q5vfwlldskej3u9dnrjpj6cj7rrq8lxkvkpgw5h",
+            "label": "Salary",
+            "flow_amount": 0.2,
+            "amount": 0.2,
+            "confirmations": 10,
+            "time": 1642494000,
+        },
+        {
+            "txid": "cc" * 32,
+            "address": [
+                "bcrt1q3ya6hur3cey92fau6tqs099zzpdzn4uzg5ftsd",
+                "bcrt1qycdzldu6vrrgju24kl048w5j65tpxugdp073gy",
+            ],
+            "label": ["Groceries", "Veggies"],
+            "flow_amount": [0.3, 0.4],
+            "amount": [0.3, 0.4],
+            "confirmations": 0,
+            "time": 1642495000,
+        },
+    ]
+
+
+def test_TxListView_query():
+    txlist = create_txlist()
+    view = TxListView(txlist, key="some_key")
+    assert view.key == "some_key"
+    assert len(view) == 3
+    # No search, no sort
+    page, page_count = view.query()
+    assert page == txlist
+    assert page_count == 1
+    # Pagination
+    page, page_count = view.query(idx=1, limit=2)
+    assert page == [txlist[2]]
+    assert page_count == 2
+    page, page_count = view.query(limit=0)
+    assert len(page) == 3
+    assert page_count == 1
+
+
+def test_TxListView_search():
+    txlist = create_txlist()
+    view = TxListView(txlist)
+    # labels are case-insensitive
+    assert view.query(search="rent")[0] == [txlist[0]]
+    assert view.query(search="GROCER")[0] == [txlist[2]]
+    # txid
+    assert view.query(search="bbbb")[0] == [txlist[1]]
+    # addresses, also in lists
+    assert view.query(search="bcrt1qycdzldu")[0] == [txlist[2]]
+    # amounts
+    assert view.query(search="0.2")[0] == [txlist[1]]
+    # amount comparisons only work on utxo-like items with a single amount
+    assert view.query(search="> 1")[0] == [txlist[0]]
+    assert view.query(search="< 1")[0] == [txlist[1]]
+    # no match across fields
+    assert view.query(search="Rent\x00")[0] == []
+    assert view.query(search="none")[0] == []
+
+
+def test_TxListView_sort():
+    txlist = create_txlist()
+    view = TxListView(txlist)
+    page, _ = view.query(sortby="time", sortdir="desc")
+    assert [tx["txid"] for tx in page] == ["cc" * 32, "aa" * 32, "bb" * 32]
+    page, _ = view.query(sortby="label")
+    assert [tx["txid"] for tx in page] == ["cc" * 32, "aa" * 32, "bb" * 32]
+    # lists of numbers are summed up
+    page, _ = view.query(sortby="flow_amount")
+    assert [tx["txid"] for tx in page] == ["bb" * 32, "cc" * 32, "aa" * 32]
+    # sort-indexes are cached
+    assert view.sort_index("time", "desc") is view.sort_index("time", "desc")
+    # sort and search can be combined
+    page, page_count = view.query(search="bcrt1q", sortby="time", limit=1)
+    assert page == [txlist[1]]
+    assert page_count == 3
+
+
+def test_TxListView_iter_query():
+    txlist = create_txlist()
+    view = TxListView(txlist)
+    txs = view.iter_query(search="bcrt1q", sortby="time", sortdir="desc")
+    # a generator, no list
+    assert next(txs) is txlist[2]
+    assert list(txs) == [txlist[0], txlist[1]]
+    assert list(view.iter_query()) == txlist
+    assert list(view.iter_query(search="none")) == []
+
+
+def test_iter_merged_txlists():
+    txlist = create_txlist()
+    other = [dict(txlist[0], txid="dd" * 32, time=1642494100, label="Other")]
+    views = [("wallet1", TxListView(txlist)), ("wallet2", TxListView(other))]
+    merged = list(iter_merged_txlists(views))
+    assert [(tx["wallet_alias"], tx["time"]) for tx in merged] == [
+        ("wallet1", 1642495000),
+        ("wallet1", 1642494258),
+        ("wallet2", 1642494100),
+        ("wallet1", 1642494000),
+    ]
+    # the txs of the views are not modified
+    assert "wallet_alias" not in txlist[0]
+    merged = list(iter_merged_txlists(views, sortdir="asc", search="bcrt1qsj30"))
+    assert [tx["txid"] for tx in merged] == ["dd" * 32, "aa" * 32]
+    merged = list(iter_merged_txlists(views, sortby="label", sortdir="asc"))
+    assert [tx["label"] for tx in merged][-2:] == ["Rent", "Salary"]